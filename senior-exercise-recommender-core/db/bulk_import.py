@@ -0,0 +1,299 @@
+"""
+PostgreSQL 대량 적재 (users / facilities)
+
+CSV 또는 Parquet 파일을 배치 단위로 읽어 COPY FROM STDIN 으로 임시 테이블에 넣은 뒤
+INSERT ... ON CONFLICT DO NOTHING 으로 본 테이블에 옮긴다.
+- users: phone 이 이미 있으면 건너뜀 (해시 전에 조회해서 제외), 비밀번호가 없는 행은 적재하지 않음,
+  비밀번호 해시는 프로세스 풀에서 병렬 계산
+- facilities: fac_id 가 이미 있으면 건너뜀
+
+사용법:
+    python -m db.bulk_import users partner_users.csv [--batch-size 5000] [--workers 8]
+    python -m db.bulk_import facilities data/processed/facility_program_master.parquet
+"""
+import io
+import csv
+import json
+import time
+import argparse
+from pathlib import Path
+from functools import partial
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import bcrypt
+import pandas as pd
+
+from db.database import get_db_connection
+
+DEFAULT_BATCH_SIZE = 5000
+
+# 적재 대상 컬럼 (COPY 순서)
+USER_COLUMNS = [
+    "phone", "password_hash", "name", "birth_date", "gender",
+    "health_conditions", "exercise_goals", "preferred_location",
+    "guardian_phone", "address_road", "latitude", "longitude",
+]
+FACILITY_COLUMNS = [
+    "fac_id", "facility_name", "program_name", "sport_category",
+    "address", "latitude", "longitude", "is_indoor",
+    "intensity_level", "senior_friendly", "operating_hours",
+    "schedule_mask", "nearest_walk_time_sec", "nearest_walk_distance_m",
+    "has_subway_within_600m", "num_transit_within_300m", "accessibility_score",
+    "fac_uid",
+]
+
+# 카탈로그(parquet) 컬럼명 → facilities 테이블 컬럼명
+FACILITY_ALIASES = {
+    "fac_name": "facility_name",
+    "lat": "latitude",
+    "lon": "longitude",
+}
+
+ARRAY_COLUMNS = {"health_conditions", "exercise_goals"}
+
+
+def _hash_password(password: str) -> str:
+    """프로세스 풀에서 실행되는 bcrypt 해시 (create_user와 동일한 방식)"""
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+
+def iter_batches(path: Path, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+    """CSV/Parquet 파일을 batch_size 행씩 DataFrame으로 읽는다 (전체를 메모리에 올리지 않음)."""
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            yield batch.to_pandas()
+    else:
+        # 전화번호·생년월일의 앞자리 0이 사라지지 않도록 문자열로 읽는다 (COPY가 타입 변환)
+        yield from pd.read_csv(path, chunksize=batch_size, dtype=str)
+
+
+def _to_pg_array(value: Any) -> Optional[str]:
+    """리스트(또는 JSON 문자열 / ';' 구분 문자열)를 PostgreSQL 배열 리터럴로 변환"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith("["):
+            items = json.loads(text)
+        else:
+            items = [v.strip() for v in text.split(";") if v.strip()]
+    else:
+        items = list(value)
+    quoted = []
+    for item in items:
+        escaped = str(item).replace("\\", "\\\\").replace('"', '\\"')
+        quoted.append(f'"{escaped}"')
+    return "{" + ",".join(quoted) + "}"
+
+
+def _copy_batch(cur, table: str, columns: List[str], rows: List[List[Any]]) -> None:
+    """rows 를 CSV 형식으로 직렬화해 COPY FROM STDIN 으로 전송"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(["" if v is None else v for v in row])
+    buf.seek(0)
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+        buf,
+    )
+
+
+def _clean(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, float) and pd.isna(value):
+        return None
+    return value
+
+
+def _user_rows(df: pd.DataFrame, executor: Executor) -> List[List[Any]]:
+    """입력 배치를 users COPY 행으로 변환 (비밀번호는 풀에서 해시)"""
+    if "password_hash" in df.columns:
+        hashes = df["password_hash"].tolist()
+    else:
+        passwords = df["password"].astype(str).tolist()
+        hashes = list(executor.map(_hash_password, passwords, chunksize=64))
+
+    rows = []
+    records = df.to_dict(orient="records")
+    for record, password_hash in zip(records, hashes):
+        row = []
+        for column in USER_COLUMNS:
+            if column == "password_hash":
+                row.append(password_hash)
+            elif column in ARRAY_COLUMNS:
+                row.append(_to_pg_array(record.get(column)))
+            else:
+                row.append(_clean(record.get(column)))
+        rows.append(row)
+    return rows
+
+
+def _prepare_users(cur, df: pd.DataFrame, executor: Executor) -> Tuple[List[List[Any]], int]:
+    """
+    해시 전에 적재하지 않을 행을 걸러낸 뒤 COPY 행으로 변환. (행 목록, 비밀번호가 없어 제외한 행 수)를 돌려준다.
+    - 비밀번호(password / password_hash)가 비었거나 NaN인 행: "nan" 같은 문자열이 해시되지 않도록 제외
+    - users에 이미 있는 phone과 배치 안에서 반복된 phone: 어차피 ON CONFLICT로 버려지므로 bcrypt 비용을 쓰지 않는다
+    """
+    secret = "password_hash" if "password_hash" in df.columns else "password"
+    missing = df[secret].isna() | (df[secret].astype(str).str.strip() == "")
+    df = df[~missing]
+
+    phones = df["phone"].dropna().astype(str).unique().tolist()
+    if phones:
+        cur.execute("SELECT phone FROM users WHERE phone = ANY(%s)", (phones,))
+        existing = {row[0] for row in cur.fetchall()}
+        df = df[~df["phone"].astype(str).isin(existing)]
+    df = df[~df["phone"].duplicated() | df["phone"].isna()]
+
+    if df.empty:
+        return [], int(missing.sum())
+    return _user_rows(df, executor), int(missing.sum())
+
+
+def _facility_rows(df: pd.DataFrame) -> List[List[Any]]:
+    """입력 배치를 facilities COPY 행으로 변환"""
+    df = df.rename(columns=FACILITY_ALIASES)
+    if "fac_uid" not in df.columns:
+        # 카탈로그 fac_id("{fac_uid}-{순번}")의 시설 ID 부분 (recommender.catalog.fac_uid_of와 같은 규칙)
+        df["fac_uid"] = df["fac_id"].astype(str).str.rsplit("-", n=1).str[0]
+    for column in FACILITY_COLUMNS:
+        if column not in df.columns:
+            df[column] = None
+    df = df[FACILITY_COLUMNS].astype(object).where(df[FACILITY_COLUMNS].notna(), None)
+    return df.values.tolist()
+
+
+def _load(
+    table: str,
+    columns: List[str],
+    conflict_column: str,
+    batches: Iterator[Any],
+    conn=None,
+    to_rows: Optional[Callable[[Any, pd.DataFrame], Tuple[List[List[Any]], int]]] = None,
+) -> Dict[str, Any]:
+    """
+    배치마다 임시 테이블로 COPY → 본 테이블로 INSERT ... ON CONFLICT DO NOTHING.
+    배치 단위로 커밋하므로 중간에 실패해도 앞선 배치는 유지된다.
+    conn을 넘기면 그 연결의 트랜잭션 안에서 적재만 하고 커밋/롤백/종료는 호출자가 한다.
+    to_rows를 넘기면 batches는 DataFrame이고, 같은 커서로 to_rows(cur, df)를 호출해
+    (COPY 행, 필수값이 없어 제외한 행 수)를 받는다. 미리 걸러낸 중복 행은 skipped로 센다.
+    """
+    stage = f"_stage_{table}"
+    stats = {"read": 0, "inserted": 0, "skipped": 0, "invalid": 0, "seconds": 0.0}
+    start = time.perf_counter()
+
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"CREATE TEMP TABLE {stage} AS SELECT {', '.join(columns)} FROM {table} WITH NO DATA"
+            )
+            for batch in batches:
+                read, invalid = len(batch), 0
+                rows = batch
+                if to_rows is not None:
+                    rows, invalid = to_rows(cur, batch)
+                if not read:
+                    continue
+                inserted = 0
+                if rows:
+                    _copy_batch(cur, stage, columns, rows)
+                    cur.execute(
+                        f"""
+                        INSERT INTO {table} ({', '.join(columns)})
+                        SELECT {', '.join(columns)} FROM {stage}
+                        ON CONFLICT ({conflict_column}) DO NOTHING
+                        """
+                    )
+                    inserted = cur.rowcount
+                    cur.execute(f"TRUNCATE {stage}")
+                if owns_conn:
+                    conn.commit()
+
+                stats["read"] += read
+                stats["inserted"] += inserted
+                stats["invalid"] += invalid
+                stats["skipped"] += read - invalid - inserted
+                elapsed = time.perf_counter() - start
+                print(
+                    f"  {table}: {stats['read']}행 처리 "
+                    f"(적재 {stats['inserted']}, 중복 건너뜀 {stats['skipped']}, 필수값 누락 {stats['invalid']}) "
+                    f"- {stats['read'] / elapsed:.0f} rows/s"
+                )
+            if not owns_conn:
+                # 같은 연결로 다시 적재할 수 있도록 임시 테이블 정리
+                cur.execute(f"DROP TABLE {stage}")
+    except Exception:
+        if owns_conn:
+            conn.rollback()
+        raise
+    finally:
+        if owns_conn:
+            conn.close()
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_sec"] = stats["read"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def import_users(
+    path: Path,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    사용자 대량 적재. 입력 컬럼은 USER_COLUMNS 와 같고, password_hash 대신
+    평문 password 컬럼이 있으면 해시해서 저장한다. phone 이 중복이면 건너뜀.
+    비밀번호가 없는 행은 적재하지 않고 invalid로 센다.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return _load(
+            "users", USER_COLUMNS, "phone", iter_batches(path, batch_size),
+            to_rows=partial(_prepare_users, executor=executor),
+        )
+
+
+def import_facility_frames(frames: Iterable[pd.DataFrame], conn=None) -> Dict[str, Any]:
+    """
+    시설 DataFrame 배치들을 적재. facilities 컬럼명 또는 카탈로그 컬럼명(fac_name, lat, lon)을 받는다.
+    fac_id 가 중복이면 건너뜀. conn을 넘기면 호출자의 트랜잭션 안에서 적재한다.
+    """
+    batches = (_facility_rows(df) for df in frames)
+    return _load("facilities", FACILITY_COLUMNS, "fac_id", batches, conn=conn)
+
+
+def import_facilities(path: Path, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """시설 대량 적재 (CSV/Parquet 파일)"""
+    return import_facility_frames(iter_batches(path, batch_size))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="users / facilities 대량 적재 (COPY)")
+    parser.add_argument("table", choices=["users", "facilities"])
+    parser.add_argument("path", type=Path, help="CSV 또는 Parquet 파일")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="비밀번호 해시 프로세스 수")
+    args = parser.parse_args(argv)
+
+    if args.table == "users":
+        stats = import_users(args.path, args.batch_size, args.workers)
+    else:
+        stats = import_facilities(args.path, args.batch_size)
+
+    print(
+        f"✅ {args.table} 적재 완료: {stats['read']}행 중 {stats['inserted']}행 적재, "
+        f"{stats['skipped']}행 중복 건너뜀, {stats['invalid']}행 필수값 누락 "
+        f"({stats['seconds']:.1f}s, {stats['rows_per_sec']:.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -48,11 +48,25 @@ def get_db_connection():
             print(f"사용된 접속 정보(URL): {database_url if database_url else '개별 변수 사용'}")
         raise e
 
+# 여러 워커/컨테이너가 동시에 초기화해도 한 번에 하나만 DDL을 실행하도록 잡는 락 키
+SCHEMA_LOCK_KEY = 20251201
+
+
 def init_database():
-    """데이터베이스 테이블 초기화 (테이블이 없으면 생성)"""
+    """
+    데이터베이스 테이블 초기화 (테이블이 없으면 생성)
+
+    배포 시 `python -m db.database`로 한 번 실행하는 것을 권장.
+
+    Returns:
+        성공하면 True, 실패하면 False
+    """
     try:
         conn = get_db_connection()
         cur = conn.cursor()
+
+        # 동시에 실행되는 다른 초기화가 끝날 때까지 대기 (트랜잭션 종료 시 자동 해제)
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_KEY,))
         
         # 1. users 테이블 생성
         cur.execute("""
@@ -88,15 +102,92 @@ def init_database():
                 is_indoor BOOLEAN
             );
         """)
+        # 카탈로그 백엔드(recommender/catalog.py)가 사용하는 프로그램 속성
+        cur.execute("""
+            ALTER TABLE facilities
+                ADD COLUMN IF NOT EXISTS intensity_level VARCHAR(20),
+                ADD COLUMN IF NOT EXISTS senior_friendly BOOLEAN,
+                ADD COLUMN IF NOT EXISTS operating_hours VARCHAR(50),
+                ADD COLUMN IF NOT EXISTS schedule_mask BIGINT,
+                ADD COLUMN IF NOT EXISTS nearest_walk_time_sec DOUBLE PRECISION,
+                ADD COLUMN IF NOT EXISTS nearest_walk_distance_m DOUBLE PRECISION,
+                ADD COLUMN IF NOT EXISTS has_subway_within_600m BOOLEAN,
+                ADD COLUMN IF NOT EXISTS num_transit_within_300m INTEGER,
+                ADD COLUMN IF NOT EXISTS accessibility_score DOUBLE PRECISION,
+                ADD COLUMN IF NOT EXISTS fac_uid VARCHAR(50);
+        """)
+        # 증분 빌드 delta는 시설(fac_uid) 단위로 행을 교체한다: fac_id "{fac_uid}-{순번}"에서 채움
+        cur.execute("""
+            UPDATE facilities SET fac_uid = regexp_replace(fac_id, '-[^-]*$', '')
+            WHERE fac_uid IS NULL AND fac_id IS NOT NULL;
+        """)
+
+        # 3. group_session / group_participant 테이블 생성 (커뮤니티 세션)
+        # join_session의 upsert가 UNIQUE 제약을 충돌 대상으로 사용한다.
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS group_session (
+                id SERIAL PRIMARY KEY,
+                fac_id VARCHAR(50) NOT NULL,
+                fac_name VARCHAR(100) NOT NULL,
+                program_name VARCHAR(100) NOT NULL,
+                session_date DATE NOT NULL,
+                time_block VARCHAR(20) NOT NULL,
+                max_participants INTEGER DEFAULT 4,
+                current_participants INTEGER DEFAULT 0,
+                status VARCHAR(20) DEFAULT 'open',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(fac_id, program_name, session_date, time_block)
+            );
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS group_participant (
+                id SERIAL PRIMARY KEY,
+                session_id INTEGER NOT NULL REFERENCES group_session(id) ON DELETE CASCADE,
+                user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(session_id, user_id)
+            );
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_group_participant_user
+                ON group_participant(user_id);
+        """)
+
+        # 4. 세션 탐색용 인덱스
+        # - 시설 위경도 btree: 반경 검색의 bounding box 조건을 인덱스로 처리
+        # - 시설 fac_uid btree: 카탈로그 delta 반영 시 바뀐 시설의 행 삭제
+        # - 모집 중(open) 세션만 담는 부분 인덱스: (날짜, id) 순 키셋 페이지네이션
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_facilities_lat_lon
+                ON facilities(latitude, longitude);
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_facilities_fac_uid
+                ON facilities(fac_uid);
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_group_session_open
+                ON group_session(session_date, id)
+                WHERE status = 'open';
+        """)
         
         conn.commit()
         cur.close()
         conn.close()
         print("✅ PostgreSQL 테이블 초기화 완료")
+        return True
         
     except Exception as e:
         print("❌ 테이블 생성 실패")
         try:
             print(f"에러: {e}")
         except:
-            print("(에러 메시지 인코딩 오류)")
\ No newline at end of file
+            print("(에러 메시지 인코딩 오류)")
+        return False
+
+
+# 스키마 마이그레이션 (배포 시 한 번 실행)
+# python -m db.database
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if init_database() else 1)
@@ -29,7 +29,17 @@ CREATE TABLE IF NOT EXISTS facilities (
     address VARCHAR(255),
     latitude DOUBLE PRECISION,
     longitude DOUBLE PRECISION,
-    is_indoor BOOLEAN
+    is_indoor BOOLEAN,
+    intensity_level VARCHAR(20),
+    senior_friendly BOOLEAN,
+    operating_hours VARCHAR(50),
+    schedule_mask BIGINT,  -- 요일 × 2시간 슬롯 비트마스크 (recommender/schedule.py)
+    nearest_walk_time_sec DOUBLE PRECISION,
+    nearest_walk_distance_m DOUBLE PRECISION,
+    has_subway_within_600m BOOLEAN,
+    num_transit_within_300m INTEGER,
+    accessibility_score DOUBLE PRECISION,  -- 대중교통 접근성 0~1 (recommender/scoring.py)
+    fac_uid VARCHAR(50)  -- fac_id "{fac_uid}-{순번}"의 시설 ID (카탈로그 delta 반영 단위)
 );
 
 -- Group exercise sessions
@@ -64,4 +74,12 @@ CREATE INDEX IF NOT EXISTS idx_group_session_lookup
 CREATE INDEX IF NOT EXISTS idx_group_participant_session 
     ON group_participant(session_id);
 CREATE INDEX IF NOT EXISTS idx_group_participant_user 
-    ON group_participant(user_id);
\ No newline at end of file
+    ON group_participant(user_id);
+CREATE INDEX IF NOT EXISTS idx_facilities_lat_lon
+    ON facilities(latitude, longitude);
+CREATE INDEX IF NOT EXISTS idx_facilities_fac_uid
+    ON facilities(fac_uid);
+-- 모집 중인 세션만 담는 부분 인덱스 (세션 탐색/페이지네이션용)
+CREATE INDEX IF NOT EXISTS idx_group_session_open
+    ON group_session(session_date, id)
+    WHERE status = 'open';
@@ -0,0 +1,428 @@
+# recommender/catalog.py
+"""
+시설-프로그램 카탈로그 백엔드
+
+recommend()는 카탈로그에서 사용자 반경 안의 후보만 받아 점수를 계산한다.
+- json: facility_program_master.json을 프로세스당 한 번 로드해 메모리에서 검색 (기본값)
+- postgres: facilities 테이블의 위도/경도 인덱스로 반경 후보만 한 번의 쿼리로 조회
+  (노드마다 전국 카탈로그를 메모리에 들고 있지 않아도 됨)
+- partitioned: 시/도(또는 시/군/구)별 Parquet 파티션 중 검색 반경과 bounding box가 겹치는 것만 필요할 때 로드
+  (한 권역만 서비스하는 노드는 그 권역 파티션만 메모리에 올림)
+
+FACILITY_CATALOG_BACKEND 환경변수로 선택한다.
+
+Postgres 적재:
+    python -m recommender.catalog load
+
+증분 빌드(scripts/build_master.py --incremental) 결과 반영:
+    python -m recommender.catalog apply-delta   (postgres 백엔드: facilities 테이블에 반영, 모든 워커에 보임)
+    POST /api/catalog/apply-delta               (json/partitioned 백엔드: 요청을 받은 워커의 메모리만 갱신)
+  json 백엔드는 build_master가 master JSON도 갱신하므로 재시작한 워커는 새 카탈로그를 읽는다.
+  워커가 여럿이면 워커마다 API를 호출하거나 순차 재시작해야 한다.
+
+지역 파티션 생성:
+    python scripts/convert_json_to_parquet.py --partition-by sido   (또는 sigungu)
+"""
+import os
+import json
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+from .types import Location
+from .utils import bounding_box
+
+PROCESSED_DIR = Path(__file__).resolve().parents[1] / "data" / "processed"
+DELTA_PATH = PROCESSED_DIR / "facility_program_master.delta.json"
+
+# 지역 파티션 디렉터리와 매니페스트 (파티션별 지역명, 파일, 행 수, bounding box)
+PARTITION_DIR = PROCESSED_DIR / "catalog_partitions"
+PARTITION_MANIFEST = "manifest.json"
+# 주소 앞에서 몇 단어까지를 지역 키로 쓸지 (시/도, 시/군/구)
+PARTITION_LEVELS = {"sido": 1, "sigungu": 2}
+UNKNOWN_REGION = "기타"
+
+CATALOG_COLUMNS: List[str] = [
+    "fac_id", "fac_name", "address",
+    "lat", "lon",
+    "is_indoor",
+    "sport_category",
+    "program_name",
+    "intensity_level",
+    "senior_friendly",
+    "operating_hours",
+    "schedule_mask",
+    "nearest_walk_time_sec",
+    "nearest_walk_distance_m",
+    "has_subway_within_600m",
+    "num_transit_within_300m",
+    "accessibility_score",
+]
+
+# 값이 반복되는 문자열 컬럼은 정수 코드 + 공유 사전(pandas Categorical / Parquet에서는 Arrow dictionary)으로 보관
+# - 시설명/주소: 시설 하나의 프로그램 행들이 같은 코드를 가리키므로 문자열은 시설마다 한 번만 저장
+# - 종목/강도/운영 시간대: 몇 가지 값뿐이라 룰/점수 계산이 문자열 대신 코드로 비교
+CATEGORICAL_COLUMNS: List[str] = [
+    "fac_name", "address",
+    "sport_category",
+    "program_name",
+    "intensity_level",
+    "operating_hours",
+]
+
+
+def empty_catalog_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=CATALOG_COLUMNS)
+
+
+def compact_catalog(df: pd.DataFrame) -> pd.DataFrame:
+    """CATEGORICAL_COLUMNS를 Categorical로 (이미 Categorical인 컬럼은 그대로)"""
+    columns = {
+        column: df[column].astype("category")
+        for column in CATEGORICAL_COLUMNS
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype)
+    }
+    return df.assign(**columns) if columns else df
+
+
+def region_keys(address: pd.Series, partition_by: str = "sido") -> pd.Series:
+    """주소 앞 단어로 만든 지역 키 (sido: '서울특별시', sigungu: '서울특별시 마포구'), 주소가 없으면 '기타'"""
+    words = PARTITION_LEVELS[partition_by]
+    keys = address.fillna("").astype(str).str.split().str[:words].str.join(" ")
+    return keys.mask(keys == "", UNKNOWN_REGION)
+
+
+class FacilityCatalog:
+    """카탈로그 백엔드 인터페이스"""
+
+    def candidates(self, location: Location, radius_km: float) -> pd.DataFrame:
+        """location 기준 반경 radius_km를 감싸는 bounding box 안의 후보 (정확한 거리 필터는 호출자가)"""
+        raise NotImplementedError
+
+    def nearest(self, location: Location, k: int) -> pd.DataFrame:
+        """반경 안에 후보가 없을 때 사용할, 가장 가까운 k개 후보"""
+        raise NotImplementedError
+
+    def apply_delta(self, delta: dict) -> dict:
+        """build_master 증분 빌드의 delta(added / changed / removed fac_uid + 바뀐 레코드) 반영"""
+        raise NotImplementedError
+
+
+def _delta_uids(delta: dict) -> set:
+    # added도 포함: 같은 delta를 두 번 적용해도 행이 중복되지 않도록
+    return set(delta.get("added", [])) | set(delta.get("changed", [])) | set(delta.get("removed", []))
+
+
+def _delta_frame(delta: dict) -> pd.DataFrame:
+    from .pipeline import catalog_frame
+
+    return catalog_frame(delta.get("records", []))
+
+
+def fac_uid_of(fac_id: pd.Series) -> pd.Series:
+    """카탈로그 fac_id("{fac_uid}-{순번}")에서 시설 ID 부분"""
+    return fac_id.str.rsplit("-", n=1).str[0]
+
+
+class JsonFacilityCatalog(FacilityCatalog):
+    """facility_program_master.json 기반 인메모리 카탈로그"""
+
+    def __init__(self, df: Optional[pd.DataFrame] = None):
+        if df is None:
+            from .pipeline import load_facility_master
+            df = load_facility_master()
+        self.df = compact_catalog(df.reset_index(drop=True))
+
+    def candidates(self, location: Location, radius_km: float) -> pd.DataFrame:
+        min_lat, max_lat, min_lon, max_lon = bounding_box(location["lat"], location["lon"], radius_km)
+        lat = self.df["lat"]
+        lon = self.df["lon"]
+        mask = lat.between(min_lat, max_lat) & lon.between(min_lon, max_lon)
+        return self.df[mask]
+
+    def nearest(self, location: Location, k: int) -> pd.DataFrame:
+        if self.df.empty:
+            return self.df
+        # 순위만 필요하므로 근사 거리(위경도 차의 제곱합)로 정렬
+        approx = (self.df["lat"] - location["lat"]) ** 2 + (self.df["lon"] - location["lon"]) ** 2
+        return self.df.loc[approx.nsmallest(k).index]
+
+    def apply_delta(self, delta: dict) -> dict:
+        """바뀐 시설의 행만 교체 (master 전체를 다시 읽지 않음)"""
+        if delta.get("full_rebuild"):
+            from .pipeline import load_facility_master
+            self.df = compact_catalog(load_facility_master().reset_index(drop=True))
+            return {"removed_rows": None, "added_rows": len(self.df), "full_reload": True}
+
+        df = self.df
+        stale = fac_uid_of(df["fac_id"].astype(str)).isin(_delta_uids(delta))
+        new_rows = _delta_frame(delta)
+        # 바뀐 행을 빼고 새 행을 더한 뒤 사전을 다시 만든다 (Categorical concat은 사전이 다르면 문자열로 풀림)
+        updated = pd.concat([df[~stale], new_rows], ignore_index=True)
+        updated = updated.drop_duplicates(subset=['fac_name', 'program_name', 'lat', 'lon'])
+        # 조회 중인 요청은 이전 DataFrame을 계속 사용하고, 이후 요청부터 새 DataFrame을 본다
+        self.df = compact_catalog(updated.reset_index(drop=True))
+        return {"removed_rows": int(stale.sum()), "added_rows": len(new_rows), "full_reload": False}
+
+
+class PartitionedFacilityCatalog(FacilityCatalog):
+    """
+    지역 파티션(Parquet) 기반 카탈로그.
+    매니페스트의 bounding box가 검색 영역과 겹치는 파티션만 처음 필요할 때 읽어 캐시한다.
+    """
+
+    def __init__(self, directory: Path = PARTITION_DIR, preload_regions=()):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._frames: dict = {}
+        self.partitions = self._read_manifest()
+        for part in self.partitions:
+            if part["region"] in preload_regions:
+                self._frame(part)
+
+    def _read_manifest(self) -> list:
+        try:
+            with open(self.directory / PARTITION_MANIFEST, "r", encoding="utf-8") as f:
+                return json.load(f)["partitions"]
+        except FileNotFoundError:
+            # 초기 개발 단계에서 파티션이 아직 없을 수 있음
+            return []
+
+    def _frame(self, part: dict) -> pd.DataFrame:
+        frame = self._frames.get(part["file"])
+        if frame is None:
+            with self._lock:
+                frame = self._frames.get(part["file"])
+                if frame is None:
+                    # 파티션 파일의 dictionary 컬럼은 Categorical로 읽힌다 (예전 파일은 변환)
+                    frame = compact_catalog(pd.read_parquet(self.directory / part["file"]))
+                    self._frames[part["file"]] = frame
+        return frame
+
+    def _overlapping(self, min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> list:
+        return [
+            part for part in self.partitions
+            if part["min_lat"] <= max_lat and part["max_lat"] >= min_lat
+            and part["min_lon"] <= max_lon and part["max_lon"] >= min_lon
+        ]
+
+    @property
+    def loaded_regions(self) -> List[str]:
+        return [part["region"] for part in self.partitions if part["file"] in self._frames]
+
+    def candidates(self, location: Location, radius_km: float) -> pd.DataFrame:
+        min_lat, max_lat, min_lon, max_lon = bounding_box(location["lat"], location["lon"], radius_km)
+        frames = []
+        for part in self._overlapping(min_lat, max_lat, min_lon, max_lon):
+            df = self._frame(part)
+            mask = df["lat"].between(min_lat, max_lat) & df["lon"].between(min_lon, max_lon)
+            frames.append(df[mask])
+        if not frames:
+            return empty_catalog_frame()
+        # 파티션마다 사전이 달라 concat하면 문자열로 풀리므로, 후보 행만으로 사전을 다시 만든다
+        return compact_catalog(pd.concat(frames, ignore_index=True))
+
+    def nearest(self, location: Location, k: int) -> pd.DataFrame:
+        # JSON 카탈로그와 같은 근사 거리(위경도 차의 제곱합)로,
+        # bounding box까지의 거리가 가까운 파티션부터 읽다가 더 가까운 후보가 나올 수 없으면 멈춘다
+        lat, lon = location["lat"], location["lon"]
+
+        def box_distance(part: dict) -> float:
+            d_lat = max(part["min_lat"] - lat, 0.0, lat - part["max_lat"])
+            d_lon = max(part["min_lon"] - lon, 0.0, lon - part["max_lon"])
+            return d_lat ** 2 + d_lon ** 2
+
+        nearest, kth = None, float("inf")
+        for part in sorted(self.partitions, key=box_distance):
+            if box_distance(part) > kth:
+                break
+            df = self._frame(part)
+            approx = ((df["lat"] - lat) ** 2 + (df["lon"] - lon) ** 2).nsmallest(k)
+            found = df.loc[approx.index].assign(_approx=approx.to_numpy())
+            nearest = found if nearest is None else pd.concat([nearest, found]).nsmallest(k, "_approx")
+            if len(nearest) >= k:
+                kth = nearest["_approx"].max()
+        if nearest is None:
+            return empty_catalog_frame()
+        return compact_catalog(nearest.drop(columns="_approx"))
+
+    def apply_delta(self, delta: dict) -> dict:
+        """
+        파티션 파일은 빌드 산출물이므로 delta를 직접 반영하지 않는다.
+        (build_master 후 convert_json_to_parquet --partition-by로 다시 만든 파티션을 읽도록 캐시만 비움)
+        """
+        with self._lock:
+            self._frames = {}
+            self.partitions = self._read_manifest()
+        return {"removed_rows": None, "added_rows": None, "full_reload": True}
+
+
+# facilities 테이블 → 카탈로그 컬럼 (비어 있는 값은 JSON 로더와 같은 기본값 사용)
+_PG_SELECT = """
+SELECT
+    fac_id,
+    facility_name AS fac_name,
+    COALESCE(address, '') AS address,
+    latitude AS lat,
+    longitude AS lon,
+    COALESCE(is_indoor, TRUE) AS is_indoor,
+    COALESCE(NULLIF(sport_category, ''), 'general') AS sport_category,
+    COALESCE(program_name, '') AS program_name,
+    COALESCE(intensity_level, 'medium') AS intensity_level,
+    COALESCE(senior_friendly, TRUE) AS senior_friendly,
+    COALESCE(operating_hours, '평일 오전') AS operating_hours,
+    COALESCE(schedule_mask, 0) AS schedule_mask,
+    nearest_walk_time_sec,
+    nearest_walk_distance_m,
+    COALESCE(has_subway_within_600m, FALSE) AS has_subway_within_600m,
+    COALESCE(num_transit_within_300m, 0) AS num_transit_within_300m,
+    COALESCE(accessibility_score, 0.5) AS accessibility_score
+FROM facilities
+"""
+
+
+class PostgresFacilityCatalog(FacilityCatalog):
+    """facilities 테이블 기반 카탈로그 (idx_facilities_lat_lon 사용)"""
+
+    def _query(self, sql: str, params: dict) -> pd.DataFrame:
+        from db.database import get_db_connection
+
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                rows = cur.fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return empty_catalog_frame()
+        return pd.DataFrame(rows, columns=CATALOG_COLUMNS)
+
+    def candidates(self, location: Location, radius_km: float) -> pd.DataFrame:
+        min_lat, max_lat, min_lon, max_lon = bounding_box(location["lat"], location["lon"], radius_km)
+        return self._query(
+            _PG_SELECT + """
+            WHERE latitude BETWEEN %(min_lat)s AND %(max_lat)s
+              AND longitude BETWEEN %(min_lon)s AND %(max_lon)s
+            """,
+            {"min_lat": min_lat, "max_lat": max_lat, "min_lon": min_lon, "max_lon": max_lon},
+        )
+
+    def nearest(self, location: Location, k: int) -> pd.DataFrame:
+        # 반경 안에 아무것도 없을 때만 쓰이는 드문 경로
+        return self._query(
+            _PG_SELECT + """
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+            ORDER BY POWER(latitude - %(lat)s, 2) + POWER(longitude - %(lon)s, 2)
+            LIMIT %(k)s
+            """,
+            {"lat": location["lat"], "lon": location["lon"], "k": k},
+        )
+
+    def apply_delta(self, delta: dict) -> dict:
+        """
+        바뀐 시설(fac_uid 인덱스)의 행 삭제와 새 행 적재를 한 트랜잭션으로 반영.
+        적재가 실패하면 삭제도 롤백되어 이전 카탈로그가 그대로 남는다.
+        facilities 테이블은 모든 워커가 공유하므로 한 번 반영하면 전체 노드에 보인다.
+        """
+        if delta.get("full_rebuild"):
+            # 전체 빌드 결과는 새 master로 테이블 전체를 교체 (이것도 한 트랜잭션)
+            stats = load_catalog_into_postgres()
+            return {"removed_rows": stats["removed"], "added_rows": stats["inserted"], "full_reload": True}
+
+        from db.bulk_import import import_facility_frames
+        from db.database import get_db_connection
+
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM facilities WHERE fac_uid = ANY(%s)", (sorted(_delta_uids(delta)),))
+                removed = cur.rowcount
+            stats = import_facility_frames([_delta_frame(delta)], conn=conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return {"removed_rows": removed, "added_rows": stats["inserted"], "full_reload": False}
+
+
+def catalog_backend() -> str:
+    return os.getenv("FACILITY_CATALOG_BACKEND", "json").lower()
+
+
+@lru_cache(maxsize=1)
+def get_facility_catalog() -> FacilityCatalog:
+    """환경변수 FACILITY_CATALOG_BACKEND(json | postgres | partitioned)에 따른 카탈로그 (프로세스당 1개)"""
+    backend = catalog_backend()
+    if backend == "postgres":
+        return PostgresFacilityCatalog()
+    if backend == "partitioned":
+        # 서비스 권역 파티션은 시작 시 미리 로드 (예: "서울특별시,경기도")
+        preload = os.getenv("FACILITY_CATALOG_PRELOAD_REGIONS", "")
+        return PartitionedFacilityCatalog(
+            preload_regions={region.strip() for region in preload.split(",") if region.strip()}
+        )
+    if backend == "json":
+        return JsonFacilityCatalog()
+    raise ValueError(f"알 수 없는 FACILITY_CATALOG_BACKEND: {backend}")
+
+
+def apply_master_delta(path: Path = DELTA_PATH) -> dict:
+    """build_master --incremental이 만든 delta 파일을 현재 카탈로그에 반영"""
+    with open(path, "r", encoding="utf-8") as f:
+        delta = json.load(f)
+    return get_facility_catalog().apply_delta(delta)
+
+
+def load_catalog_into_postgres() -> dict:
+    """
+    facility_program_master.json 카탈로그로 facilities 테이블을 교체.
+    기존 행 삭제와 새 카탈로그 적재를 한 트랜잭션으로 처리하므로 다시 실행하면 갱신된 master가 반영되고,
+    적재가 실패하면 이전 카탈로그가 그대로 남는다. (TRUNCATE가 아닌 DELETE라서 적재 중에도 조회는 이전 행을 본다)
+    """
+    from db.bulk_import import import_facility_frames
+    from db.database import get_db_connection
+    from .pipeline import load_facility_master
+
+    frame = load_facility_master()
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM facilities")
+            removed = cur.rowcount
+        stats = import_facility_frames([frame], conn=conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return {**stats, "removed": removed}
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "load":
+        stats = load_catalog_into_postgres()
+        print(
+            f"✅ facilities 교체 완료: 기존 {stats['removed']}행 삭제, {stats['inserted']}행 적재, "
+            f"{stats['skipped']}행 중복 건너뜀 ({stats['rows_per_sec']:.0f} rows/s)"
+        )
+    elif len(sys.argv) > 1 and sys.argv[1] == "apply-delta":
+        if catalog_backend() != "postgres":
+            # json / partitioned 카탈로그는 서버 프로세스 메모리에 있으므로 별도 프로세스에서 반영할 수 없다
+            print(
+                "❌ apply-delta 명령은 postgres 백엔드에서만 동작합니다. "
+                "실행 중인 서버에는 POST /api/catalog/apply-delta(워커마다)를 호출하거나 서버를 재시작하세요."
+            )
+            sys.exit(1)
+        stats = apply_master_delta()
+        print(f"✅ delta 반영 완료: {stats['removed_rows']}행 삭제, {stats['added_rows']}행 추가")
+    else:
+        print("사용법: python -m recommender.catalog load | apply-delta")
@@ -0,0 +1,114 @@
+# recommender/exercise_catalog.py
+"""
+운동 영상 카탈로그 (프로세스당 한 번 로드)
+
+exercise_video.json을 한 번 읽어 신체부위 / 체력항목 / 운동도구 / 혼자여부 별 인덱스와
+YouTube 비디오 ID, embed URL을 미리 계산해 둔다.
+version은 영상 목록 내용 해시로, 오늘의 운동 선택 해시에 함께 들어간다
+(영상 목록이 바뀌면 선택도 바뀜).
+개인 운동 추천(/api/recommend, /api/notification/exercise)과
+그룹 운동 영상 추천이 같은 카탈로그를 공유한다.
+"""
+import hashlib
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from .utils import extract_youtube_video_id, get_youtube_embed_url
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+EXERCISE_FILE = BASE_DIR / "data" / "processed" / "exercise_video.json"
+
+Exercises = Tuple[Dict, ...]
+
+
+def split_body_parts(body: str) -> List[str]:
+    """
+    신체부위 문자열을 부위 목록으로 분리.
+    - "/", "//", "" 등 애매하면 ["기타"]
+    - "등/허리"처럼 슬래시가 있으면 split
+    """
+    body = (body or "").strip()
+    if not body or body in {"/", "//"}:
+        return ["기타"]
+    parts = [b.strip() for b in body.split("/") if b.strip()]
+    return parts or ["기타"]
+
+
+def _freeze(index: Dict[str, List[Dict]]) -> Mapping[str, Exercises]:
+    return MappingProxyType({key: tuple(items) for key, items in index.items()})
+
+
+@dataclass(frozen=True, eq=False)
+class ExerciseCatalog:
+    """
+    읽기 전용 운동 영상 카탈로그.
+    (영상 dict 자체도 공유되므로 호출자는 수정하지 않는다)
+    """
+    exercises: Exercises
+    by_body_part: Mapping[str, Exercises]
+    by_fitness: Mapping[str, Exercises]      # 체력항목
+    by_equipment: Mapping[str, Exercises]    # 운동도구
+    by_solo: Mapping[str, Exercises]         # 혼자여부 ("y" / "n", 소문자)
+    video_ids: Tuple[Optional[str], ...]
+    embed_urls: Tuple[Optional[str], ...]
+    _positions: Mapping[Tuple[str, str], int]
+    version: str = ""                         # 영상 목록(Name, url, 신체부위) 내용 해시
+
+    @classmethod
+    def from_exercises(cls, exercises: List[Dict]) -> "ExerciseCatalog":
+        by_body_part: Dict[str, List[Dict]] = {}
+        by_fitness: Dict[str, List[Dict]] = {}
+        by_equipment: Dict[str, List[Dict]] = {}
+        by_solo: Dict[str, List[Dict]] = {}
+        positions: Dict[Tuple[str, str], int] = {}
+        digest = hashlib.blake2b(digest_size=8)
+
+        for idx, ex in enumerate(exercises):
+            digest.update(f"{ex.get('Name', '')}\x1f{ex.get('url', '')}\x1f{ex.get('신체부위', '')}\x1e".encode("utf-8"))
+            for part in split_body_parts(ex.get("신체부위", "")):
+                by_body_part.setdefault(part, []).append(ex)
+            by_fitness.setdefault(ex.get("체력항목", "").strip(), []).append(ex)
+            by_equipment.setdefault(ex.get("운동도구", "").strip(), []).append(ex)
+            # 혼자여부가 없으면 혼자 하는 운동("y")으로 간주
+            by_solo.setdefault(ex.get("혼자여부", "y").strip().lower(), []).append(ex)
+            positions.setdefault((ex.get("Name", ""), ex.get("url", "")), idx)
+
+        return cls(
+            exercises=tuple(exercises),
+            by_body_part=_freeze(by_body_part),
+            by_fitness=_freeze(by_fitness),
+            by_equipment=_freeze(by_equipment),
+            by_solo=_freeze(by_solo),
+            video_ids=tuple(extract_youtube_video_id(ex.get("url", "")) for ex in exercises),
+            embed_urls=tuple(get_youtube_embed_url(ex.get("url", "")) for ex in exercises),
+            _positions=MappingProxyType(positions),
+            version=digest.hexdigest(),
+        )
+
+    @property
+    def body_parts(self) -> List[str]:
+        return list(self.by_body_part.keys())
+
+    @property
+    def group_exercises(self) -> Exercises:
+        """혼자서 하는 운동이 아닌 영상 (혼자여부 == "n")"""
+        return self.by_solo.get("n", ())
+
+    def index_of(self, exercise: Dict) -> Optional[int]:
+        """영상의 카탈로그 내 위치 (Name, url 기준). 없으면 None."""
+        return self._positions.get((exercise.get("Name", ""), exercise.get("url", "")))
+
+    def embed_url_of(self, exercise: Dict) -> Optional[str]:
+        idx = self.index_of(exercise)
+        return self.embed_urls[idx] if idx is not None else None
+
+
+@lru_cache(maxsize=1)
+def get_exercise_catalog() -> ExerciseCatalog:
+    """프로세스 공용 운동 영상 카탈로그 (처음 호출 시 exercise_video.json 로드)"""
+    from .exercise_recommender import load_exercises
+
+    return ExerciseCatalog.from_exercises(load_exercises(EXERCISE_FILE))
@@ -5,16 +5,19 @@
 - 매일 신체부위를 번갈아가며 추천
 """
 import json
-import random
+import hashlib
 import datetime as dt
 from pathlib import Path
 from typing import List, Dict
 import os
 
+from .history_store import ExerciseHistoryStore, WriteBehindHistoryStore, get_history_store
+from .exercise_catalog import ExerciseCatalog, split_body_parts
+
 # 데이터 파일 경로
 BASE_DIR = Path(os.path.dirname(os.path.dirname(__file__)))
 EXERCISE_FILE = BASE_DIR / "data" / "processed" / "exercise_video.json"
-HISTORY_FILE = BASE_DIR / "db" / "exercise_history.json"  # 나중에 SQL로 전환 예정
+HISTORY_FILE = BASE_DIR / "db" / "exercise_history.json"  # 이력 저장소(history_store)로 가져오기 전용
 
 
 def load_exercises(path: Path = EXERCISE_FILE) -> List[Dict]:
@@ -47,23 +50,14 @@ def group_exercises_by_body_part(exercises: List[Dict]) -> Dict[str, List[Dict]]
     """
     grouped: Dict[str, List[Dict]] = {}
     for ex in exercises:
-        body = ex.get("신체부위", "").strip()
-        if not body or body in {"/", "//"}:
-            body_parts = ["기타"]
-        else:
-            # "/"로 split하고 공백 제거
-            body_parts = [b.strip() for b in body.split("/") if b.strip()]
-            if not body_parts:
-                body_parts = ["기타"]
-        
         # 각 부위별로 운동 추가
-        for part in body_parts:
+        for part in split_body_parts(ex.get("신체부위", "")):
             grouped.setdefault(part, []).append(ex)
     return grouped
 
 
 def load_history(path: Path = HISTORY_FILE) -> Dict:
-    """사용자별 운동 추천 이력 로딩"""
+    """사용자별 운동 추천 이력 로딩 (JSON 파일 전체, 가져오기/디버깅용)"""
     if not path.exists():
         return {}
     with path.open("r", encoding="utf-8") as f:
@@ -81,50 +75,133 @@ def save_history(history: Dict, path: Path = HISTORY_FILE) -> None:
 
 
 def choose_exercise_for_today(
-    exercises: List[Dict],
+    exercises: ExerciseCatalog | List[Dict],
     user_id: str = "default_user",
     today_date: dt.date | None = None,
+    store: ExerciseHistoryStore | WriteBehindHistoryStore | None = None,
 ) -> Dict:
     """
     - 매일 '신체부위'를 번갈아가며 추천하는 전략.
+    - exercises는 미리 인덱싱된 ExerciseCatalog를 권장 (리스트를 넘기면 매번 인덱싱)
+    - 이력은 사용자 단위로 조회/저장 (store 미지정 시 공용 이력 저장소)
     - 로직:
-      1) history에서 해당 user의 어제 기록(last_body, last_date, today_exercise) 확인
+      1) history에서 해당 user의 어제 기록(last_day, last_body, exercise_index) 확인
       2) 오늘 이미 추천한 적 있으면 같은 운동 그대로 리턴 (하루에 여러 번 호출해도 동일)
-      3) 아니라면:
-         - 어제 사용한 부위를 제외한 부위 중에서 랜덤으로 1개 선택
-         - 그 부위 안에서 랜덤으로 1개 영상 선택
-         - history에 오늘 날짜, 부위, 추천한 영상 저장
+      3) 아니라면 (일일 배치 assign_exercises_for_day가 미리 배정하지 못한 경우):
+         - 어제 사용한 부위를 제외한 부위 중에서 1개, 그 부위 안에서 1개 영상 선택
+           ((user_id, 날짜, 카탈로그 버전) 해시로 결정 → pick_exercise)
+         - history에 오늘 날짜, 부위, 추천한 영상의 카탈로그 인덱스 저장
     """
-    grouped = group_exercises_by_body_part(exercises)
-    body_parts = list(grouped.keys())
+    catalog = exercises if isinstance(exercises, ExerciseCatalog) else ExerciseCatalog.from_exercises(exercises)
 
-    if not body_parts:
+    if not catalog.body_parts:
         raise ValueError("운동 데이터에 '신체부위' 정보가 없습니다.")
 
-    history = load_history()
-    today = (today_date if today_date else dt.date.today()).isoformat()
-    user_hist = history.get(user_id, {})
-    last_date = user_hist.get("last_date")
-    last_body = user_hist.get("last_body")
-    today_ex = user_hist.get("today_exercise")
+    if store is None:
+        store = get_history_store()
+    today = today_date if today_date else dt.date.today()
+    user_hist = store.get(user_id)
 
     # 1) 오늘 이미 추천한 운동이 있으면 그대로 사용
-    if last_date == today and today_ex:
+    today_ex = todays_exercise(catalog, user_hist, today)
+    if today_ex:
         return today_ex
 
-    # 2) 어제와 다른 부위 선택 (가능하면)
+    # 2)~3) 어제와 다른 부위 중에서 운동 선택
+    record = _assign_record(catalog, user_id, today, (user_hist or {}).get("last_body"))
+
+    # 4) 히스토리 업데이트 (해당 사용자 행만 upsert)
+    store.put(user_id, record)
+
+    return catalog.exercises[record["exercise_index"]]
+
+
+def todays_exercise(catalog: ExerciseCatalog, record: Dict | None, day: dt.date) -> Dict | None:
+    """이력 레코드가 day의 배정이면 카탈로그에서 운동 정보를 되살려 반환 (아니면 None)"""
+    if not record or record.get("last_day") != day.toordinal():
+        return None
+    idx = record.get("exercise_index")
+    if idx is None or not 0 <= idx < len(catalog.exercises):
+        # 카탈로그가 바뀌어 인덱스가 범위를 벗어나면 다시 배정
+        return None
+    return catalog.exercises[idx]
+
+
+def selection_hash(user_id: str, today: str, catalog_version: str) -> int:
+    """(user_id, 날짜, 카탈로그 버전)에 대한 상태 없는 64비트 해시"""
+    digest = hashlib.blake2b(
+        f"{user_id}|{today}|{catalog_version}".encode("utf-8"), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big")
+
+
+def pick_exercise(
+    catalog: ExerciseCatalog,
+    user_id: str,
+    today: str,
+    last_body: str | None,
+) -> tuple[str, Dict]:
+    """
+    오늘의 (부위, 운동)을 해시로 결정한다.
+    같은 (user_id, 날짜, 카탈로그 버전, 직전 부위)면 어느 워커에서 계산해도 같은 결과이므로
+    미리 계산하거나 하루치 요청을 재현(벤치마크)할 수 있다.
+    """
+    h = selection_hash(user_id, today, catalog.version)
+    body_parts = catalog.body_parts
+
+    # 어제와 다른 부위 선택 (가능하면)
     candidate_bodies = [b for b in body_parts if b != last_body] or body_parts
-    chosen_body = random.choice(candidate_bodies)
+    chosen_body = candidate_bodies[h % len(candidate_bodies)]
+
+    # 그 부위 안에서 1개 운동 선택 (해시의 상위 비트 사용)
+    exercises = catalog.by_body_part[chosen_body]
+    return chosen_body, exercises[(h >> 32) % len(exercises)]
 
-    # 3) 그 부위 안에서 랜덤으로 1개 운동 선택
-    chosen_ex = random.choice(grouped[chosen_body])
 
-    # 4) 히스토리 업데이트
-    history[user_id] = {
-        "last_date": today,
+def _assign_record(catalog: ExerciseCatalog, user_id: str, day: dt.date, last_body: str | None) -> Dict:
+    chosen_body, chosen_ex = pick_exercise(catalog, user_id, day.isoformat(), last_body)
+    return {
+        "last_day": day.toordinal(),
         "last_body": chosen_body,
-        "today_exercise": chosen_ex,
+        "exercise_index": catalog.index_of(chosen_ex),
     }
-    save_history(history)
 
-    return chosen_ex
\ No newline at end of file
+
+def assign_exercises_for_day(
+    catalog: ExerciseCatalog,
+    user_ids: List[str],
+    day: dt.date,
+    store: ExerciseHistoryStore | WriteBehindHistoryStore,
+    batch_size: int = 5000,
+) -> Dict[str, int]:
+    """
+    모든 사용자의 오늘의 운동을 한 번에 배정하는 일일 배치.
+
+    - 직전 배정의 부위(last_body)를 피하는 규칙은 choose_exercise_for_today와 동일
+    - (user_id, 날짜, 카탈로그 버전) 해시로 선택하므로 재현 가능
+    - batch_size 명씩 이력을 묶어서 조회/저장
+    - 이미 오늘 배정된 사용자는 그대로 둔다
+
+    이후 알림 요청은 저장소에서 키 조회만 하면 된다.
+
+    Returns:
+        {"assigned": 새로 배정한 수, "skipped": 이미 배정되어 있던 수}
+    """
+    if not catalog.body_parts:
+        raise ValueError("운동 데이터에 '신체부위' 정보가 없습니다.")
+
+    assigned = 0
+    skipped = 0
+    for i in range(0, len(user_ids), batch_size):
+        chunk = user_ids[i:i + batch_size]
+        history = store.get_many(chunk)
+        records: Dict[str, Dict] = {}
+        for user_id in chunk:
+            user_hist = history.get(user_id)
+            if todays_exercise(catalog, user_hist, day):
+                skipped += 1
+                continue
+            records[user_id] = _assign_record(catalog, user_id, day, (user_hist or {}).get("last_body"))
+        store.put_many(records)
+        assigned += len(records)
+    return {"assigned": assigned, "skipped": skipped}
\ No newline at end of file
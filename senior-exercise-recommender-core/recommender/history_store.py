@@ -0,0 +1,640 @@
+"""
+사용자별 운동 추천 이력 저장소 (SQLite)
+
+user_id를 기본키로 한 행 단위 조회/upsert라서 사용자 수와 무관하게 O(1) I/O.
+여러 워커 프로세스가 같은 파일을 써도 행 단위로 반영되어 서로의 기록을 덮어쓰지 않는다.
+
+행은 운동 정보를 통째로 담지 않고 정수 몇 개만 저장한다.
+    user_id, 날짜(day ordinal), 신체부위 코드, 운동 카탈로그 인덱스
+운동 정보는 읽을 때 카탈로그에서 되살린다 (exercise_recommender.todays_exercise).
+
+db/exercise_history.json(과 예전 형식의 exercise_history 테이블)은 가져오기(import) 용도로만 사용한다.
+저장소가 처음 만들어질 때 JSON 파일이 있으면 자동으로 옮겨 담는다.
+변환/가져오기는 BEGIN IMMEDIATE 트랜잭션 안에서 하고 history_meta에 완료 표시를 남기므로
+여러 워커가 동시에 열어도 한 번만 실행된다.
+"""
+import os
+import re
+import time
+import atexit
+import json
+import sqlite3
+import threading
+import datetime as dt
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+HISTORY_DB_FILE = BASE_DIR / "db" / "exercise_history.sqlite3"
+LEGACY_HISTORY_FILE = BASE_DIR / "db" / "exercise_history.json"
+
+_CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS body_part (
+    code INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS exercise_history (
+    user_id TEXT PRIMARY KEY,
+    last_day INTEGER NOT NULL,
+    body_code INTEGER,
+    exercise_index INTEGER
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS history_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# history_meta의 완료 표시: 이 버전까지 변환/가져오기를 마친 저장소
+SCHEMA_VERSION = 2
+
+
+def _default_index_of() -> Callable[[Dict], Optional[int]]:
+    from .exercise_catalog import get_exercise_catalog
+
+    return get_exercise_catalog().index_of
+
+
+def compact_legacy_record(
+    record: Dict,
+    index_of: Callable[[Dict], Optional[int]],
+) -> Optional[Dict]:
+    """
+    예전 형식 {"last_date": "YYYY-MM-DD", "last_body": ..., "today_exercise": {...}}을
+    압축 형식으로 변환 (날짜가 없거나 잘못되면 None)
+    """
+    if not isinstance(record, dict) or not record.get("last_date"):
+        return None
+    try:
+        last_day = dt.date.fromisoformat(record["last_date"]).toordinal()
+    except (TypeError, ValueError):
+        return None
+    exercise = record.get("today_exercise")
+    return {
+        "last_day": last_day,
+        "last_body": record.get("last_body"),
+        "exercise_index": index_of(exercise) if isinstance(exercise, dict) else None,
+    }
+
+
+class ExerciseHistoryStore:
+    """
+    이력 레코드 형식:
+        {"last_day": 739543, "last_body": "어깨", "exercise_index": 12}
+    - last_day: 마지막 배정 날짜의 date.toordinal()
+    - exercise_index: 운동 카탈로그(ExerciseCatalog.exercises) 내 위치
+    신체부위 이름은 body_part 테이블의 정수 코드로 저장한다.
+    """
+
+    def __init__(self, path: Path = HISTORY_DB_FILE, import_path: Optional[Path] = LEGACY_HISTORY_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        # 여러 프로세스가 동시에 읽고 쓸 수 있도록 WAL 모드 사용
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._body_codes: Dict[str, int] = {}
+        self._body_names: Dict[int, str] = {}
+
+        migrated_legacy = self._open_schema(import_path)
+        self._reload_body_parts()
+        if migrated_legacy:
+            # 변환이 끝난 예전 테이블 공간 회수 (트랜잭션 밖에서만 가능)
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    # ----- 예전 형식 마이그레이션 -----
+
+    def _open_schema(self, import_path: Optional[Path]) -> bool:
+        """
+        테이블 생성, 예전 형식 테이블 변환, JSON 가져오기를 BEGIN IMMEDIATE 트랜잭션 하나로 처리.
+        다른 워커는 잠금이 풀릴 때까지 기다렸다가 완료 표시(schema_version)를 보고 가져오기를 건너뛴다.
+        예전 형식 테이블을 변환했으면 True.
+        """
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            has_legacy = self._detach_legacy_table()
+            for statement in _CREATE_TABLES.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            self._reload_body_parts()
+            if has_legacy:
+                self._migrate_legacy_table()
+
+            row = conn.execute("SELECT value FROM history_meta WHERE key = 'schema_version'").fetchone()
+            if row is None or int(row[0]) < SCHEMA_VERSION:
+                # 완료 표시가 없을 때만 가져오기 (익명 이력이 모두 만료돼 비어도 다시 가져오지 않음)
+                empty = conn.execute("SELECT COUNT(*) FROM exercise_history").fetchone()[0] == 0
+                if import_path is not None and Path(import_path).exists() and empty:
+                    self._upsert_rows(self._read_json_records(Path(import_path)))
+                conn.execute(
+                    "INSERT OR REPLACE INTO history_meta (key, value) VALUES ('schema_version', ?)",
+                    (str(SCHEMA_VERSION),),
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return has_legacy
+
+    def _table_columns(self, table: str) -> set:
+        return {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+
+    def _detach_legacy_table(self) -> bool:
+        """
+        예전 형식(today_exercise JSON 컬럼) 테이블을 exercise_history_legacy로 옮겨 둔다.
+        옮겨 둔 테이블은 압축 형식으로 변환이 끝난 뒤에 지운다 (중간에 멈추면 다음 시작 시 이어서 변환).
+        """
+        if "today_exercise" in self._table_columns("exercise_history"):
+            self._conn.execute("ALTER TABLE exercise_history RENAME TO exercise_history_legacy")
+        return bool(self._table_columns("exercise_history_legacy"))
+
+    def _migrate_legacy_table(self) -> int:
+        rows = self._conn.execute(
+            "SELECT user_id, last_date, last_body, today_exercise FROM exercise_history_legacy"
+        ).fetchall()
+        index_of = _default_index_of()
+        records = {}
+        for user_id, last_date, last_body, today_exercise in rows:
+            record = compact_legacy_record(
+                {
+                    "last_date": last_date,
+                    "last_body": last_body,
+                    "today_exercise": json.loads(today_exercise) if today_exercise else None,
+                },
+                index_of,
+            )
+            if record is not None:
+                records[user_id] = record
+        # _open_schema의 트랜잭션 안: 변환 결과 저장과 예전 테이블 삭제가 함께 커밋된다
+        self._upsert_rows(records)
+        self._conn.execute("DROP TABLE exercise_history_legacy")
+        return len(records)
+
+    # ----- 신체부위 코드 -----
+
+    def _reload_body_parts(self) -> None:
+        rows = self._conn.execute("SELECT code, name FROM body_part").fetchall()
+        self._body_names = {code: name for code, name in rows}
+        self._body_codes = {name: code for code, name in rows}
+
+    def _body_name(self, code: Optional[int]) -> Optional[str]:
+        if code is None:
+            return None
+        if code not in self._body_names:
+            # 다른 프로세스가 추가한 코드
+            self._reload_body_parts()
+        return self._body_names.get(code)
+
+    def _ensure_body_codes(self, names: Iterable[Optional[str]]) -> None:
+        missing = {name for name in names if name is not None and name not in self._body_codes}
+        if not missing:
+            return
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO body_part (name) VALUES (?)", [(name,) for name in missing]
+        )
+        self._reload_body_parts()
+
+    def _row_to_record(self, row: Tuple) -> Dict:
+        last_day, body_code, exercise_index = row
+        return {
+            "last_day": last_day,
+            "last_body": self._body_name(body_code),
+            "exercise_index": exercise_index,
+        }
+
+    # ----- 조회 / 저장 -----
+
+    def get(self, user_id: str) -> Optional[Dict]:
+        """user_id의 이력 조회 (없으면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_day, body_code, exercise_index FROM exercise_history WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+            return self._row_to_record(row) if row is not None else None
+
+    def get_many(self, user_ids: Iterable[str]) -> Dict[str, Dict]:
+        """여러 사용자의 이력을 한 번에 조회 (이력이 없는 사용자는 결과에서 빠짐)"""
+        user_ids = list(user_ids)
+        result: Dict[str, Dict] = {}
+        # SQLite 바인딩 변수 개수 제한을 넘지 않도록 나눠서 조회
+        for i in range(0, len(user_ids), 500):
+            chunk = user_ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT user_id, last_day, body_code, exercise_index "
+                    f"FROM exercise_history WHERE user_id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for user_id, *row in rows:
+                    result[user_id] = self._row_to_record(row)
+        return result
+
+    def put(self, user_id: str, record: Dict) -> None:
+        """user_id의 이력 저장 (upsert)"""
+        self.put_many({user_id: record})
+
+    def put_many(self, records: Dict[str, Dict]) -> None:
+        """여러 사용자의 이력을 한 트랜잭션으로 저장 (upsert)"""
+        if not records:
+            return
+        with self._lock:
+            with self._conn:
+                self._upsert_rows(records)
+
+    def _upsert_rows(self, records: Dict[str, Dict]) -> None:
+        """put_many 본체 (트랜잭션은 호출자가 관리)"""
+        self._ensure_body_codes(record.get("last_body") for record in records.values())
+        rows = [
+            (
+                user_id,
+                record["last_day"],
+                self._body_codes.get(record.get("last_body")),
+                record.get("exercise_index"),
+            )
+            for user_id, record in records.items()
+        ]
+        self._conn.executemany(
+            """
+            INSERT INTO exercise_history (user_id, last_day, body_code, exercise_index)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                last_day = excluded.last_day,
+                body_code = excluded.body_code,
+                exercise_index = excluded.exercise_index
+            """,
+            rows,
+        )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM exercise_history").fetchone()[0]
+
+    def expire(
+        self,
+        prefixes: Iterable[str],
+        before_day: int,
+        match: Optional[Callable[[str], object]] = None,
+    ) -> int:
+        """
+        user_id가 prefixes 중 하나로 시작하고 last_day가 before_day보다 이전인 이력 삭제.
+        (기본키 범위 검색이라 전체 테이블을 훑지 않음) 삭제한 행 수 반환.
+        match를 주면 범위 안에서 match(user_id)가 참인 키만 지운다.
+        """
+        deleted = 0
+        with self._lock:
+            with self._conn:
+                for prefix in prefixes:
+                    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+                    if match is None:
+                        cur = self._conn.execute(
+                            "DELETE FROM exercise_history "
+                            "WHERE user_id >= ? AND user_id < ? AND last_day < ?",
+                            (prefix, upper, before_day),
+                        )
+                        deleted += cur.rowcount
+                        continue
+                    user_ids = [
+                        (user_id,)
+                        for (user_id,) in self._conn.execute(
+                            "SELECT user_id FROM exercise_history "
+                            "WHERE user_id >= ? AND user_id < ? AND last_day < ?",
+                            (prefix, upper, before_day),
+                        )
+                        if match(user_id)
+                    ]
+                    self._conn.executemany("DELETE FROM exercise_history WHERE user_id = ?", user_ids)
+                    deleted += len(user_ids)
+        return deleted
+
+    def import_json(
+        self,
+        path: Path = LEGACY_HISTORY_FILE,
+        index_of: Optional[Callable[[Dict], Optional[int]]] = None,
+    ) -> int:
+        """
+        기존 exercise_history.json 내용을 압축 형식으로 변환해 저장소로 가져온다.
+        today_exercise는 카탈로그 인덱스로 바꾼다. 가져온 사용자 수 반환.
+        """
+        records = self._read_json_records(path, index_of)
+        self.put_many(records)
+        return len(records)
+
+    @staticmethod
+    def _read_json_records(
+        path: Path,
+        index_of: Optional[Callable[[Dict], Optional[int]]] = None,
+    ) -> Dict[str, Dict]:
+        """exercise_history.json → 압축 형식 레코드 (읽을 수 없으면 빈 dict)"""
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                history = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        index_of = index_of or _default_index_of()
+        records = {}
+        for user_id, record in history.items():
+            compact = compact_legacy_record(record, index_of)
+            if compact is not None:
+                records[user_id] = compact
+        return records
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class WriteBehindHistoryStore:
+    """
+    이력 저장소 앞단의 write-behind 버퍼.
+
+    - put()은 메모리에만 기록하고 바로 반환 (응답 경로에서 디스크 쓰기 제거)
+    - 백그라운드 스레드가 flush_interval 초마다, 또는 쌓인 건수가 flush_batch_size에
+      도달하면 즉시 put_many로 한꺼번에 저장
+    - get()은 아직 저장되지 않은(또는 저장 중인) 기록을 먼저 확인하므로
+      같은 프로세스 안에서는 항상 자신이 쓴 값을 읽는다 (read-your-writes)
+    - 저장이 끝난 기록과 저장소에서 읽은 기록은 최대 cache_size개까지 LRU로 메모리에 두어
+      다시 읽을 때 SQLite를 거치지 않는다
+      (다른 워커 프로세스가 같은 user_id를 쓰면 이 워커의 캐시는 그 값을 보지 못한다)
+    - close() 시 남은 기록을 모두 저장하고, 이후의 쓰기는 거부한다
+    """
+
+    def __init__(
+        self,
+        backing: ExerciseHistoryStore,
+        flush_interval: float = 1.0,
+        flush_batch_size: int = 500,
+        cache_size: int = 10000,
+    ):
+        self.backing = backing
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.cache_size = cache_size
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty: Dict[str, Dict] = {}
+        self._inflight: Dict[str, Dict] = {}
+        self._clean: "OrderedDict[str, Dict]" = OrderedDict()
+        self._wakeup = threading.Event()
+        # closing: 새 쓰기를 버퍼에 받지 않음 / closed: 저장소까지 닫힘
+        self._closing = False
+        self._closed = False
+
+        self._stats = {
+            "flushes": 0,
+            "flushed_records": 0,
+            "flush_errors": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "total_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "max_queue_depth": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name="history-write-behind", daemon=True)
+        self._thread.start()
+
+    def _cached(self, user_id: str) -> Optional[Dict]:
+        """버퍼(dirty / inflight) 또는 읽기 캐시의 기록 (self._lock 안에서 호출)"""
+        record = self._dirty.get(user_id) or self._inflight.get(user_id)
+        if record is None:
+            record = self._clean.get(user_id)
+            if record is not None:
+                self._clean.move_to_end(user_id)
+        return record
+
+    def _remember(self, records: Dict[str, Dict]) -> None:
+        """저장된(또는 저장소에서 읽은) 기록을 읽기 캐시에 넣고 cache_size를 넘으면 오래된 것부터 버림 (self._lock 안에서 호출)"""
+        if self.cache_size <= 0:
+            return
+        for user_id, record in records.items():
+            self._clean[user_id] = record
+            self._clean.move_to_end(user_id)
+        while len(self._clean) > self.cache_size:
+            self._clean.popitem(last=False)
+
+    def get(self, user_id: str) -> Optional[Dict]:
+        with self._lock:
+            record = self._cached(user_id)
+            self._stats["cache_hits" if record is not None else "cache_misses"] += 1
+        if record is not None:
+            return record
+        record = self.backing.get(user_id)
+        if record is not None:
+            with self._lock:
+                # 읽는 사이 새로 쓰인 값이 있으면 캐시에 넣지 않음
+                if user_id not in self._dirty and user_id not in self._inflight:
+                    self._remember({user_id: record})
+        return record
+
+    def get_many(self, user_ids: Iterable[str]) -> Dict[str, Dict]:
+        result: Dict[str, Dict] = {}
+        missing = []
+        with self._lock:
+            for user_id in user_ids:
+                record = self._cached(user_id)
+                if record is not None:
+                    result[user_id] = record
+                else:
+                    missing.append(user_id)
+            self._stats["cache_hits"] += len(result)
+            self._stats["cache_misses"] += len(missing)
+        if missing:
+            loaded = self.backing.get_many(missing)
+            with self._lock:
+                for user_id, record in loaded.items():
+                    # 읽는 사이 새로 쓰인 값이 있으면 그 값을 돌려줌
+                    newer = self._dirty.get(user_id) or self._inflight.get(user_id)
+                    result[user_id] = newer or record
+                    if newer is None:
+                        self._remember({user_id: record})
+        return result
+
+    def put(self, user_id: str, record: Dict) -> None:
+        self.put_many({user_id: record})
+
+    def put_many(self, records: Dict[str, Dict]) -> None:
+        if not records:
+            return
+        with self._lock:
+            # 종료 여부 확인과 버퍼 추가를 같은 잠금 안에서 해야 close()의 마지막 flush가 놓치지 않는다
+            if not self._closing:
+                self._dirty.update(records)
+                depth = len(self._dirty)
+                if depth > self._stats["max_queue_depth"]:
+                    self._stats["max_queue_depth"] = depth
+                buffered = True
+            else:
+                buffered = False
+        if buffered:
+            if depth >= self.flush_batch_size:
+                self._wakeup.set()
+            return
+
+        # 종료 중에는 버퍼를 거치지 않고 바로 저장, 저장소가 닫힌 뒤에는 거부
+        with self._flush_lock:
+            if self._closed:
+                raise RuntimeError("운동 이력 저장소가 이미 닫혔습니다.")
+            self.backing.put_many(records)
+        with self._lock:
+            self._remember(records)
+
+    def count(self) -> int:
+        self.flush()
+        return self.backing.count()
+
+    def expire(
+        self,
+        prefixes: Iterable[str],
+        before_day: int,
+        match: Optional[Callable[[str], object]] = None,
+    ) -> int:
+        self.flush()
+        deleted = self.backing.expire(prefixes, before_day, match)
+        if deleted:
+            # 삭제된 기록이 읽기 캐시에 남지 않도록 (드문 작업이라 캐시를 통째로 비움)
+            with self._lock:
+                self._clean.clear()
+        return deleted
+
+    def flush(self) -> int:
+        """버퍼에 쌓인 기록을 저장소에 기록. 저장한 건수 반환."""
+        with self._flush_lock:
+            return self._flush_locked()
+
+    def _flush_locked(self) -> int:
+        """flush 본체 (self._flush_lock 안에서 호출)"""
+        if self._closed:
+            return 0
+        with self._lock:
+            if not self._dirty:
+                return 0
+            self._inflight, self._dirty = self._dirty, {}
+            batch = self._inflight
+
+        start = time.perf_counter()
+        try:
+            self.backing.put_many(batch)
+        except Exception as e:
+            print(f"운동 이력 저장 실패 (다음 주기에 재시도): {e}")
+            with self._lock:
+                # 그 사이 새로 쓰인 값이 있으면 그 값을 유지
+                for user_id, record in batch.items():
+                    self._dirty.setdefault(user_id, record)
+                self._inflight = {}
+                self._stats["flush_errors"] += 1
+            return 0
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self._inflight = {}
+            # 저장이 끝난 기록은 읽기 캐시로 (그 사이 다시 쓰인 user_id는 dirty에 있으므로 그쪽이 우선)
+            self._remember(batch)
+            stats = self._stats
+            stats["flushes"] += 1
+            stats["flushed_records"] += len(batch)
+            stats["last_batch_size"] = len(batch)
+            stats["max_batch_size"] = max(stats["max_batch_size"], len(batch))
+            stats["total_flush_ms"] += elapsed_ms
+            stats["max_flush_ms"] = max(stats["max_flush_ms"], elapsed_ms)
+        return len(batch)
+
+    def stats(self) -> Dict:
+        """flush 배치 크기, flush 지연(ms), 대기열 길이 등 측정값"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["queue_depth"] = len(self._dirty)
+            stats["cache_size"] = len(self._clean)
+        stats["avg_flush_ms"] = stats["total_flush_ms"] / stats["flushes"] if stats["flushes"] else 0.0
+        return stats
+
+    def close(self) -> None:
+        """백그라운드 스레드를 멈추고 남은 기록을 저장 (이후 put은 RuntimeError)"""
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+        self._wakeup.set()
+        self._thread.join(timeout=self.flush_interval + 5)
+        with self._flush_lock:
+            self._flush_locked()
+            self.backing.close()
+            self._closed = True
+
+    def _run(self) -> None:
+        while not self._closing:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+# 익명 사용자 이력 (recommender.utils.anonymous_user_key) 만료 대상
+ANONYMOUS_PREFIXES = ("anon:",)
+# 예전 익명 키 f"user_{lat}_{lon}" (위경도 float 그대로): "user_"로 시작하는 다른 id는 지우지 않도록 형식 전체를 확인
+LEGACY_ANONYMOUS_PREFIX = "user_"
+LEGACY_ANONYMOUS_KEY = re.compile(r"user_-?\d+\.\d+(?:e[-+]?\d+)?_-?\d+\.\d+(?:e[-+]?\d+)?")
+
+
+def expire_anonymous_history(store, ttl_days: Optional[int] = None, today: Optional[dt.date] = None) -> int:
+    """
+    마지막 배정 후 ttl_days(기본: ANON_HISTORY_TTL_DAYS 환경변수, 30일)가 지난 익명 사용자 이력 삭제.
+    로그인 사용자 이력(숫자 user_id)과 "user_"로 시작하지만 예전 위경도 키 형식이 아닌 id는 지우지 않는다.
+    """
+    if ttl_days is None:
+        ttl_days = int(os.getenv("ANON_HISTORY_TTL_DAYS", "30"))
+    today = today or dt.date.today()
+    before_day = today.toordinal() - ttl_days
+    return (
+        store.expire(ANONYMOUS_PREFIXES, before_day)
+        + store.expire((LEGACY_ANONYMOUS_PREFIX,), before_day, LEGACY_ANONYMOUS_KEY.fullmatch)
+    )
+
+
+_default_store: Optional[WriteBehindHistoryStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_history_store() -> WriteBehindHistoryStore:
+    """
+    프로세스 공용 이력 저장소 (처음 호출 시 생성, 이때 오래된 익명 사용자 이력을 정리).
+    HISTORY_FLUSH_INTERVAL_SEC, HISTORY_FLUSH_BATCH_SIZE 환경변수로 flush 주기/크기,
+    HISTORY_CACHE_SIZE로 읽기 캐시 크기 조절.
+    """
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = WriteBehindHistoryStore(
+                    ExerciseHistoryStore(),
+                    flush_interval=float(os.getenv("HISTORY_FLUSH_INTERVAL_SEC", "1.0")),
+                    flush_batch_size=int(os.getenv("HISTORY_FLUSH_BATCH_SIZE", "500")),
+                    cache_size=int(os.getenv("HISTORY_CACHE_SIZE", "10000")),
+                )
+                # 프로세스 종료 시 남은 기록 저장
+                atexit.register(close_history_store)
+                expired = expire_anonymous_history(_default_store.backing)
+                if expired:
+                    print(f"만료된 익명 사용자 운동 이력 {expired}건 삭제")
+    return _default_store
+
+
+def history_store_stats() -> Optional[Dict]:
+    """공용 이력 저장소의 write-behind 측정값 (아직 생성 전이면 None)"""
+    return _default_store.stats() if _default_store is not None else None
+
+
+def close_history_store() -> None:
+    """공용 이력 저장소 종료 (남은 기록 flush)"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is not None:
+            _default_store.close()
+            _default_store = None
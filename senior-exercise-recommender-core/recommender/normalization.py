@@ -0,0 +1,162 @@
+# recommender/normalization.py
+"""
+facility_program_master 레코드 → 카탈로그 행 정규화
+
+레코드(시설) 묶음을 DataFrame 하나로 받아 컬럼 단위 연산으로
+- 시설 필드 정리 (이름/주소 공백 제거, 실내여부 → bool, 종목 없으면 'general')
+- programs 펼치기 (프로그램마다 한 행, 프로그램이 없는 시설은 program_name '' 한 행)
+- schedules를 주간 비트마스크(schedule_mask)로 파싱하고, 가장 이른 시간대로 operating_hours 라벨 생성
+- 대중교통 접근성 필드를 숫자 컬럼으로 정리하고 accessibility_score(0~1) 미리 계산
+- senior_friendly / intensity_level 채우기
+를 한 번에 처리한다.
+
+pipeline.load_facility_master(런타임 로더), scripts/convert_json_to_parquet.py(오프라인 빌드),
+증분 빌드 delta 반영이 모두 이 함수를 사용한다.
+"""
+from typing import Any, Dict, Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+from .schedule import operating_hours_labels, schedule_masks
+from .scoring import accessibility_scores
+
+# 시니어 프로그램 CSV의 대중교통 접근성 필드 (시설 단위)
+TRANSIT_FIELDS = [
+    "nearest_walk_time_sec",
+    "nearest_walk_distance_m",
+    "has_subway_within_600m",
+    "num_transit_within_300m",
+]
+
+# master 레코드 필드
+MASTER_FIELDS = [
+    "fac_uid", "시설명", "주소", "시설위도", "시설경도", "실내여부", "시설유형명", "programs",
+    *TRANSIT_FIELDS,
+]
+
+# 정규화 결과 컬럼 (fac_id는 pipeline에서 fac_uid로 붙임)
+NORMALIZED_COLUMNS = [
+    "fac_uid", "fac_name", "address",
+    "lat", "lon",
+    "is_indoor",
+    "sport_category",
+    "program_name",
+    "intensity_level",
+    "senior_friendly",
+    "operating_hours",
+    "schedule_mask",
+    *TRANSIT_FIELDS,
+    "accessibility_score",
+]
+
+DEFAULT_INTENSITY = "medium"
+DEFAULT_OPERATING_HOURS = "평일 오전"
+
+# 지하철 여부 플래그로 인정하는 표기 (소문자 비교)
+_TRUE_FLAGS = ["true", "1", "1.0", "y", "yes", "o", "예", "있음"]
+_FALSE_FLAGS = ["false", "0", "0.0", "n", "no", "x", "아니오", "없음"]
+
+
+def _text(values: pd.Series) -> pd.Series:
+    """결측은 '', 나머지는 문자열로 바꿔 앞뒤 공백 제거"""
+    return values.where(values.notna(), "").astype(str).str.strip()
+
+
+# 프로그램 정보가 없는 시설의 자리표시 (시설만 추천하는 행 하나)
+_NO_PROGRAM: Dict[str, Any] = {}
+
+
+def _program_items(value: Any) -> list:
+    """레코드의 programs를 펼칠 목록으로 (없으면 자리표시 하나, dict 하나면 [dict], 그 외 형식은 행 없음)"""
+    if isinstance(value, list):
+        return value if value else [_NO_PROGRAM]
+    if isinstance(value, dict):
+        return [value]
+    if value is None or value == "" or (isinstance(value, float) and np.isnan(value)):
+        return [_NO_PROGRAM]
+    return []
+
+
+def typed_transit_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    TRANSIT_FIELDS를 float 컬럼으로 (없는 컬럼이나 해석할 수 없는 값은 NaN).
+    has_subway_within_600m은 True/False, Y/N, 1/0 표기를 1.0/0.0으로.
+    """
+    typed = {}
+    for field in TRANSIT_FIELDS:
+        values = df[field] if field in df.columns else pd.Series(np.nan, index=df.index)
+        if field == "has_subway_within_600m":
+            flag = _text(values).str.lower()
+            typed[field] = np.select(
+                [flag.isin(_TRUE_FLAGS), flag.isin(_FALSE_FLAGS)], [1.0, 0.0], default=np.nan,
+            )
+        else:
+            typed[field] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    return pd.DataFrame(typed, index=df.index)
+
+
+def _master_frame(records: Union[pd.DataFrame, Iterable[Dict[str, Any]]]) -> pd.DataFrame:
+    if isinstance(records, pd.DataFrame):
+        return records.reindex(columns=MASTER_FIELDS).reset_index(drop=True)
+    records = list(records)
+    # 레코드 dict 목록은 필드별 리스트로 바로 모은다 (DataFrame(list of dict)보다 빠름)
+    return pd.DataFrame({field: [r.get(field) for r in records] for field in MASTER_FIELDS})
+
+
+def normalize_facility_records(
+    records: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+) -> pd.DataFrame:
+    """
+    master 레코드 묶음을 카탈로그 행(NORMALIZED_COLUMNS)으로 변환.
+    좌표나 시설명이 없는 레코드, 이름 없는 프로그램은 제외한다.
+    """
+    df = _master_frame(records)
+    if df.empty:
+        return pd.DataFrame(columns=NORMALIZED_COLUMNS)
+
+    # 1) 시설 단위 필드
+    indoor = _text(df["실내여부"])
+    sport_category = _text(df["시설유형명"])
+    facilities = pd.DataFrame({
+        "fac_uid": df["fac_uid"],
+        "fac_name": _text(df["시설명"]),
+        "address": _text(df["주소"]),
+        "lat": pd.to_numeric(df["시설위도"], errors="coerce").astype(float),
+        "lon": pd.to_numeric(df["시설경도"], errors="coerce").astype(float),
+        "is_indoor": (indoor == "실내") | (indoor == ""),
+        "sport_category": sport_category.mask(sport_category == "", "general"),
+    })
+    # 대중교통 접근성: 점수는 빈 값을 반영해 먼저 계산하고,
+    # 카탈로그에는 도보 시간/거리는 NaN 유지, 지하철 여부는 bool, 정류장 수는 정수(없으면 0)로 저장
+    transit = typed_transit_columns(df)
+    facilities["nearest_walk_time_sec"] = transit["nearest_walk_time_sec"]
+    facilities["nearest_walk_distance_m"] = transit["nearest_walk_distance_m"]
+    facilities["has_subway_within_600m"] = transit["has_subway_within_600m"].to_numpy() == 1.0
+    facilities["num_transit_within_300m"] = transit["num_transit_within_300m"].fillna(0).astype("int32")
+    facilities["accessibility_score"] = accessibility_scores(
+        transit["nearest_walk_time_sec"], transit["nearest_walk_distance_m"],
+        transit["has_subway_within_600m"], transit["num_transit_within_300m"],
+    )
+    valid = facilities["lat"].notna() & facilities["lon"].notna() & (facilities["fac_name"] != "")
+
+    # 2) programs 펼치기 (index = 레코드 위치)
+    exploded = pd.Series([_program_items(v) for v in df["programs"]], index=df.index).explode().dropna()
+    items = exploded.tolist()
+    is_default = np.fromiter((program is _NO_PROGRAM for program in items), dtype=bool, count=len(items))
+    names = [program.get("program_name") if isinstance(program, dict) else None for program in items]
+    schedules = [program.get("schedules") if isinstance(program, dict) else None for program in items]
+    program_name = _text(pd.Series(names, index=exploded.index, dtype=object))
+    keep = (is_default | (program_name != "").to_numpy()) & valid.reindex(exploded.index).to_numpy()
+    program_name = program_name[keep]
+    masks = schedule_masks(schedules)[keep]
+
+    rows = facilities.loc[program_name.index].reset_index(drop=True)
+    rows["program_name"] = program_name.to_numpy()
+    # 강도 정보가 없으므로 기본값, 시니어 대상 카탈로그라 senior_friendly는 모두 True
+    rows["intensity_level"] = DEFAULT_INTENSITY
+    rows["senior_friendly"] = True
+    # 3) schedules → 요일×시간 슬롯 비트마스크, 가장 이른 시간대를 operating_hours로 (스케줄이 없으면 기본값)
+    rows["operating_hours"] = operating_hours_labels(masks, DEFAULT_OPERATING_HOURS)
+    rows["schedule_mask"] = masks
+    return rows[NORMALIZED_COLUMNS]
@@ -1,18 +1,148 @@
 # recommender/pipeline.py
-from typing import List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 import os
 import json
+import math
+import datetime as dt
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
 from .types import UserProfile, Location, WeatherInfo, Recommendation
-from .utils import haversine_distance_km
 from .rules import filter_by_health, filter_by_weather
-from .scoring import final_score
+from .scoring import score_frame
+from .catalog import CATALOG_COLUMNS, compact_catalog, empty_catalog_frame, get_facility_catalog
+from .normalization import normalize_facility_records
+from .schedule import open_in, window_mask
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 JSON_PATH = BASE_DIR / "data" / "processed" / "facility_program_master.json"
 
+# 스트리밍 변환 시 한 번에 정규화하는 master 레코드 수
+CATALOG_CHUNK_ROWS = 50_000
+# 같은 시설, 같은 프로그램, 같은 위치면 중복
+CATALOG_DEDUP_COLUMNS = ['fac_name', 'program_name', 'lat', 'lon']
+
+
+def haversine_distance_km_array(lat1: float, lon1: float, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """
+    utils.haversine_distance_km의 배열 버전: 한 지점(lat1, lon1)에서 여러 지점까지의 거리(km).
+    """
+    R = 6371.0  # 지구 반경(km)
+
+    r_lat1 = math.radians(lat1)
+    r_lat2 = np.radians(lat2)
+    d_lat = np.radians(lat2 - lat1)
+    d_lon = np.radians(lon2 - lon1)
+
+    a = np.sin(d_lat / 2) ** 2 + math.cos(r_lat1) * np.cos(r_lat2) * np.sin(d_lon / 2) ** 2
+    return R * 2 * np.arcsin(np.sqrt(a))
+
+
+def _assign_fac_ids(rows: pd.DataFrame, offset: int = 0, carry: Tuple[Any, int] = (None, 0)) -> Tuple[Any, int]:
+    """
+    정규화된 행에 fac_id를 붙이고, 다음 청크로 넘길 (마지막 fac_uid, 다음 순번)을 돌려준다.
+    - fac_uid가 있는 행(build_master가 만든 안정적인 시설 ID): "{fac_uid}-{시설 내 순번:02d}"
+      → 다시 빌드해도 같은 시설은 같은 fac_id (증분 빌드 delta 적용에 사용)
+      같은 fac_uid의 행은 master에서 연달아 나오므로 연속 구간마다 순번을 매긴다.
+    - 예전 형식(fac_uid 없음): 파일 내 순서 기반 "F{순번:06d}"
+    """
+    uid = rows['fac_uid'].where(rows['fac_uid'].notna(), '').astype(str)
+    run = (uid != uid.shift()).cumsum()
+    seq = rows.groupby(run.to_numpy()).cumcount().to_numpy()
+    last_uid, next_seq = carry
+    if len(uid) and uid.iloc[0] == last_uid:
+        seq = seq + np.where(run.to_numpy() == 1, next_seq, 0)
+
+    position = pd.Series(np.arange(offset, offset + len(rows)), index=rows.index).astype(str).str.zfill(6)
+    rows.insert(0, 'fac_id', np.where(
+        uid != '',
+        uid + '-' + pd.Series(seq, index=rows.index).astype(str).str.zfill(2),
+        'F' + position,
+    ))
+    if not len(uid):
+        return carry
+    tail = run == run.iloc[-1]
+    return uid.iloc[-1], int(seq[tail.to_numpy()][-1]) + 1
+
+
+def catalog_frame(records: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+    """master 레코드들을 fac_id가 붙은 카탈로그 행(CATALOG_COLUMNS)으로 변환"""
+    rows = normalize_facility_records(records)
+    _assign_fac_ids(rows)
+    return rows[CATALOG_COLUMNS]
+
+
+def iter_catalog_frames(
+    records: Iterable[Dict[str, Any]],
+    chunk_rows: int = CATALOG_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    master 레코드를 chunk_rows개씩 묶어 정규화한 카탈로그 DataFrame을 내보낸다.
+    (프로그램별로 펼치므로 청크의 행 수는 레코드 수보다 많을 수 있고, fac_id 순번은 청크 경계를 넘어 이어짐)
+    """
+    offset, carry = 0, (None, 0)
+    batch: List[Dict[str, Any]] = []
+
+    def flush() -> pd.DataFrame:
+        nonlocal offset, carry
+        rows = normalize_facility_records(batch)
+        carry = _assign_fac_ids(rows, offset, carry)
+        offset += len(rows)
+        return rows[CATALOG_COLUMNS]
+
+    for item in records:
+        batch.append(item)
+        if len(batch) >= chunk_rows:
+            frame = flush()
+            batch = []
+            if not frame.empty:
+                yield frame
+    if batch:
+        frame = flush()
+        if not frame.empty:
+            yield frame
+
+
+def iter_master_records(path: Path = JSON_PATH, buffer_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+    """
+    facility_program_master.json(레코드 배열)을 buffer_size 글자씩 읽으며 레코드를 하나씩 내보낸다.
+    json.load와 달리 파일 전체를 메모리에 올리지 않는다.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf, pos, started = '', 0, False
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos == len(buf):
+                buf, pos = f.read(buffer_size), 0
+                if not buf:
+                    raise ValueError(f'{path}: JSON 배열이 닫히지 않았습니다')
+                continue
+
+            if not started:
+                if buf[pos] != '[':
+                    raise ValueError(f'{path}: JSON 배열 형식이 아닙니다')
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == ']':
+                return
+
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # 레코드가 버퍼 경계에 걸친 경우 다음 블록을 이어 붙여 다시 시도
+                more = f.read(buffer_size)
+                if not more:
+                    raise
+                buf, pos = buf[pos:] + more, 0
+                continue
+            pos = end
+            yield item
+
+
 def load_facility_master() -> pd.DataFrame:
     """
     facility_program_master.json 파일을 직접 로드하여 DataFrame으로 변환.
@@ -20,197 +150,58 @@ def load_facility_master() -> pd.DataFrame:
     """
     if not JSON_PATH.exists():
         # 초기 개발 단계에서 데이터가 아직 없을 수 있음
-        return pd.DataFrame(columns=[
-            "fac_id", "fac_name", "address",
-            "lat", "lon",
-            "is_indoor",
-            "sport_category",
-            "program_name",
-            "intensity_level",
-            "senior_friendly",
-            "operating_hours",
-        ])
-    
-    # JSON 파일 로드
-    with open(JSON_PATH, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    if not data:
-        return pd.DataFrame(columns=[
-            "fac_id", "fac_name", "address",
-            "lat", "lon",
-            "is_indoor",
-            "sport_category",
-            "program_name",
-            "intensity_level",
-            "senior_friendly",
-            "operating_hours",
-        ])
-    
-    # JSON 데이터를 DataFrame으로 변환
-    rows = []
-    for idx, item in enumerate(data):
-        # 필수 필드 추출
-        fac_name = str(item.get('시설명', '')).strip() if pd.notna(item.get('시설명')) else ''
-        address = str(item.get('주소', '')).strip() if pd.notna(item.get('주소')) else ''
-        lat = item.get('시설위도')
-        lon = item.get('시설경도')
-        is_indoor_str = str(item.get('실내여부', '')).strip() if pd.notna(item.get('실내여부')) else ''
-        sport_category = str(item.get('시설유형명', '')).strip() if pd.notna(item.get('시설유형명')) else ''
-        
-        # 좌표가 유효한지 확인
-        if pd.isna(lat) or pd.isna(lon) or not fac_name:
-            continue
-        
-        # 실내여부 변환
-        is_indoor = is_indoor_str == '실내' if is_indoor_str else True
-        
-        # 프로그램 정보 처리
-        programs = item.get('programs')
-        
-        # programs가 배열이거나 NaN인지 확인
-        is_programs_empty = (
-            pd.isna(programs) if not isinstance(programs, (list, dict)) else False
-        ) or programs is None or programs == '' or (isinstance(programs, list) and len(programs) == 0)
-        
-        if is_programs_empty:
-            # 프로그램 정보가 없으면 시설만 추천 (프로그램명 없음)
-            rows.append({
-                'fac_id': f'F{len(rows):06d}',
-                'fac_name': fac_name,
-                'address': address,
-                'lat': float(lat),
-                'lon': float(lon),
-                'is_indoor': is_indoor,
-                'sport_category': sport_category if sport_category else 'general',
-                'program_name': '',
-                'intensity_level': 'medium',
-                'senior_friendly': True,
-                'operating_hours': '평일 오전',
-            })
-        else:
-            # programs가 배열인 경우, 각 프로그램마다 별도 레코드 생성
-            if isinstance(programs, list):
-                for program in programs:
-                    if isinstance(program, dict):
-                        program_name = str(program.get('program_name', '')).strip()
-                        if program_name:  # 프로그램명이 있는 경우만 추가
-                            # schedules 정보는 나중에 활용 가능
-                            schedules = program.get('schedules', [])
-                            
-                            # 기본값 설정 (프로그램명에서 추론 가능하면 추론)
-                            intensity_level = 'medium'
-                            senior_friendly = True
-                            
-                            # 프로그램명에서 시니어/실버 관련 키워드 확인
-                            program_name_lower = program_name.lower()
-                            if any(keyword in program_name_lower for keyword in ['실버', '시니어', '노인', '효도']):
-                                senior_friendly = True
-                            
-                            # operating_hours는 schedules에서 추론 가능하면 추론
-                            operating_hours = '평일 오전'
-                            if schedules and isinstance(schedules, list) and len(schedules) > 0:
-                                # 첫 번째 스케줄에서 시간 정보 추출 시도
-                                first_schedule = str(schedules[0])
-                                if '오전' in first_schedule or '09' in first_schedule or '10' in first_schedule or '11' in first_schedule:
-                                    operating_hours = '평일 오전'
-                                elif '오후' in first_schedule or '13' in first_schedule or '14' in first_schedule or '15' in first_schedule:
-                                    operating_hours = '평일 오후'
-                                elif '저녁' in first_schedule or '18' in first_schedule or '19' in first_schedule or '20' in first_schedule:
-                                    operating_hours = '평일 저녁'
-                            
-                            rows.append({
-                                'fac_id': f'F{len(rows):06d}',
-                                'fac_name': fac_name,
-                                'address': address,
-                                'lat': float(lat),
-                                'lon': float(lon),
-                                'is_indoor': is_indoor,
-                                'sport_category': sport_category if sport_category else 'general',
-                                'program_name': program_name,
-                                'intensity_level': intensity_level,
-                                'senior_friendly': senior_friendly,
-                                'operating_hours': operating_hours,
-                            })
-            else:
-                # programs가 딕셔너리인 경우 (단일 프로그램)
-                if isinstance(programs, dict):
-                    program_name = str(programs.get('program_name', '')).strip()
-                    if program_name:
-                        schedules = programs.get('schedules', [])
-                        intensity_level = 'medium'
-                        senior_friendly = True
-                        
-                        program_name_lower = program_name.lower()
-                        if any(keyword in program_name_lower for keyword in ['실버', '시니어', '노인', '효도']):
-                            senior_friendly = True
-                        
-                        operating_hours = '평일 오전'
-                        if schedules and isinstance(schedules, list) and len(schedules) > 0:
-                            first_schedule = str(schedules[0])
-                            if '오전' in first_schedule or '09' in first_schedule or '10' in first_schedule or '11' in first_schedule:
-                                operating_hours = '평일 오전'
-                            elif '오후' in first_schedule or '13' in first_schedule or '14' in first_schedule or '15' in first_schedule:
-                                operating_hours = '평일 오후'
-                            elif '저녁' in first_schedule or '18' in first_schedule or '19' in first_schedule or '20' in first_schedule:
-                                operating_hours = '평일 저녁'
-                        
-                        rows.append({
-                            'fac_id': f'F{len(rows):06d}',
-                            'fac_name': fac_name,
-                            'address': address,
-                            'lat': float(lat),
-                            'lon': float(lon),
-                            'is_indoor': is_indoor,
-                            'sport_category': sport_category if sport_category else 'general',
-                            'program_name': program_name,
-                            'intensity_level': intensity_level,
-                            'senior_friendly': senior_friendly,
-                            'operating_hours': operating_hours,
-                        })
-    
-    if not rows:
-        return pd.DataFrame(columns=[
-            "fac_id", "fac_name", "address",
-            "lat", "lon",
-            "is_indoor",
-            "sport_category",
-            "program_name",
-            "intensity_level",
-            "senior_friendly",
-            "operating_hours",
-        ])
-    
-    # DataFrame 생성
-    df = pd.DataFrame(rows)
-    
+        return empty_catalog_frame()
+
+    # JSON 배열을 스트리밍으로 읽으며 청크 단위로 변환
+    frames = list(iter_catalog_frames(iter_master_records(JSON_PATH)))
+    if not frames:
+        return empty_catalog_frame()
+
+    df = pd.concat(frames, ignore_index=True)
+
     # 중복 제거 (같은 시설, 같은 프로그램, 같은 위치)
-    df = df.drop_duplicates(subset=['fac_name', 'program_name', 'lat', 'lon'])
-    
-    return df
+    df = df.drop_duplicates(subset=CATALOG_DEDUP_COLUMNS)
+
+    # 반복되는 문자열 컬럼은 정수 코드 + 공유 사전으로
+    return compact_catalog(df)
 
 def add_distance(df: pd.DataFrame, user_location: Location) -> pd.DataFrame:
     df = df.copy()
     lat_u = user_location["lat"]
     lon_u = user_location["lon"]
-    df["dist_km"] = df.apply(
-        lambda row: haversine_distance_km(lat_u, lon_u, row["lat"], row["lon"]), axis=1
+    # 행마다 apply하면 행 Series를 만드는 비용이 거리 계산보다 커서 좌표 배열로 한 번에 계산
+    df["dist_km"] = haversine_distance_km_array(
+        lat_u, lon_u, df["lat"].to_numpy(dtype=float), df["lon"].to_numpy(dtype=float)
     )
     return df
 
 def filter_by_radius(df: pd.DataFrame, max_km: float = 3.0) -> pd.DataFrame:
     return df[df["dist_km"] <= max_km].copy()
 
+def filter_by_schedule(df: pd.DataFrame, hours: float, now: Optional[dt.datetime] = None) -> pd.DataFrame:
+    """
+    지금부터 hours시간 안에 운영하는 프로그램만 (schedule_mask 비트 AND).
+    스케줄 정보가 없는 행(0)과 schedule_mask 컬럼이 없는 예전 카탈로그는 그대로 둔다.
+    """
+    if not hours > 0:
+        raise ValueError(f"open_within_hours는 0보다 커야 합니다: {hours}")
+    if "schedule_mask" not in df.columns:
+        return df
+    window = window_mask(now or dt.datetime.now(), hours)
+    return df[open_in(df["schedule_mask"].fillna(0), window)]
+
 def recommend(
     user_profile: UserProfile,
     user_location: Location,
     weather_info: WeatherInfo,
     top_k: int = 5,
     max_radius_km: float = 20.0,
+    open_within_hours: Optional[float] = None,
+    now: Optional[dt.datetime] = None,
 ) -> List[Recommendation]:
     """
     전체 추천 파이프라인:
-    1) 시설-프로그램 마스터 로드
+    1) 카탈로그에서 최대 반경 안의 후보만 조회
     2) 사용자 위치 기준 거리 계산
     3) 건강/날씨 룰 필터링 (거리 필터보다 먼저 적용)
     4) 동적 반경 확장으로 최소 추천 개수 보장
@@ -219,8 +210,13 @@ def recommend(
     
     Args:
         max_radius_km: 최대 반경 (기본 20km, 데이터가 적을 때 확장)
+        open_within_hours: 주어지면 now(기본 현재 시각)부터 N시간 안에 운영하는 프로그램만 추천
     """
-    df = load_facility_master()
+    catalog = get_facility_catalog()
+    df = catalog.candidates(user_location, max_radius_km)
+    if df.empty:
+        # 반경 안에 아무것도 없으면 가장 가까운 후보 사용
+        df = catalog.nearest(user_location, top_k * 2)
     if df.empty:
         return []
 
@@ -231,6 +227,8 @@ def recommend(
     # 이렇게 하면 건강/날씨 조건에 맞는 시설 중에서 거리순으로 추천 가능
     df = filter_by_health(df, user_profile)
     df = filter_by_weather(df, weather_info)
+    if open_within_hours is not None:
+        df = filter_by_schedule(df, open_within_hours, now)
     
     if df.empty:
         return []
@@ -255,17 +253,15 @@ def recommend(
 
     # 4) 점수 계산
     df_filtered = df_filtered.copy()
-    df_filtered["score"] = df_filtered.apply(
-        lambda row: final_score(row, user_profile, weather_info),
-        axis=1,
-    )
+    df_filtered["score"] = score_frame(df_filtered, user_profile, weather_info)
 
     # 5) 상위 K개 선택
     df_filtered = df_filtered.sort_values("score", ascending=False).head(top_k)
 
     # 6) Recommendation 형태로 변환
     recommendations: List[Recommendation] = []
-    for _, row in df_filtered.iterrows():
+    # iterrows는 Categorical 컬럼의 사전 전체를 object 배열로 풀기 때문에 레코드 dict로 순회
+    for row in df_filtered.to_dict("records"):
         program_name = str(row["program_name"]).strip()
         facility_name = str(row["fac_name"]).strip()
         
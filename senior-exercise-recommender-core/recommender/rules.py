@@ -2,6 +2,7 @@
 from typing import List
 import pandas as pd
 from .types import UserProfile, WeatherInfo
+from .scoring import label_mask
 
 def filter_by_health(candidates: pd.DataFrame, user_profile: UserProfile) -> pd.DataFrame:
     """
@@ -17,7 +18,7 @@ def filter_by_health(candidates: pd.DataFrame, user_profile: UserProfile) -> pd.
 
     # 예: 무릎 통증이면 high intensity 운동 제거 (일단 골격만)
     if "knee_pain" in health_issues:
-        df = df[df["intensity_level"] != "high"]
+        df = df[~label_mask(df["intensity_level"], "high")]
 
     # TODO: 허리 통증, 심혈관, 당뇨 등 세부 룰 추가
 
@@ -45,7 +46,7 @@ def filter_by_weather(candidates: pd.DataFrame, weather: WeatherInfo) -> pd.Data
         df = df[df["is_indoor"] == True]
     elif pm10 > 80:
         # 미세먼지가 높으면 실외 고강도 운동 제거
-        df = df[~((df["is_indoor"] == False) & (df["intensity_level"] == "high"))]
+        df = df[~(~df["is_indoor"].to_numpy(dtype=bool) & label_mask(df["intensity_level"], "high"))]
 
     # 3) 기온이 너무 높거나 낮으면 실외 운동 제거
     # 노인 기준: 30도 이상 또는 -5도 이하
@@ -54,6 +55,6 @@ def filter_by_weather(candidates: pd.DataFrame, weather: WeatherInfo) -> pd.Data
         df = df[df["is_indoor"] == True]
     elif temp >= 28.0 or temp <= 0.0:
         # 더위/추위가 심하면 실외 고강도 운동 제거
-        df = df[~((df["is_indoor"] == False) & (df["intensity_level"] == "high"))]
+        df = df[~(~df["is_indoor"].to_numpy(dtype=bool) & label_mask(df["intensity_level"], "high"))]
 
     return df
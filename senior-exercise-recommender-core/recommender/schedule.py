@@ -0,0 +1,175 @@
+# recommender/schedule.py
+"""
+프로그램 스케줄 주간 비트마스크
+
+"월수금 / 14:00~14:50", "매일 오전", "평일 09:00~10:00" 같은 스케줄 문자열을
+요일(월=0 … 일=6) × 시간 슬롯(06시부터 2시간 단위 8칸) = 56비트 정수 하나로 바꾼다.
+    bit = 요일 * SLOTS_PER_DAY + 슬롯
+
+- 빌드(normalization)에서 프로그램마다 schedule_mask를 계산해 카탈로그에 저장
+- recommend(open_within_hours=N)는 "지금부터 N시간" 구간 마스크와 비트 AND로 필터
+- 그룹 세션(날짜 + 오전/오후/저녁)도 time_block_mask로 같은 비트 공간에서 비교
+스케줄 정보가 없는 행은 0 (운영 시간 미상)이다.
+"""
+import re
+import datetime as dt
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+DAY_NAMES = "월화수목금토일"
+FIRST_HOUR = 6
+SLOT_HOURS = 2
+SLOTS_PER_DAY = 8  # 06~22시
+WEEK_SLOTS = 7 * SLOTS_PER_DAY
+
+# 시간대 이름 → 슬롯 범위 (그룹 세션 time_block과 같은 이름)
+TIME_BLOCK_SLOTS = {
+    "오전": range(0, 3),  # 06~12시
+    "오후": range(3, 6),  # 12~18시
+    "저녁": range(6, 8),  # 18~22시
+}
+
+WEEKDAYS = (0, 1, 2, 3, 4)
+WEEKEND = (5, 6)
+
+_TIME_RANGE = re.compile(r"(\d{1,2}):(\d{2})\s*(?:[~\-–]\s*(\d{1,2}):(\d{2}))?")
+_DAY_RANGE = re.compile(r"(?<![가-힣])([월화수목금토일])(?:요일)?\s*[~\-–]\s*([월화수목금토일])(?:요일)?(?![가-힣])")
+# 요일 목록 토큰: "월수금", "화요일", "월, 수" 처럼 요일 글자만으로 된 단어이고,
+# 뒤에 끝 / 구분자 / 시각 / 시간대가 와야 한다 ("수영", "일일체험", "월 1회"의 글자는 요일이 아님)
+_DAY_LIST = re.compile(
+    r"(?<![가-힣])"
+    r"((?:[월화수목금토일]+(?:요일)?)(?:\s*[,·]\s*[월화수목금토일]+(?:요일)?)*)"
+    r"(?=\s*(?:$|[/,·(\[]|\d{1,2}:\d{2}|\d{1,2}시|오전|오후|저녁))"
+)
+
+_DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+_ALL_SLOTS = (1 << WEEK_SLOTS) - 1
+
+
+def _slot(hour: float) -> int:
+    """시각(시) → 슬롯 번호 (06시 이전은 첫 슬롯, 22시 이후는 마지막 슬롯)"""
+    return min(max(int((hour - FIRST_HOUR) // SLOT_HOURS), 0), SLOTS_PER_DAY - 1)
+
+
+def _days(text: str) -> tuple:
+    """스케줄 문자열의 요일 (요일 범위 / 요일 목록 토큰만 인정, 요일 표시가 없으면 평일)"""
+    days = set()
+    if "매일" in text:
+        return tuple(range(7))
+    if "평일" in text:
+        days.update(WEEKDAYS)
+    if "주말" in text:
+        days.update(WEEKEND)
+    for start, end in _DAY_RANGE.findall(text):
+        first, last = DAY_NAMES.index(start), DAY_NAMES.index(end)
+        days.update(range(first, last + 1) if first <= last else [*range(first, 7), *range(0, last + 1)])
+    text = _DAY_RANGE.sub(" ", text)
+    for word in ("평일", "주말"):
+        text = text.replace(word, " ")
+    for token in _DAY_LIST.findall(text):
+        days.update(DAY_NAMES.index(ch) for ch in token.replace("요일", "") if ch in DAY_NAMES)
+    return tuple(sorted(days)) if days else WEEKDAYS
+
+
+def _slots(text: str) -> int:
+    """스케줄 문자열의 하루 안 슬롯 비트 (시각도 시간대 이름도 없으면 하루 전체)"""
+    bits = 0
+    for start_h, start_m, end_h, end_m in _TIME_RANGE.findall(text):
+        start = int(start_h) + int(start_m) / 60
+        # 끝 시각이 없으면 1시간짜리로 본다
+        end = int(end_h) + int(end_m) / 60 if end_h else start + 1
+        if end <= start:
+            end = start + 1
+        for slot in range(_slot(start), _slot(end - 1e-6) + 1):
+            bits |= 1 << slot
+    if not bits:
+        for block, slots in TIME_BLOCK_SLOTS.items():
+            if block in text:
+                for slot in slots:
+                    bits |= 1 << slot
+    return bits or _DAY_MASK
+
+
+def parse_schedule(text: Optional[str]) -> int:
+    """스케줄 문자열 하나 → 주간 비트마스크 (빈 문자열/None이면 0)"""
+    if text is None:
+        return 0
+    text = str(text).strip()
+    if not text:
+        return 0
+    slots = _slots(text)
+    mask = 0
+    for day in _days(text):
+        mask |= slots << (day * SLOTS_PER_DAY)
+    return mask
+
+
+def schedule_masks(schedules: Iterable) -> np.ndarray:
+    """
+    프로그램별 schedules(문자열 리스트) → int64 마스크 배열 (스케줄들의 OR).
+    스케줄 문구는 종류가 적으므로 고유한 조합에만 파싱 후 펼친다.
+    """
+    # 대부분 스케줄이 하나이므로 그때는 문자열을 그대로 키로 쓴다
+    keys = [
+        (v[0] if len(v) == 1 else "\n".join(map(str, v))) if isinstance(v, list) and v else ""
+        for v in schedules
+    ]
+    codes, uniques = pd.factorize(np.array(keys, dtype=object))
+    masks = np.zeros(len(uniques), dtype=np.int64)
+    for i, key in enumerate(uniques):
+        mask = 0
+        for line in str(key).split("\n"):
+            mask |= parse_schedule(line)
+        masks[i] = mask
+    return masks[codes] if len(codes) else np.zeros(0, dtype=np.int64)
+
+
+def operating_hours_labels(masks: np.ndarray, default: str) -> np.ndarray:
+    """마스크의 가장 이른 시간대로 기존 operating_hours 라벨('평일 오전' 등) 생성 (0이면 default)"""
+    masks = np.asarray(masks, dtype=np.int64)
+    # 요일을 접어서 하루 슬롯 비트만 남김
+    day_bits = np.zeros(len(masks), dtype=np.int64)
+    for day in range(7):
+        day_bits |= (masks >> (day * SLOTS_PER_DAY)) & _DAY_MASK
+    conditions, labels = [], []
+    for block, slots in TIME_BLOCK_SLOTS.items():
+        block_bits = sum(1 << slot for slot in slots)
+        conditions.append((day_bits & block_bits) != 0)
+        labels.append(f"평일 {block}")
+    return np.select(conditions, labels, default=default)
+
+
+def window_mask(start: dt.datetime, hours: float) -> int:
+    """start부터 hours시간 동안 걸치는 슬롯 비트 (주 경계를 넘으면 월요일로 이어짐)"""
+    if hours >= 24 * 7:
+        return _ALL_SLOTS
+    mask = 0
+    end = start + dt.timedelta(hours=hours)
+    t = start
+    while t < end:
+        if FIRST_HOUR <= t.hour < FIRST_HOUR + SLOTS_PER_DAY * SLOT_HOURS:
+            mask |= 1 << (t.weekday() * SLOTS_PER_DAY + _slot(t.hour))
+        # 다음 슬롯 시작 시각(짝수 시 정각)으로 이동
+        step = SLOT_HOURS - (t.hour - FIRST_HOUR) % SLOT_HOURS
+        t = (t + dt.timedelta(hours=step)).replace(minute=0, second=0, microsecond=0)
+    return mask
+
+
+def time_block_mask(day: dt.date, time_block: str) -> int:
+    """그룹 세션(날짜, '오전'/'오후'/'저녁')이 차지하는 슬롯 비트"""
+    bits = sum(1 << slot for slot in TIME_BLOCK_SLOTS.get(time_block, ()))
+    return bits << (day.weekday() * SLOTS_PER_DAY)
+
+
+def open_in(masks: pd.Series, window: int, keep_unknown: bool = True) -> pd.Series:
+    """
+    window 비트와 겹치는 행 (벡터 비트 AND).
+    keep_unknown이면 스케줄 정보가 없는(0) 시설 행도 남긴다.
+    """
+    values = masks.to_numpy(dtype=np.int64)
+    hit = (values & np.int64(window)) != 0
+    if keep_unknown:
+        hit |= values == 0
+    return pd.Series(hit, index=masks.index)
@@ -1,7 +1,29 @@
 # recommender/scoring.py
+import numpy as np
+import pandas as pd
+
 from .types import UserProfile, WeatherInfo
 from .utils import linear_score
 
+# 최종 점수 가중치 (합 1.0)
+# 기존 다섯 항목(0.35/0.25/0.20/0.10/0.10)의 비율은 그대로 두고 0.9배로 줄여 접근성 0.10 자리를 만든다
+SCORE_WEIGHTS = {
+    "distance": 0.315,
+    "goal": 0.225,
+    "weather": 0.18,
+    "senior": 0.09,
+    "intensity": 0.09,
+    "accessibility": 0.10,
+}
+
+# 대중교통 접근성 점수 (카탈로그 빌드 시 accessibility_score로 미리 계산)
+ACCESSIBLE_WALK_SEC = 300.0     # 가까운 정류장까지 도보 5분 이내면 만점
+MAX_WALK_SEC = 1200.0           # 20분 이상이면 0점
+SENIOR_WALK_SPEED_MPS = 1.0     # 도보 시간이 없을 때 거리로 추정하는 어르신 보행 속도
+TRANSIT_STOPS_FULL = 5.0        # 300m 안 정류장이 이만큼 있으면 만점
+ACCESSIBILITY_WEIGHTS = {"walk": 0.5, "subway": 0.25, "transit": 0.25}
+ACCESSIBILITY_UNKNOWN = 0.5     # 교통 정보가 없는 항목은 중간값 (불이익도 가산도 없음)
+
 def distance_score(dist_km: float, max_distance_km: float = 3.0) -> float:
     """
     0km일 때 1점, max_distance_km 이상이면 0점에 가깝게.
@@ -66,31 +88,103 @@ def intensity_fit_score(intensity_level: str, age_group: str, health_issues: lis
 
     return max(0.0, min(1.0, base))
 
+def accessibility_scores(
+    walk_time_sec: pd.Series,
+    walk_distance_m: pd.Series,
+    has_subway: pd.Series,
+    transit_count: pd.Series,
+) -> np.ndarray:
+    """
+    시설별 대중교통 접근성 0~1 (컬럼 단위 계산, 값이 없으면 NaN인 float 입력).
+    - 도보: 가까운 정류장까지 도보 시간(없으면 거리 / 보행 속도), 5분 1점 ~ 20분 0점
+    - 지하철: 600m 안에 역이 있으면 1점
+    - 정류장 수: 300m 안 정류장 수 / 5 (최대 1점)
+    정보가 없는 항목은 ACCESSIBILITY_UNKNOWN으로 채운다.
+    """
+    walk = walk_time_sec.fillna(walk_distance_m / SENIOR_WALK_SPEED_MPS).to_numpy(dtype=float)
+    walk_score = np.clip((MAX_WALK_SEC - walk) / (MAX_WALK_SEC - ACCESSIBLE_WALK_SEC), 0.0, 1.0)
+    subway_score = np.clip(has_subway.to_numpy(dtype=float), 0.0, 1.0)
+    transit_score = np.clip(transit_count.to_numpy(dtype=float) / TRANSIT_STOPS_FULL, 0.0, 1.0)
+
+    score = np.zeros(len(walk))
+    for weight, part in (
+        (ACCESSIBILITY_WEIGHTS["walk"], walk_score),
+        (ACCESSIBILITY_WEIGHTS["subway"], subway_score),
+        (ACCESSIBILITY_WEIGHTS["transit"], transit_score),
+    ):
+        score += weight * np.where(np.isnan(part), ACCESSIBILITY_UNKNOWN, part)
+    return score
+
 def final_score(row, user_profile: UserProfile, weather: WeatherInfo) -> float:
     """
     후보(row: pandas Series)에 대해 최종 점수 계산.
+    (score_frame에 한 행짜리 DataFrame으로 넘겨 같은 공식을 사용)
+    """
+    return float(score_frame(pd.DataFrame([row]), user_profile, weather).iloc[0])
+
+def label_mask(values: pd.Series, label: str) -> np.ndarray:
+    """
+    values == label 인 행 (bool 배열).
+    Categorical 컬럼이면 label을 사전에서 한 번 찾아 정수 코드끼리 비교한다.
     """
-    dist_km = float(row["dist_km"])
-    sport_category = str(row["sport_category"])
-    is_indoor = bool(row["is_indoor"])
-    intensity_level = str(row["intensity_level"])
-    senior_flag = bool(row.get("senior_friendly", False))
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        code = values.cat.categories.get_indexer([label])[0]
+        if code < 0:
+            return np.zeros(len(values), dtype=bool)
+        return values.cat.codes.to_numpy() == code
+    return (values == label).to_numpy(dtype=bool)
 
+def _per_value(values: pd.Series, fn) -> np.ndarray:
+    """
+    값 종류가 적은 컬럼은 고유값마다 한 번만 점수를 계산해 정수 코드로 펼친다.
+    (카탈로그의 Categorical 컬럼은 사전과 코드를 그대로 사용)
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values.astype(str))
+    if not len(codes):
+        return np.zeros(0)
+    # 코드 -1(결측)은 마지막 칸: 빈 문자열로 계산
+    table = np.array([fn(str(value)) for value in uniques] + [fn("")], dtype=float)
+    return table[codes]
+
+def score_frame(df, user_profile: UserProfile, weather: WeatherInfo) -> pd.Series:
+    """
+    후보 DataFrame 전체의 최종 점수를 컬럼 단위로 계산 (SCORE_WEIGHTS 가중합).
+    (행마다 apply하지 않으므로 후보가 많아도 요청당 비용이 작다)
+    """
     goals = user_profile.get("goals", [])
     age_group = user_profile.get("age_group", "65-69")
     health_issues = user_profile.get("health_issues", [])
 
-    d_score = distance_score(dist_km)
-    g_score = goal_match_score(sport_category, goals)
-    w_score = weather_suitability_score(is_indoor, weather)
-    s_score = senior_friendly_score(senior_flag)
-    i_score = intensity_fit_score(intensity_level, age_group, health_issues)
+    dist = df["dist_km"].to_numpy(dtype=float)
+    d_score = np.clip(1.0 - dist / 3.0, 0.0, 1.0)
+    g_score = _per_value(df["sport_category"], lambda sport: goal_match_score(sport, goals))
+    badness = 0.5 * weather["rain_prob"] + 0.5 * (weather["pm10"] / 100.0)
+    indoor = df["is_indoor"].to_numpy(dtype=bool)
+    w_score = np.where(indoor, min(1.0, 0.5 + badness), max(0.0, 1.0 - badness))
+    if "senior_friendly" in df.columns:
+        senior = df["senior_friendly"].fillna(False).to_numpy(dtype=bool)
+    else:
+        senior = np.zeros(len(df), dtype=bool)
+    s_score = np.where(senior, 1.0, 0.5)
+    i_score = _per_value(
+        df["intensity_level"], lambda level: intensity_fit_score(level, age_group, health_issues)
+    )
+    if "accessibility_score" in df.columns:
+        a_score = df["accessibility_score"].to_numpy(dtype=float)
+        a_score = np.where(np.isnan(a_score), ACCESSIBILITY_UNKNOWN, a_score)
+    else:
+        a_score = np.full(len(df), ACCESSIBILITY_UNKNOWN)
 
     # 가중치 합
-    return (
-        0.35 * d_score +
-        0.25 * g_score +
-        0.20 * w_score +
-        0.10 * s_score +
-        0.10 * i_score
+    score = (
+        SCORE_WEIGHTS["distance"] * d_score +
+        SCORE_WEIGHTS["goal"] * g_score +
+        SCORE_WEIGHTS["weather"] * w_score +
+        SCORE_WEIGHTS["senior"] * s_score +
+        SCORE_WEIGHTS["intensity"] * i_score +
+        SCORE_WEIGHTS["accessibility"] * a_score
     )
+    return pd.Series(score, index=df.index)
@@ -1,5 +1,7 @@
 # recommender/utils.py
 import math
+import hashlib
+from typing import Optional
 
 def haversine_distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -27,3 +29,80 @@ def linear_score(x: float, x_min: float, x_max: float, reverse: bool = False) ->
     v = (x - x_min) / (x_max - x_min)
     v = max(0.0, min(1.0, v))
     return 1.0 - v if reverse else v
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> tuple[float, float, float, float]:
+    """
+    (lat, lon)을 중심으로 반경 radius_km 원을 감싸는 위경도 사각형.
+    인덱스(위도/경도 btree)로 후보를 먼저 좁힐 때 사용.
+
+    Returns:
+        (min_lat, max_lat, min_lon, max_lon)
+    """
+    d_lat = math.degrees(radius_km / 6371.0)
+    # 고위도로 갈수록 경도 1도의 거리가 짧아지므로 cos(lat)으로 보정
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    d_lon = math.degrees(radius_km / (6371.0 * cos_lat))
+    return lat - d_lat, lat + d_lat, lon - d_lon, lon + d_lon
+
+
+# 익명 사용자 키 (로그인하지 않은 /api/recommend 요청의 운동 이력 키)
+ANONYMOUS_KEY_PREFIX = "anon:"
+# 위치 셀 크기(도). 0.005도 ≈ 위도 방향 550m → 같은 사람이 GPS 오차로 조금 움직여도 같은 키
+ANONYMOUS_CELL_DEG = 0.005
+
+
+def anonymous_user_key(
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    device_id: Optional[str] = None,
+) -> str:
+    """
+    익명 요청의 사용자 키.
+    - device_id가 있으면 기기 단위 키 (앞뒤 공백·대소문자 정규화 후 해시해 길이를 고정)
+    - 없으면 위경도를 ANONYMOUS_CELL_DEG 격자로 양자화한 위치 셀 키
+    모든 익명 키는 ANONYMOUS_KEY_PREFIX로 시작한다 (이력 저장소의 TTL 만료 대상).
+    """
+    device_id = (device_id or "").strip().lower()
+    if device_id:
+        digest = hashlib.blake2b(device_id.encode("utf-8"), digest_size=8).hexdigest()
+        return f"{ANONYMOUS_KEY_PREFIX}d:{digest}"
+    if lat is None or lon is None:
+        raise ValueError("device_id 또는 위도/경도가 필요합니다.")
+    cell_lat = math.floor(lat / ANONYMOUS_CELL_DEG)
+    cell_lon = math.floor(lon / ANONYMOUS_CELL_DEG)
+    return f"{ANONYMOUS_KEY_PREFIX}c:{cell_lat}:{cell_lon}"
+
+
+def extract_youtube_video_id(url: str) -> Optional[str]:
+    """
+    YouTube URL에서 비디오 ID를 추출.
+    https://www.youtube.com/watch?v=VIDEO_ID 형태 또는
+    https://youtu.be/VIDEO_ID 형태를 지원.
+    """
+    if not url:
+        return None
+    
+    # 오타 수정 (hhttps -> https)
+    url = url.replace("hhttps://", "https://")
+    
+    # youtu.be 형식
+    if "youtu.be/" in url:
+        video_id = url.split("youtu.be/")[1].split("&")[0].split("?")[0]
+        return video_id
+    
+    # youtube.com/watch?v= 형식
+    if "youtube.com/watch" in url and "v=" in url:
+        video_id = url.split("v=")[1].split("&")[0].split("#")[0]
+        return video_id
+    
+    return None
+
+
+def get_youtube_embed_url(url: str) -> Optional[str]:
+    """
+    YouTube URL을 embed URL로 변환.
+    """
+    video_id = extract_youtube_video_id(url)
+    if video_id:
+        return f"https://www.youtube.com/embed/{video_id}"
+    return None
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+일일 운동 배정 배치
+
+users 테이블의 모든 사용자에게 오늘의 운동을 한 번에 배정해 이력 저장소에 기록한다.
+(어제와 다른 부위 규칙과 (user_id, 날짜, 카탈로그 버전) 해시 선택은 요청 경로의 choose_exercise_for_today와 동일)
+배정이 끝난 뒤 /api/notification/exercise 요청은 저장소에서 키 조회만 한다.
+
+users 테이블에 활동 여부 컬럼이 없으므로 현재는 가입한 모든 사용자를 대상으로 한다.
+배정 후 오래된 익명 사용자 이력(ANON_HISTORY_TTL_DAYS)도 정리한다.
+
+사용법 (매일 자정 직후 cron 등으로 실행):
+    python scripts/assign_daily_exercises.py [--date YYYY-MM-DD] [--batch-size 5000]
+"""
+import sys
+import time
+import argparse
+import datetime as dt
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from db.database import get_db_connection
+from recommender.exercise_catalog import get_exercise_catalog
+from recommender.exercise_recommender import assign_exercises_for_day
+from recommender.history_store import ExerciseHistoryStore, expire_anonymous_history
+
+
+def fetch_user_ids() -> list:
+    """이력 저장소 키와 같은 형식(문자열)의 사용자 ID 목록"""
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id FROM users ORDER BY id")
+            return [str(row[0]) for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전체 사용자 오늘의 운동 일괄 배정")
+    parser.add_argument("--date", type=dt.date.fromisoformat, default=None, help="배정 날짜 (기본: 오늘)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    day = args.date or dt.date.today()
+    start = time.perf_counter()
+    user_ids = fetch_user_ids()
+    catalog = get_exercise_catalog()
+
+    # 배치는 별도 프로세스이므로 write-behind 버퍼 없이 저장소에 바로 bulk upsert
+    store = ExerciseHistoryStore()
+    try:
+        result = assign_exercises_for_day(catalog, user_ids, day, store, batch_size=args.batch_size)
+        expired = expire_anonymous_history(store, today=day)
+    finally:
+        store.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"✅ {day} 운동 배정 완료: 사용자 {len(user_ids)}명 중 {result['assigned']}명 배정, "
+        f"{result['skipped']}명은 이미 배정됨, 만료된 익명 이력 {expired}건 삭제 ({elapsed:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
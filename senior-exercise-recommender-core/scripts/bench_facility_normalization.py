@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+시설 레코드 정규화 벤치마크
+
+master 레코드 수를 늘려 가며
+- 컬럼 단위 정규화 (recommender.normalization.normalize_facility_records)
+- 레코드마다 pd.notna로 필드를 검사하며 행을 만드는 기존 방식
+의 처리 시간을 비교하고, 두 결과가 같은지 확인한다.
+
+사용법:
+    python scripts/bench_facility_normalization.py
+"""
+import sys
+import time
+import random
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from recommender.normalization import NORMALIZED_COLUMNS, TRANSIT_FIELDS, normalize_facility_records
+from recommender.schedule import parse_schedule
+
+SCHEDULES = ["월수금 / 10:00~10:50", "화목 / 14:00~14:50", "토 / 19:00~19:50", "매일 오전", "주말"]
+SPORTS = ["수영장", "체육관", "게이트볼장", "탁구장", None]
+# 기존 방식이 만드는 컬럼 (대중교통 접근성 컬럼은 합성 레코드에 없으므로 비교에서 제외)
+COMPARED_COLUMNS = [c for c in NORMALIZED_COLUMNS if c not in TRANSIT_FIELDS + ["accessibility_score"]]
+
+
+def synthetic_records(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        kind = rng.random()
+        if kind < 0.3:
+            programs = None
+        elif kind < 0.4:
+            programs = {"program_name": "실버 체조", "schedules": [rng.choice(SCHEDULES)]}
+        else:
+            programs = [
+                {"program_name": f"프로그램{j}", "schedules": [rng.choice(SCHEDULES)]}
+                for j in range(rng.randint(1, 4))
+            ]
+        records.append({
+            "fac_uid": f"F{i:016x}",
+            "시설명": f" 시설{i} ",
+            "주소": rng.choice(["서울특별시 마포구", "부산광역시 해운대구", "경기도 고양시"]),
+            "시설위도": 33 + rng.random() * 5 if rng.random() > 0.02 else None,
+            "시설경도": 126 + rng.random() * 3,
+            "실내여부": rng.choice(["실내", "실외", None]),
+            "시설유형명": rng.choice(SPORTS),
+            "programs": programs,
+        })
+    return records
+
+
+def _schedule_mask(schedules) -> int:
+    mask = 0
+    for schedule in schedules if isinstance(schedules, list) else []:
+        mask |= parse_schedule(schedule)
+    return mask
+
+
+def _guess_operating_hours(schedules) -> str:
+    if schedules and isinstance(schedules, list) and len(schedules) > 0:
+        first_schedule = str(schedules[0])
+        if '오전' in first_schedule or '09' in first_schedule or '10' in first_schedule or '11' in first_schedule:
+            return '평일 오전'
+        if '오후' in first_schedule or '13' in first_schedule or '14' in first_schedule or '15' in first_schedule:
+            return '평일 오후'
+        if '저녁' in first_schedule or '18' in first_schedule or '19' in first_schedule or '20' in first_schedule:
+            return '평일 저녁'
+    return '평일 오전'
+
+
+def loop_normalize(records) -> pd.DataFrame:
+    """기존 방식: 레코드마다 필드를 pd.notna로 검사하며 행 dict 생성"""
+    rows = []
+    for item in records:
+        fac_name = str(item.get('시설명', '')).strip() if pd.notna(item.get('시설명')) else ''
+        address = str(item.get('주소', '')).strip() if pd.notna(item.get('주소')) else ''
+        lat = item.get('시설위도')
+        lon = item.get('시설경도')
+        is_indoor_str = str(item.get('실내여부', '')).strip() if pd.notna(item.get('실내여부')) else ''
+        sport_category = str(item.get('시설유형명', '')).strip() if pd.notna(item.get('시설유형명')) else ''
+        if pd.isna(lat) or pd.isna(lon) or not fac_name:
+            continue
+
+        base = {
+            'fac_uid': item.get('fac_uid'),
+            'fac_name': fac_name,
+            'address': address,
+            'lat': float(lat),
+            'lon': float(lon),
+            'is_indoor': is_indoor_str == '실내' if is_indoor_str else True,
+            'sport_category': sport_category if sport_category else 'general',
+        }
+        programs = item.get('programs')
+        is_programs_empty = (
+            pd.isna(programs) if not isinstance(programs, (list, dict)) else False
+        ) or programs is None or programs == '' or (isinstance(programs, list) and len(programs) == 0)
+
+        if is_programs_empty:
+            rows.append({**base, 'program_name': '', 'intensity_level': 'medium',
+                         'senior_friendly': True, 'operating_hours': '평일 오전', 'schedule_mask': 0})
+            continue
+        for program in (programs if isinstance(programs, list) else [programs]):
+            if not isinstance(program, dict):
+                continue
+            program_name = str(program.get('program_name', '')).strip()
+            if program_name:
+                rows.append({**base, 'program_name': program_name, 'intensity_level': 'medium',
+                             'senior_friendly': True,
+                             'operating_hours': _guess_operating_hours(program.get('schedules', [])),
+                             'schedule_mask': _schedule_mask(program.get('schedules', []))})
+    return pd.DataFrame(rows, columns=COMPARED_COLUMNS)
+
+
+def _best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    print(f"{'레코드 수':>9} | {'행 수':>8} | {'컬럼 연산(ms)':>13} | {'레코드 루프(ms)':>15} | {'배수':>5} | 결과 일치")
+    for n in [1_000, 10_000, 100_000, 300_000]:
+        records = synthetic_records(n)
+        vectorized = normalize_facility_records(records)
+        looped = loop_normalize(records)
+        same = vectorized[COMPARED_COLUMNS].reset_index(drop=True).equals(looped)
+
+        repeat = 3 if n <= 100_000 else 1
+        vectorized_ms = _best_of(lambda: normalize_facility_records(records), repeat)
+        loop_ms = _best_of(lambda: loop_normalize(records), repeat)
+        print(
+            f"{n:>9} | {len(vectorized):>8} | {vectorized_ms:>13.1f} | {loop_ms:>15.1f} | "
+            f"{loop_ms / vectorized_ms:>5.1f} | {same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+그룹 운동 영상 추천 지연 시간 벤치마크
+
+영상 수를 151개 → 수만 개로 늘려 가며
+- 역색인 + heap 순위 (rank_group_videos)
+- 전체 영상을 순회하며 키워드 검사 후 전체 정렬하는 기존 방식
+의 요청당 지연 시간을 비교한다.
+
+사용법:
+    python scripts/bench_group_video_ranking.py
+"""
+import sys
+import time
+import random
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from service.group_exercise_video_client import (
+    GOAL_TO_FITNESS,
+    MATCH_KEYWORDS,
+    GroupVideoIndex,
+    rank_group_videos,
+)
+
+WORDS = ["스트레칭", "걷기", "균형", "요가", "체조", "댄스", "근력", "밴드", "공", "의자",
+         "파트너", "릴레이", "박수", "손잡고", "원형", "짝", "리듬", "율동", "호흡", "팔"]
+FITNESS = list(GOAL_TO_FITNESS.values()) + ["평형성"]
+
+
+def synthetic_videos(n: int, seed: int = 42) -> tuple:
+    rng = random.Random(seed)
+    vocab = WORDS + list(MATCH_KEYWORDS) + [f"동작{i}" for i in range(n // 10 + 1)]
+    return tuple(
+        {
+            "Name": " ".join(rng.sample(vocab, 3)),
+            "체력항목": rng.choice(FITNESS),
+            "혼자여부": "n",
+        }
+        for _ in range(n)
+    )
+
+
+def linear_rank(videos, program_name, goals, max_results):
+    """기존 방식: 모든 영상에 대해 키워드 검사 후 전체 정렬"""
+    scored = []
+    for video in videos:
+        score = 0.0
+        name = video["Name"].lower()
+        program = program_name.lower()
+        for keyword in MATCH_KEYWORDS:
+            if keyword in name or keyword in program:
+                score += 1.0
+        for goal in goals:
+            if GOAL_TO_FITNESS.get(goal) == video["체력항목"]:
+                score += 1.5
+        scored.append((score, video))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [v for _, v in scored[:max_results]]
+
+
+def _time_per_call(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    program_name = "줄넘기 함께 교실"
+    goals = ["social"]
+    print(f"{'영상 수':>8} | {'색인 생성(ms)':>12} | {'역색인(ms/req)':>14} | {'순회+정렬(ms/req)':>17}")
+    for n in [151, 1_000, 10_000, 50_000]:
+        videos = synthetic_videos(n)
+        start = time.perf_counter()
+        index = GroupVideoIndex.build(videos)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        repeat = max(5, 20_000 // n)
+        indexed_ms = _time_per_call(lambda: rank_group_videos(index, program_name, [], 5), repeat)
+        linear_ms = _time_per_call(lambda: linear_rank(videos, program_name, [], 5), repeat)
+        print(f"{n:>8} | {build_ms:>12.1f} | {indexed_ms:>14.3f} | {linear_ms:>17.3f}")
+
+    # 목표 매칭은 체력항목 posting 전체에 점수를 주므로 참고용으로 별도 측정
+    videos = synthetic_videos(50_000)
+    index = GroupVideoIndex.build(videos)
+    goal_ms = _time_per_call(lambda: rank_group_videos(index, program_name, goals, 5), 5)
+    print(f"(목표 포함, 50000개) 역색인: {goal_ms:.3f} ms/req")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,459 @@
+import sys
 import json
+import math
+import time
+import itertools
+import argparse
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
 
-DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+from recommender.normalization import TRANSIT_FIELDS, typed_transit_columns
+
+DATA_DIR = BASE_DIR / "data"
 RAW_DIR = DATA_DIR / "raw"
 PROCESSED_DIR = DATA_DIR / "processed"
 
+# 좌표를 소수점 4자리(약 11m) 정수로 바꿔서 조인 키로 사용
+COORD_SCALE = 10_000
+KEY_COLUMNS = ["lat_key", "lon_key"]
+METERS_PER_DEGREE = 111_320.0
+
+MASTER_PATH = PROCESSED_DIR / "facility_program_master.json"
+# 증분 빌드: 직전 빌드의 입력 행 지문과, 직전 빌드 대비 변경분(delta)
+STATE_DIR = PROCESSED_DIR / "master_state"
+DELTA_PATH = PROCESSED_DIR / "facility_program_master.delta.json"
+
+# 스트리밍 중복 제거 시 한 번에 해시하는 레코드 수
+DEDUPE_CHUNK_SIZE = 10_000
+
+# 시설을 구분하는 컬럼 (이 값이 같으면 같은 시설로 보고 fac_uid를 유지)
+FACILITY_ID_COLUMNS = ["시설명", "lat_key", "lon_key"]
+
+
+def coordinate_key(values: pd.Series) -> pd.Series:
+    """위도 또는 경도를 COORD_SCALE배 한 정수 키로 변환 (값이 없으면 <NA>)"""
+    scaled = np.rint(pd.to_numeric(values, errors="coerce").to_numpy(dtype=float) * COORD_SCALE)
+    return pd.Series(scaled, index=values.index).astype("Int64")
+
+
+def load_data(
+    programs_path: Path = RAW_DIR / "facility_programs_senior.csv",
+    national_path: Path = RAW_DIR / "national_sports.csv",
+):
+    programs = pd.read_csv(programs_path)
+    national = pd.read_csv(national_path)
+
+    # 대중교통 접근성 컬럼은 숫자로 정리해 master 레코드에 그대로 싣는다 (카탈로그의 accessibility_score 입력)
+    transit = [c for c in TRANSIT_FIELDS if c in programs.columns]
+    if transit:
+        programs[transit] = typed_transit_columns(programs)[transit]
+
+    programs["lat_key"] = coordinate_key(programs["lat"])
+    programs["lon_key"] = coordinate_key(programs["lon"])
+
+    national["lat_key"] = coordinate_key(national["시설위도"])
+    national["lon_key"] = coordinate_key(national["시설경도"])
+    national["fac_uid"] = facility_uids(national)
+
+    return programs, national
+
+
+def content_hash(df: pd.DataFrame, columns=None) -> pd.Series:
+    """행 내용의 64비트 해시 (Int64, 컬럼 단위로 계산)"""
+    columns = list(columns) if columns is not None else list(df.columns)
+    hashed = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    # uint64 → Int64 (shift 등으로 생기는 빈 값을 <NA>로 두어 float 변환에 의한 정밀도 손실 방지)
+    return pd.Series(hashed.view("int64"), index=df.index).astype("Int64")
+
+
+def facility_uids(national: pd.DataFrame) -> pd.Series:
+    """
+    시설명 + 좌표 키로 만든 안정적인 시설 ID ("F" + 16자리 hex).
+    다시 빌드해도 같은 시설은 같은 ID이고, 같은 값의 행이 여러 개면 "_순번"을 붙인다.
+    """
+    columns = [c for c in FACILITY_ID_COLUMNS if c in national.columns]
+    hashed = pd.util.hash_pandas_object(national[columns], index=False)
+    base = hashed.map("F{:016x}".format)
+    dup = base.groupby(base, sort=False).cumcount()
+    return base.where(dup == 0, base + "_" + dup.astype(str))
+
+
+def _nearest_within(left: pd.DataFrame, right: pd.DataFrame, tolerance_m: float) -> pd.Series:
+    """
+    left 각 행에 대해 tolerance_m 이내에서 가장 가까운 right 행의 인덱스를 찾는다.
+    좌표 키를 tolerance 크기 이상의 버킷으로 나눈 뒤 주변 3x3 버킷끼리만 조인해서 거리를 계산.
 
-def load_data():
-    programs = pd.read_csv(RAW_DIR / "facility_programs_senior.csv")
-    national = pd.read_csv(RAW_DIR / "national_sports.csv")
+    Returns:
+        index = left 인덱스, 값 = right 인덱스 (매칭된 행만)
+    """
+    if left.empty or right.empty:
+        return pd.Series(dtype="int64")
 
-    programs["lat"] = programs["lat"].round(4)
-    programs["lon"] = programs["lon"].round(4)
-    programs["좌표"] = programs.apply(
-        lambda x: f"({x['lat']}, {x['lon']})",
-        axis=1,
+    # 경도 1도의 거리는 고위도일수록 짧으므로 가장 높은 위도 기준으로 버킷 크기 결정
+    max_abs_lat = max(left["lat_key"].abs().max(), right["lat_key"].abs().max()) / COORD_SCALE
+    meters_per_key = METERS_PER_DEGREE * max(math.cos(math.radians(max_abs_lat)), 1e-6) / COORD_SCALE
+    bucket = max(1, math.ceil(tolerance_m / meters_per_key))
+
+    left = left.astype("int64").assign(
+        b_lat=lambda d: d["lat_key"] // bucket, b_lon=lambda d: d["lon_key"] // bucket,
+    ).rename_axis("left_idx").reset_index()
+    right = right.astype("int64").assign(
+        b_lat=lambda d: d["lat_key"] // bucket, b_lon=lambda d: d["lon_key"] // bucket,
+    ).rename_axis("right_idx").reset_index()
+
+    candidates = pd.concat(
+        [
+            left.merge(
+                right.assign(b_lat=right["b_lat"] + d_lat, b_lon=right["b_lon"] + d_lon),
+                on=["b_lat", "b_lon"],
+                suffixes=("", "_r"),
+            )
+            for d_lat in (-1, 0, 1)
+            for d_lon in (-1, 0, 1)
+        ],
+        ignore_index=True,
     )
+    if candidates.empty:
+        return pd.Series(dtype="int64")
+
+    cos_lat = np.cos(np.radians(candidates["lat_key"].to_numpy() / COORD_SCALE))
+    d_lat = (candidates["lat_key_r"].to_numpy() - candidates["lat_key"].to_numpy()) / COORD_SCALE
+    d_lon = (candidates["lon_key_r"].to_numpy() - candidates["lon_key"].to_numpy()) / COORD_SCALE * cos_lat
+    candidates["distance_m"] = np.hypot(d_lat, d_lon) * METERS_PER_DEGREE
+
+    candidates = candidates[candidates["distance_m"] <= tolerance_m]
+    nearest = candidates.loc[candidates.groupby("left_idx")["distance_m"].idxmin()]
+    return pd.Series(nearest["right_idx"].to_numpy(), index=nearest["left_idx"].to_numpy())
+
 
-    national["lat"] = national["시설위도"].round(4)
-    national["lon"] = national["시설경도"].round(4)
-    national["좌표"] = national.apply(
-        lambda x: f"({x['lat']}, {x['lon']})",
-        axis=1,
+def merge_data(programs, national, tolerance_m: float = 0.0):
+    """
+    전국 체육시설(national)에 시니어 프로그램(programs)을 좌표 정수 키로 조인.
+    tolerance_m > 0이면 정확히 일치하지 않은 시설은 tolerance_m 이내의 가장 가까운 프로그램과 매칭.
+
+    Returns:
+        (merged, stats) - stats: 시설/프로그램 수, 정확/근접 매칭 수, 미매칭 수, 소요 시간
+    """
+    start = time.perf_counter()
+
+    programs = programs[programs["lat_key"].notna() & programs["lon_key"].notna()]
+    program_columns = [c for c in programs.columns if c not in KEY_COLUMNS]
+
+    merged = national.merge(
+        programs.rename_axis("_program_row").reset_index(),
+        on=KEY_COLUMNS,
+        how="left",
+        suffixes=("_x", "_y"),
     )
+    exact = merged["_program_row"].notna()
+    matched_tolerance = 0
 
-    return programs, national
+    if tolerance_m > 0:
+        unmatched = merged.loc[~exact & merged["lat_key"].notna() & merged["lon_key"].notna(), KEY_COLUMNS]
+        nearest = _nearest_within(unmatched, programs[KEY_COLUMNS], tolerance_m)
+        if not nearest.empty:
+            # national과 이름이 겹친 프로그램 컬럼은 merge에서 _y가 붙는다
+            target_columns = [c if c in merged.columns else f"{c}_y" for c in program_columns]
+            merged.loc[nearest.index, target_columns] = programs.loc[nearest.to_numpy(), program_columns].to_numpy()
+            merged.loc[nearest.index, "_program_row"] = nearest.to_numpy()
+            matched_tolerance = len(nearest)
+
+    used_programs = merged["_program_row"].dropna().nunique()
+    stats = {
+        "national_rows": len(national),
+        "program_rows": len(programs),
+        "matched_exact": int(exact.sum()),
+        "matched_tolerance": matched_tolerance,
+        "unmatched_national": int(merged["_program_row"].isna().sum()),
+        "unmatched_programs": len(programs) - used_programs,
+    }
 
+    merged = merged.drop(columns=KEY_COLUMNS + ["_program_row"])
 
-def merge_data(programs, national):
-    merged = national.merge(programs, on="좌표", how="left")
+    # programs가 아직 JSON 문자열일 때 컬럼 단위 해시로 중복 제거
+    before = len(merged)
+    merged = deduplicate_frame(merged, columns=[c for c in merged.columns if c != "fac_uid"])
+    stats["duplicates_dropped"] = before - len(merged)
 
     # JSON 문자열로 되어있는 programs 컬럼을 리스트로 변환
     merged["programs"] = merged["programs"].apply(
         lambda x: json.loads(x) if isinstance(x, str) else x
     )
 
-    return merged
+    stats["seconds"] = time.perf_counter() - start
+    return merged, stats
 
 
 def save_json(merged, output_path):
     records = merged.to_dict(orient="records")
-    records = deduplicate_records(records)
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(records, f, ensure_ascii=False, indent=2)
 
 
-def deduplicate_records(records):
+def _dedupe_key_column(df: pd.DataFrame, content_hash: pd.Series) -> pd.Series:
+    """facility_name → facility_id → 행 내용 해시 순으로 중복 판단 기준 키"""
+    key = pd.Series(pd.NA, index=df.index, dtype="object")
+    for column in ("facility_id", "facility_name"):
+        if column in df.columns:
+            values = df[column]
+            valid = values.notna() & (values.astype(str) != "")
+            key = key.where(~valid, values.astype(str))
+    return key.fillna("#" + content_hash.astype(str))
+
+
+def deduplicate_frame(df: pd.DataFrame, columns=None) -> pd.DataFrame:
+    """
+    DataFrame 버전 중복 제거 (deduplicate_records와 같은 규칙).
+    같은 시설 키(facility_name, 없으면 facility_id, 둘 다 없으면 행 내용)의 바로 앞 행과
+    내용이 같으면 제외한다. 내용 비교는 columns(기본: 전체)에 대한 64비트 해시로 한다.
+    (리스트처럼 해시할 수 없는 값이 있는 컬럼은 문자열 상태에서 호출할 것)
+    """
+    if df.empty:
+        return df
+    row_hash = content_hash(df, columns)
+    key = _dedupe_key_column(df, row_hash)
+    previous_hash = row_hash.groupby(key, sort=False).shift()
+    return df[row_hash.ne(previous_hash).fillna(True).astype(bool)]
+
+
+def _record_hashes(frame: pd.DataFrame) -> pd.Series:
+    """
+    레코드(dict) 청크의 64비트 내용 해시. 컬럼별로 hash_pandas_object를 계산해 컬럼명과 섞어 더하므로
+    청크마다 컬럼 구성이 달라도(값이 없는 키는 건너뜀) 같은 레코드는 같은 해시가 된다.
+    """
+    total = np.zeros(len(frame), dtype=np.uint64)
+    for name in frame.columns:
+        values = frame[name]
+        present = values.notna().to_numpy()
+        hashed = pd.util.hash_pandas_object(values.astype(str), index=False).to_numpy()
+        salt = pd.util.hash_array(np.array([str(name)], dtype=object))[0]
+        total += np.where(present, (hashed ^ salt) * np.uint64(0x9E3779B97F4A7C15), np.uint64(0))
+    return pd.Series(total.view("int64"), index=frame.index)
+
+
+def iter_deduplicated(records, chunk_size: int = DEDUPE_CHUNK_SIZE):
+    """
+    레코드 이터레이터를 흘려 보내며 중복 제거 (deduplicate_frame과 같은 규칙).
+    chunk_size개씩 모아 해시와 시설 키를 한 번에 계산하고,
+    시설 키마다 마지막 레코드의 64비트 해시만 들고 있으므로 메모리는 시설 수에 비례한다.
+    """
     seen = {}
-    deduped = []
+    records = iter(records)
 
-    for record in records:
-        facility_key = record.get("facility_name") or record.get("facility_id")
-        serialized = json.dumps(record, sort_keys=True, ensure_ascii=False)
-        dedupe_key = facility_key or serialized
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        # dtype=object: 값이 빠진 컬럼 때문에 정수가 실수로 바뀌어 해시가 달라지지 않도록
+        frame = pd.DataFrame(chunk, dtype=object)
+        row_hash = _record_hashes(frame)
+        keys = _dedupe_key_column(frame, row_hash)
 
-        if dedupe_key in seen and seen[dedupe_key] == serialized:
-            continue
+        for record, key, digest in zip(chunk, keys.tolist(), row_hash.tolist()):
+            if seen.get(key) == digest:
+                continue
+            seen[key] = digest
+            yield record
 
-        seen[dedupe_key] = serialized
-        deduped.append(record)
 
-    return deduped
+def deduplicate_records(records):
+    return list(iter_deduplicated(records))
+
+
+# ---------------------------------------------------------------------------
+# 증분 빌드
+# ---------------------------------------------------------------------------
+
+def _national_state(national: pd.DataFrame) -> pd.DataFrame:
+    """시설 행 지문: fac_uid, 원본 컬럼 해시, 좌표 키"""
+    source_columns = [c for c in national.columns if c not in KEY_COLUMNS + ["fac_uid"]]
+    return pd.DataFrame({
+        "fac_uid": national["fac_uid"],
+        "fp": content_hash(national, source_columns),
+        "lat_key": national["lat_key"],
+        "lon_key": national["lon_key"],
+    })
+
+
+def _programs_state(programs: pd.DataFrame) -> pd.DataFrame:
+    """좌표 키별 프로그램 지문 (같은 좌표의 프로그램 행 해시 합, 순서와 무관)"""
+    programs = programs[programs["lat_key"].notna() & programs["lon_key"].notna()]
+    source_columns = [c for c in programs.columns if c not in KEY_COLUMNS]
+    fp = pd.util.hash_pandas_object(programs[source_columns], index=False)
+    state = programs[KEY_COLUMNS].assign(fp=fp.to_numpy()).groupby(KEY_COLUMNS, as_index=False)["fp"].sum()
+    state["fp"] = state["fp"].to_numpy().view("int64")
+    return state
+
+
+def _match_params(tolerance_m: float) -> dict:
+    """조인 결과를 바꾸는 매칭 조건 (직전 빌드와 다르면 증분 빌드를 할 수 없다)"""
+    return {"tolerance_m": float(tolerance_m), "coord_scale": COORD_SCALE}
+
+
+def _load_params():
+    try:
+        with open(STATE_DIR / "params.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _load_state():
+    try:
+        return (
+            pd.read_parquet(STATE_DIR / "national.parquet"),
+            pd.read_parquet(STATE_DIR / "programs.parquet"),
+        )
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(national_state: pd.DataFrame, programs_state: pd.DataFrame, params: dict) -> None:
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    national_state.to_parquet(STATE_DIR / "national.parquet", index=False)
+    programs_state.to_parquet(STATE_DIR / "programs.parquet", index=False)
+    with open(STATE_DIR / "params.json", "w", encoding="utf-8") as f:
+        json.dump(params, f)
+
+
+def _changed_program_keys(prev: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """프로그램이 추가/변경/삭제된 좌표 키"""
+    both = prev.merge(new, on=KEY_COLUMNS, how="outer", suffixes=("_prev", ""))
+    changed = both["fp"].isna() | both["fp_prev"].isna() | (both["fp"] != both["fp_prev"])
+    return both.loc[changed, KEY_COLUMNS].astype("int64")
+
+
+def _facilities_near(national: pd.DataFrame, keys: pd.DataFrame, tolerance_m: float) -> pd.Index:
+    """keys 좌표와 같은(또는 tolerance_m 이내인) 시설 행 인덱스"""
+    if keys.empty:
+        return national.index[:0]
+    located = national[national["lat_key"].notna() & national["lon_key"].notna()]
+    exact = located.index[
+        pd.MultiIndex.from_frame(located[KEY_COLUMNS].astype("int64")).isin(
+            pd.MultiIndex.from_frame(keys)
+        )
+    ]
+    if tolerance_m <= 0:
+        return exact
+    near = _nearest_within(located[KEY_COLUMNS], keys.reset_index(drop=True), tolerance_m)
+    return exact.union(near.index)
+
+
+def build_full(programs, national, tolerance_m: float):
+    merged, stats = merge_data(programs, national, tolerance_m=tolerance_m)
+    save_json(merged, MASTER_PATH)
+    delta = {
+        "added": sorted(merged["fac_uid"].dropna().unique().tolist()),
+        "changed": [],
+        "removed": [],
+        "records": [],
+        "full_rebuild": True,
+    }
+    return delta, stats
+
+
+def build_incremental(programs, national, tolerance_m: float, prev_state):
+    """
+    직전 빌드의 입력 행 지문과 비교해 바뀐 시설만 다시 조인하고,
+    added / changed / removed fac_uid와 바뀐 레코드를 delta로 돌려준다.
+    """
+    prev_national, prev_programs = prev_state
+    national_state = _national_state(national)
+
+    compared = national_state[["fac_uid", "fp"]].merge(
+        prev_national[["fac_uid", "fp"]], on="fac_uid", how="outer", suffixes=("", "_prev"), indicator=True,
+    )
+    added = set(compared.loc[compared["_merge"] == "left_only", "fac_uid"])
+    removed = set(compared.loc[compared["_merge"] == "right_only", "fac_uid"])
+    changed = set(compared.loc[(compared["_merge"] == "both") & (compared["fp"] != compared["fp_prev"]), "fac_uid"])
+
+    # 프로그램이 바뀐 좌표의 시설도 다시 조인
+    program_keys = _changed_program_keys(prev_programs, _programs_state(programs))
+    changed |= set(national.loc[_facilities_near(national, program_keys, tolerance_m), "fac_uid"]) - added
+
+    targets = national[national["fac_uid"].isin(added | changed)]
+    merged, stats = merge_data(programs, targets, tolerance_m=tolerance_m)
+
+    delta = {
+        "added": sorted(added),
+        "changed": sorted(changed),
+        "removed": sorted(removed),
+        "records": merged.to_dict(orient="records"),
+        "full_rebuild": False,
+    }
+    return delta, stats
+
+
+def apply_delta_to_master(delta) -> None:
+    """facility_program_master.json에 delta 반영 (바뀐 시설 레코드만 교체)"""
+    with open(MASTER_PATH, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    stale = set(delta["changed"]) | set(delta["removed"]) | set(delta["added"])
+    records = [r for r in records if r.get("fac_uid") not in stale] + delta["records"]
+    with open(MASTER_PATH, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+
+
+def _master_has_uids() -> bool:
+    """기존 master가 fac_uid를 가진 형식인지 (앞부분만 확인)"""
+    try:
+        with open(MASTER_PATH, "r", encoding="utf-8") as f:
+            head = f.read(64 * 1024)
+    except OSError:
+        return False
+    return '"fac_uid"' in head
 
 
 def main():
+    parser = argparse.ArgumentParser(description="facility_program_master.json 생성")
+    parser.add_argument(
+        "--tolerance-m", type=float, default=0.0,
+        help="좌표가 정확히 일치하지 않을 때 허용할 최대 거리(m), 0이면 정확히 일치하는 것만",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="직전 빌드 이후 바뀐 시설만 다시 계산하고 delta 파일 생성",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
     programs, national = load_data()
-    merged = merge_data(programs, national)
-    save_json(merged, PROCESSED_DIR / "facility_program_master.json")
+
+    params = _match_params(args.tolerance_m)
+    prev_state = None
+    if args.incremental and _master_has_uids():
+        prev_params = _load_params()
+        if prev_params == params:
+            prev_state = _load_state()
+        else:
+            # 매칭 조건이 바뀌면 바뀌지 않은 시설의 조인 결과도 달라지므로 전체 빌드
+            print(f"매칭 조건이 직전 빌드({prev_params})와 달라 전체 빌드합니다: {params}")
+    if prev_state is None:
+        delta, stats = build_full(programs, national, args.tolerance_m)
+    else:
+        delta, stats = build_incremental(programs, national, args.tolerance_m, prev_state)
+        apply_delta_to_master(delta)
+    _save_state(_national_state(national), _programs_state(programs), params)
+
+    with open(DELTA_PATH, "w", encoding="utf-8") as f:
+        json.dump(delta, f, ensure_ascii=False)
+
+    mode = "전체" if delta["full_rebuild"] else "증분"
+    print(
+        f"[{mode} 빌드] 시설 {stats['national_rows']}행, 프로그램 {stats['program_rows']}행 → "
+        f"정확 매칭 {stats['matched_exact']}, 근접 매칭 {stats['matched_tolerance']}, "
+        f"프로그램 없는 시설 {stats['unmatched_national']}, 매칭 안 된 프로그램 {stats['unmatched_programs']}, "
+        f"중복 제거 {stats['duplicates_dropped']}"
+    )
+    if not delta["full_rebuild"]:
+        print(f"delta: 추가 {len(delta['added'])}, 변경 {len(delta['changed'])}, 삭제 {len(delta['removed'])}")
+    print(f"조인 {stats['seconds']:.2f}s / 전체 {time.perf_counter() - start:.2f}s")
 
 
 if __name__ == "__main__":
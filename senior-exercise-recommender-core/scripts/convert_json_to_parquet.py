@@ -1,131 +1,252 @@
 #!/usr/bin/env python3
 """
 JSON 파일을 Parquet 형식으로 변환
+
+facility_program_master.json을 한 번에 json.load 하지 않고
+레코드를 스트리밍으로 읽어 일정 레코드 수(chunk)씩 카탈로그 행으로 변환한 뒤
+Arrow 배치로 ParquetWriter에 row group 단위로 기록한다.
+(레코드 → 카탈로그 행 변환은 pipeline.load_facility_master와 같은 recommender.normalization 사용)
+
+행 데이터는 청크 하나만 메모리에 두고, 중복 제거용으로는 고유 행마다 64비트 해시 하나
+(고유 시설 수 집계용으로는 고유 시설마다 하나)만 정렬 배열로 누적한다.
+즉 메모리는 청크 크기 + O(고유 행 수 × 8바이트)이며, 끝나면 최대 RSS를 출력한다.
+
+--partition-by sido|sigungu를 주면 같은 행을 주소의 시/도(또는 시/군/구)별 파일로도 나눠 쓰고
+파티션별 bounding box 매니페스트를 만든다 (FACILITY_CATALOG_BACKEND=partitioned에서 사용).
+
+사용법:
+    python scripts/convert_json_to_parquet.py [--input master.json] [--output master.parquet] [--chunk-rows 50000]
+                                              [--partition-by sido|sigungu] [--partition-dir DIR]
 """
+import os
+import sys
 import json
-import pandas as pd
+import time
+import shutil
+import resource
+import argparse
+from collections import Counter
 from pathlib import Path
+from typing import Optional
+
 import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from recommender.catalog import PARTITION_DIR, PARTITION_LEVELS, PARTITION_MANIFEST, region_keys
+from recommender.pipeline import (
+    CATALOG_CHUNK_ROWS,
+    CATALOG_DEDUP_COLUMNS,
+    iter_catalog_frames,
+    iter_master_records,
+)
+
 JSON_PATH = BASE_DIR / "data" / "processed" / "facility_program_master.json"
 PARQUET_PATH = BASE_DIR / "data" / "processed" / "facility_program_master.parquet"
 
+# 반복이 많은 문자열 컬럼(catalog.CATEGORICAL_COLUMNS)은 dictionary 인코딩 → 읽으면 pandas Categorical
+DICTIONARY_STRING = pa.dictionary(pa.int32(), pa.string())
+
+PARQUET_SCHEMA = pa.schema([
+    ("fac_id", pa.string()),
+    ("fac_name", DICTIONARY_STRING),
+    ("address", DICTIONARY_STRING),
+    ("lat", pa.float64()),
+    ("lon", pa.float64()),
+    ("is_indoor", pa.bool_()),
+    ("sport_category", DICTIONARY_STRING),
+    ("program_name", DICTIONARY_STRING),
+    ("intensity_level", DICTIONARY_STRING),
+    ("senior_friendly", pa.bool_()),
+    ("operating_hours", DICTIONARY_STRING),
+    ("schedule_mask", pa.int64()),
+    ("nearest_walk_time_sec", pa.float64()),
+    ("nearest_walk_distance_m", pa.float64()),
+    ("has_subway_within_600m", pa.bool_()),
+    ("num_transit_within_300m", pa.int32()),
+    ("accessibility_score", pa.float64()),
+])
+
+
+def peak_rss_mb() -> float:
+    """현재 프로세스의 최대 RSS (MB, Linux 기준 ru_maxrss는 KB)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class HashSet:
+    """
+    64비트 해시의 정렬 배열.
+    조회는 searchsorted(청크 k개에 O(k log N)), 추가는 제자리 병합(np.insert, O(N + k))이라
+    청크마다 전체 배열을 다시 정렬하거나 np.isin으로 훑지 않는다.
+    """
+
+    def __init__(self):
+        self.values = np.empty(0, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, hashes: np.ndarray) -> np.ndarray:
+        """hashes를 추가하고, 처음 나온 값(청크 안에서도 첫 번째)이면 True인 마스크 반환"""
+        first = ~pd.Series(hashes).duplicated().to_numpy()
+        pos = np.searchsorted(self.values, hashes)
+        found = pos < len(self.values)
+        found[found] = self.values[pos[found]] == hashes[found]
+        new = first & ~found
+        if new.any():
+            order = np.sort(hashes[new])
+            self.values = np.insert(self.values, np.searchsorted(self.values, order), order)
+        return new
+
+
+def _drop_seen(df: pd.DataFrame, seen: HashSet) -> pd.DataFrame:
+    """
+    앞선 청크에 이미 나온 행과 청크 내 중복 행을 제거.
+    전체 행 대신 (fac_name, program_name, lat, lon) 64비트 해시만 seen에 누적한다.
+    """
+    hashes = pd.util.hash_pandas_object(df[CATALOG_DEDUP_COLUMNS], index=False).to_numpy()
+    return df[seen.add(hashes)]
+
+
+class RegionPartitionWriter:
+    """
+    청크를 지역 키별 Parquet 파일(part-0000.parquet …)로 나눠 쓰고,
+    끝나면 매니페스트(지역, 파일, 행 수, bounding box)를 기록한다.
+    임시 디렉터리에 모두 쓴 뒤 기존 파티션 디렉터리와 교체한다.
+    """
+
+    def __init__(self, directory: Path, partition_by: str, row_group_size: int):
+        self.directory = directory
+        self.staging = directory.with_name(directory.name + ".tmp")
+        self.partition_by = partition_by
+        self.row_group_size = row_group_size
+        shutil.rmtree(self.staging, ignore_errors=True)
+        self.staging.mkdir(parents=True)
+        self.writers = {}
+        self.parts = {}
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        regions = region_keys(chunk["address"], self.partition_by)
+        for region, rows in chunk.groupby(regions, sort=False):
+            part = self.parts.get(region)
+            if part is None:
+                part = {
+                    "region": region,
+                    "file": f"part-{len(self.parts):04d}.parquet",
+                    "rows": 0,
+                    "min_lat": float("inf"), "max_lat": float("-inf"),
+                    "min_lon": float("inf"), "max_lon": float("-inf"),
+                }
+                self.parts[region] = part
+                self.writers[region] = pq.ParquetWriter(self.staging / part["file"], PARQUET_SCHEMA)
+            self.writers[region].write_table(
+                pa.Table.from_pandas(rows, schema=PARQUET_SCHEMA, preserve_index=False),
+                row_group_size=self.row_group_size,
+            )
+            part["rows"] += len(rows)
+            part["min_lat"] = min(part["min_lat"], float(rows["lat"].min()))
+            part["max_lat"] = max(part["max_lat"], float(rows["lat"].max()))
+            part["min_lon"] = min(part["min_lon"], float(rows["lon"].min()))
+            part["max_lon"] = max(part["max_lon"], float(rows["lon"].max()))
+
+    def close(self) -> list:
+        for writer in self.writers.values():
+            writer.close()
+        partitions = sorted(self.parts.values(), key=lambda part: part["region"])
+        with open(self.staging / PARTITION_MANIFEST, "w", encoding="utf-8") as f:
+            json.dump({"partition_by": self.partition_by, "partitions": partitions}, f, ensure_ascii=False, indent=2)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.replace(self.staging, self.directory)
+        return partitions
+
+
+def convert_json_to_parquet(
+    json_path: Path = JSON_PATH,
+    parquet_path: Path = PARQUET_PATH,
+    chunk_rows: int = CATALOG_CHUNK_ROWS,
+    partition_by: Optional[str] = None,
+    partition_dir: Path = PARTITION_DIR,
+):
+    """JSON 파일을 Parquet 형식으로 변환 (청크 하나가 row group 하나)"""
+    print(f'JSON 파일 스트리밍 변환: {json_path}')
+    start = time.perf_counter()
+
+    parquet_path.parent.mkdir(parents=True, exist_ok=True)
+    stats = {"rows": 0, "written": 0, "row_groups": 0}
+    regions = Counter()
+    facilities = HashSet()
+    seen = HashSet()
+    sample = None
+    partitions = RegionPartitionWriter(partition_dir, partition_by, chunk_rows) if partition_by else None
+
+    with pq.ParquetWriter(parquet_path, PARQUET_SCHEMA) as writer:
+        for chunk in iter_catalog_frames(iter_master_records(json_path), chunk_rows=chunk_rows):
+            stats["rows"] += len(chunk)
+            chunk = _drop_seen(chunk, seen)
+            if chunk.empty:
+                continue
+
+            writer.write_table(
+                pa.Table.from_pandas(chunk, schema=PARQUET_SCHEMA, preserve_index=False),
+                row_group_size=chunk_rows,
+            )
+            if partitions:
+                partitions.write(chunk)
+            stats["written"] += len(chunk)
+            stats["row_groups"] += 1
+            regions.update(chunk['address'].str.split(' ').str[0].value_counts().to_dict())
+            facilities.add(pd.util.hash_pandas_object(chunk['fac_name'], index=False).to_numpy())
+            if sample is None:
+                sample = chunk.head(5)
+            print(f'  처리 중: {stats["rows"]}행 변환, {stats["written"]}행 기록 (최대 RSS {peak_rss_mb():.0f} MB)')
+
+    if partitions:
+        stats["partitions"] = partitions.close()
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["peak_rss_mb"] = peak_rss_mb()
+
+    print(f'\n변환된 레코드: {stats["rows"]}개')
+    print(f'중복 제거: {stats["rows"]}개 -> {stats["written"]}개')
+    print(f'고유 시설 수: {len(facilities)}개')
+
+    print(f'\n✅ Parquet 파일 저장 완료: {parquet_path}')
+    print(f'   파일 크기: {parquet_path.stat().st_size / (1024*1024):.2f} MB, row group {stats["row_groups"]}개')
+    print(f'   소요 시간: {stats["seconds"]:.1f}s, 최대 RSS: {stats["peak_rss_mb"]:.0f} MB')
+
+    if partitions:
+        print(f'   지역 파티션 {len(stats["partitions"])}개 ({partition_by}): {partition_dir}')
+
+    if sample is not None:
+        print(f'\n샘플 데이터 (처음 5개):')
+        print(sample[['fac_name', 'address', 'lat', 'lon', 'is_indoor', 'sport_category']].to_string())
 
-def convert_json_to_parquet():
-    """JSON 파일을 Parquet 형식으로 변환"""
-    print(f'JSON 파일 로딩: {JSON_PATH}')
-    
-    with open(JSON_PATH, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    print(f'총 {len(data)}개 레코드 로드됨')
-    
-    # JSON 데이터를 DataFrame으로 변환
-    rows = []
-    for idx, item in enumerate(data):
-        # 필수 필드 추출
-        fac_name = str(item.get('시설명', '')).strip() if pd.notna(item.get('시설명')) else ''
-        address = str(item.get('주소', '')).strip() if pd.notna(item.get('주소')) else ''
-        lat = item.get('시설위도')
-        lon = item.get('시설경도')
-        is_indoor_str = str(item.get('실내여부', '')) if pd.notna(item.get('실내여부')) else ''
-        sport_category = str(item.get('시설유형명', '')).strip() if pd.notna(item.get('시설유형명')) else ''
-        
-        # 좌표가 유효한지 확인
-        if pd.isna(lat) or pd.isna(lon) or not fac_name:
-            continue
-        
-        # 실내여부 변환
-        is_indoor = is_indoor_str == '실내' if is_indoor_str else True
-        
-        # 프로그램 정보 처리
-        # programs 필드가 있으면 사용, 없으면 기본값
-        programs = item.get('programs')
-        
-        # programs가 배열이거나 NaN인지 확인
-        is_programs_empty = (
-            pd.isna(programs) if not isinstance(programs, (list, dict)) else False
-        ) or programs is None or programs == '' or (isinstance(programs, list) and len(programs) == 0)
-        
-        if is_programs_empty:
-            # 기본 프로그램 정보 생성
-            program_name = f'{sport_category} 프로그램' if sport_category else '일반 운동 프로그램'
-            intensity_level = 'medium'  # 기본값
-            senior_friendly = True  # 기본값
-            operating_hours = '평일 오전'
-            
-            rows.append({
-                'fac_id': f'F{len(rows):06d}',
-                'fac_name': fac_name,
-                'address': address,
-                'lat': float(lat),
-                'lon': float(lon),
-                'is_indoor': is_indoor,
-                'sport_category': sport_category if sport_category else 'general',
-                'program_name': program_name,
-                'intensity_level': intensity_level,
-                'senior_friendly': senior_friendly,
-                'operating_hours': operating_hours,
-            })
-        else:
-            # programs가 있으면 처리 (나중에 확장 가능)
-            # 일단 기본값으로 처리
-            program_name = f'{sport_category} 프로그램' if sport_category else '일반 운동 프로그램'
-            intensity_level = 'medium'
-            senior_friendly = True
-            operating_hours = '평일 오전'
-            
-            rows.append({
-                'fac_id': f'F{len(rows):06d}',
-                'fac_name': fac_name,
-                'address': address,
-                'lat': float(lat),
-                'lon': float(lon),
-                'is_indoor': is_indoor,
-                'sport_category': sport_category if sport_category else 'general',
-                'program_name': program_name,
-                'intensity_level': intensity_level,
-                'senior_friendly': senior_friendly,
-                'operating_hours': operating_hours,
-            })
-        
-        if (idx + 1) % 10000 == 0:
-            print(f'  처리 중: {idx + 1}/{len(data)} ({len(rows)}개 변환됨)')
-    
-    print(f'\n변환된 레코드: {len(rows)}개')
-    
-    # DataFrame 생성
-    df = pd.DataFrame(rows)
-    
-    # 중복 제거 (같은 시설, 같은 프로그램, 같은 위치)
-    before_dedup = len(df)
-    df = df.drop_duplicates(subset=['fac_name', 'program_name', 'lat', 'lon'])
-    after_dedup = len(df)
-    
-    print(f'중복 제거: {before_dedup}개 -> {after_dedup}개')
-    print(f'고유 시설 수: {df["fac_name"].nunique()}개')
-    
-    # Parquet로 저장
-    PARQUET_PATH.parent.mkdir(parents=True, exist_ok=True)
-    df.to_parquet(PARQUET_PATH, index=False)
-    
-    print(f'\n✅ Parquet 파일 저장 완료: {PARQUET_PATH}')
-    print(f'   파일 크기: {PARQUET_PATH.stat().st_size / (1024*1024):.2f} MB')
-    
-    # 샘플 확인
-    print(f'\n샘플 데이터 (처음 5개):')
-    print(df[['fac_name', 'address', 'lat', 'lon', 'is_indoor', 'sport_category']].head(5).to_string())
-    
     # 지역별 통계
     print(f'\n지역별 시설 수 (상위 10개):')
-    if 'address' in df.columns:
-        regions = df['address'].str.split(' ').str[0].value_counts().head(10)
-        print(regions)
-    
-    return df
+    for region, count in regions.most_common(10):
+        print(f'{region}    {count}')
 
+    return stats
 
-if __name__ == "__main__":
-    convert_json_to_parquet()
 
+def main():
+    parser = argparse.ArgumentParser(description="facility_program_master.json → Parquet 스트리밍 변환")
+    parser.add_argument("--input", type=Path, default=JSON_PATH)
+    parser.add_argument("--output", type=Path, default=PARQUET_PATH)
+    parser.add_argument("--chunk-rows", type=int, default=CATALOG_CHUNK_ROWS, help="청크(row group)당 master 레코드 수")
+    parser.add_argument(
+        "--partition-by", choices=sorted(PARTITION_LEVELS), default=None,
+        help="시/도(sido) 또는 시/군/구(sigungu)별 파티션과 매니페스트도 생성",
+    )
+    parser.add_argument("--partition-dir", type=Path, default=PARTITION_DIR)
+    args = parser.parse_args()
+    convert_json_to_parquet(args.input, args.output, args.chunk_rows, args.partition_by, args.partition_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,111 @@
 
-"""더미 facility_program_master 데이터를 생성해 파이프라인을 테스트한다."""
+"""
+더미 facility_program_master 데이터를 생성해 파이프라인을 테스트한다.
+
+- --sample: 마포/은평 시설 5곳 × 프로그램 2개 = 10행짜리 카탈로그 Parquet (data/processed)
+- 기본(옵션 없이 실행하면 --rows 10k) / 규모 테스트(--rows 10k | 100k | 1M): seed로 재현 가능한 전국 합성 데이터
+    * 시설-프로그램 카탈로그: 주요 시/군/구 중심 좌표 주변에 인구 비중대로 몰려 있는 시설
+    * 사용자: 같은 도시 분포의 좌표, 나이/성별/건강 상태/운동 목표/선호 환경
+    * 오늘의 운동 이력(압축 형식), 그룹 세션과 참여자
+  를 청크 단위로 만들어 JSON / Parquet 파일(--formats)로 쓰고,
+  --postgres를 주면 users / facilities / group_session / group_participant 테이블에,
+  --history-db를 주면 운동 이력 SQLite 저장소에도 적재한다.
+
+사용법:
+    python scripts/fake_master_generator.py            # 전국 합성 데이터 10k행 → data/synthetic
+    python scripts/fake_master_generator.py --sample   # 10행짜리 샘플 카탈로그
+    python scripts/fake_master_generator.py --rows 100k --users 100k [--seed 42] [--formats json,parquet]
+                                            [--out-dir data/synthetic] [--postgres] [--history-db PATH]
+"""
 
 from __future__ import annotations
 
+import sys
+import json
+import time
 import random
+import argparse
+import datetime as dt
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
 
+import numpy as np
 import pandas as pd
 
 BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from recommender.schedule import schedule_masks, time_block_mask
+
 OUTPUT_PATH = BASE_DIR / "data" / "processed" / "facility_program_master.parquet"
+SYNTHETIC_DIR = BASE_DIR / "data" / "synthetic"
+
+CHUNK_FACILITIES = 20_000
+CHUNK_USERS = 50_000
+
+# (시/도, 시/군/구, 위도, 경도, 인구 비중, 분포 반경 km)
+CITY_CENTERS = [
+    ("서울특별시", "강남구", 37.5172, 127.0473, 5.3, 4.0),
+    ("서울특별시", "송파구", 37.5145, 127.1059, 6.5, 4.0),
+    ("서울특별시", "마포구", 37.5663, 126.9019, 3.6, 3.5),
+    ("서울특별시", "은평구", 37.6027, 126.9291, 4.6, 3.5),
+    ("서울특별시", "노원구", 37.6542, 127.0568, 5.0, 3.5),
+    ("서울특별시", "관악구", 37.4784, 126.9516, 4.8, 3.5),
+    ("부산광역시", "해운대구", 35.1631, 129.1636, 3.8, 5.0),
+    ("부산광역시", "부산진구", 35.1631, 129.0532, 3.6, 4.0),
+    ("대구광역시", "수성구", 35.8581, 128.6306, 4.1, 5.0),
+    ("대구광역시", "달서구", 35.8298, 128.5328, 5.3, 5.0),
+    ("인천광역시", "남동구", 37.4470, 126.7313, 5.0, 5.0),
+    ("인천광역시", "부평구", 37.5070, 126.7218, 4.8, 4.0),
+    ("광주광역시", "북구", 35.1742, 126.9120, 4.2, 5.0),
+    ("대전광역시", "서구", 36.3553, 127.3838, 4.6, 5.0),
+    ("울산광역시", "남구", 35.5438, 129.3300, 3.1, 5.0),
+    ("세종특별자치시", "세종시", 36.4800, 127.2890, 3.9, 8.0),
+    ("경기도", "수원시", 37.2636, 127.0286, 11.9, 7.0),
+    ("경기도", "고양시", 37.6584, 126.8320, 10.8, 7.0),
+    ("경기도", "성남시", 37.4200, 127.1265, 9.2, 6.0),
+    ("경기도", "용인시", 37.2411, 127.1776, 10.8, 9.0),
+    ("강원특별자치도", "춘천시", 37.8813, 127.7298, 2.9, 8.0),
+    ("강원특별자치도", "원주시", 37.3422, 127.9202, 3.6, 8.0),
+    ("충청북도", "청주시", 36.6424, 127.4890, 8.5, 8.0),
+    ("충청남도", "천안시", 36.8151, 127.1139, 6.6, 8.0),
+    ("전북특별자치도", "전주시", 35.8242, 127.1480, 6.5, 7.0),
+    ("전라남도", "순천시", 34.9507, 127.4872, 2.8, 9.0),
+    ("경상북도", "포항시", 36.0190, 129.3435, 5.0, 9.0),
+    ("경상남도", "창원시", 35.2280, 128.6811, 10.3, 9.0),
+    ("제주특별자치도", "제주시", 33.4996, 126.5312, 4.9, 9.0),
+]
+
+# (sport_category, 시설 유형 이름, 실내 비율, 프로그램 이름 후보)
+SPORTS = [
+    ("water_exercise", "수영장", 1.0, ["실버아쿠아로빅", "실버자유수영", "수중 재활", "아쿠아 워킹"]),
+    ("yoga", "요가센터", 1.0, ["실버 요가", "의자 요가", "시니어 명상 요가"]),
+    ("stretching", "체육센터", 1.0, ["맞춤형 필라테스", "건강 스트레칭", "관절 튼튼 체조"]),
+    ("light_strength", "체력단련장", 1.0, ["저충격 근력강화", "밴드 운동", "시니어 근력 교실"]),
+    ("dance", "문화센터", 1.0, ["시니어 댄스", "실버 라인댄스", "건강 에어로빅"]),
+    ("group_class", "복지관", 1.0, ["효도 체조", "함께 걷기 교실", "게이트볼 교실"]),
+    ("walking", "공원 걷기코스", 0.0, ["걷기 동호회", "숲길 걷기", "노르딕 워킹"]),
+    ("jogging", "운동장", 0.0, ["가벼운 달리기", "트랙 걷기·달리기"]),
+]
+SPORT_WEIGHTS = [0.2, 0.1, 0.15, 0.15, 0.1, 0.1, 0.15, 0.05]
+
+SCHEDULE_DAYS = ["월수금", "화목", "월화수목금", "토", "토일", "매일"]
+SCHEDULE_TIMES = ["06:00~06:50", "09:00~09:50", "10:00~10:50", "11:00~11:50",
+                  "14:00~14:50", "15:00~15:50", "19:00~19:50"]
+
+HEALTH_CONDITIONS = [("knee_pain", 0.3), ("back_pain", 0.25), ("hypertension", 0.35),
+                     ("diabetes", 0.2), ("heart_disease", 0.08)]
+EXERCISE_GOALS = [("blood_pressure", 0.3), ("weight", 0.3), ("strength", 0.35),
+                  ("flexibility", 0.35), ("social", 0.25)]
+PREFERRED_LOCATIONS = ["실내", "실외", "둘 다"]
+TIME_BLOCKS = ["오전", "오후", "저녁"]
+SURNAMES = list("김이박최정강조윤장임한오서신권황안송류홍")
+
+KM_PER_DEGREE = 111.32
+SYNTHETIC_PASSWORD = "synthetic1234"
+SYNTHETIC_SALT = b"$2b$12$syntheticseniorsalt00u"
+FORMATS = ("json", "parquet")
 
 
 def _sample_rows() -> list[dict]:
@@ -63,7 +159,497 @@ def build_fake_master() -> Path:
     return OUTPUT_PATH
 
 
-if __name__ == "__main__":
-    path = build_fake_master()
-    print(f"[fake_master_generator] Wrote {path}")
+# ---------------------------------------------------------------------------
+# 전국 규모 합성 데이터
+# ---------------------------------------------------------------------------
+
+def parse_size(text: str) -> int:
+    """'10k', '100k', '1M', '250000' → 행 수"""
+    text = text.strip().lower().replace("_", "")
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+def _city_arrays():
+    weights = np.array([c[4] for c in CITY_CENTERS])
+    return {
+        "sido": np.array([c[0] for c in CITY_CENTERS], dtype=object),
+        "sigungu": np.array([c[1] for c in CITY_CENTERS], dtype=object),
+        "lat": np.array([c[2] for c in CITY_CENTERS]),
+        "lon": np.array([c[3] for c in CITY_CENTERS]),
+        "spread_km": np.array([c[5] for c in CITY_CENTERS]),
+        "p": weights / weights.sum(),
+    }
+
+
+def _clustered_points(rng: np.random.Generator, cities: dict, n: int, spread_scale: float = 1.0):
+    """도시 중심 주변 정규분포 좌표 (도시는 인구 비중으로 선택)"""
+    city = rng.choice(len(cities["p"]), size=n, p=cities["p"])
+    spread_deg = cities["spread_km"][city] * spread_scale / KM_PER_DEGREE
+    lat = cities["lat"][city] + rng.normal(0.0, 1.0, n) * spread_deg
+    lon = cities["lon"][city] + rng.normal(0.0, 1.0, n) * spread_deg / np.cos(np.radians(cities["lat"][city]))
+    return city, lat.round(7), lon.round(7)
+
+
+def iter_facility_records(
+    rows: int,
+    rng: np.random.Generator,
+    chunk_facilities: int = CHUNK_FACILITIES,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    카탈로그 행 수가 rows가 될 때까지 master 레코드(build_master 출력 형식)를 청크로 생성.
+    프로그램이 없는 시설(약 15%)은 카탈로그에서 한 행, 나머지는 프로그램 수만큼 행이 된다.
+    """
+    cities = _city_arrays()
+    remaining, next_id = rows, 0
+    while remaining > 0:
+        n = min(chunk_facilities, remaining)
+        city, lat, lon = _clustered_points(rng, cities, n)
+        sport = rng.choice(len(SPORTS), size=n, p=SPORT_WEIGHTS)
+        program_counts = rng.choice(5, size=n, p=[0.15, 0.3, 0.3, 0.15, 0.1])
+        # 마지막 청크는 카탈로그 행 수를 정확히 맞춘다 (마지막 시설의 프로그램 수를 줄임)
+        total = np.cumsum(np.maximum(program_counts, 1))
+        if total[-1] >= remaining:
+            n = int(np.searchsorted(total, remaining)) + 1
+            if program_counts[n - 1]:
+                program_counts[n - 1] = remaining - (int(total[n - 2]) if n > 1 else 0)
+        indoor = rng.random(n)
+        road_numbers = rng.integers(1, 300, size=n)
+        program_choices = rng.integers(0, 1 << 30, size=(n, 4))
+        # 대중교통 접근성: 특별시/광역시는 지하철역이 가깝고 정류장이 많게, 일부 시설은 정보 없음
+        metro = np.array([sido.endswith(("특별시", "광역시")) for sido in cities["sido"]])[city[:n]]
+        walk_sec = np.round(rng.gamma(2.0, np.where(metro, 150.0, 300.0)))
+        walk_m = np.round(walk_sec * rng.uniform(0.8, 1.2, size=n))
+        subway = rng.random(n) < np.where(metro, 0.6, 0.1)
+        transit_count = rng.poisson(np.where(metro, 4.0, 1.5))
+        transit_known = rng.random(n) < 0.9
+
+        records = []
+        for i in range(n):
+            category, facility_type, indoor_ratio, program_names = SPORTS[sport[i]]
+            sido, sigungu = cities["sido"][city[i]], cities["sigungu"][city[i]]
+            programs = [
+                {
+                    "program_name": f"{program_names[program_choices[i, j] % len(program_names)]} {j + 1}반",
+                    "schedules": [
+                        f"{SCHEDULE_DAYS[(program_choices[i, j] >> 4) % len(SCHEDULE_DAYS)]} / "
+                        f"{SCHEDULE_TIMES[(program_choices[i, j] >> 8) % len(SCHEDULE_TIMES)]}"
+                    ],
+                }
+                for j in range(int(program_counts[i]))
+            ]
+            records.append({
+                "fac_uid": f"S{next_id + i:015x}",
+                "시설명": f"{sigungu} {facility_type} {next_id + i}",
+                "주소": f"{sido} {sigungu} 시니어로 {road_numbers[i]}",
+                "시설위도": float(lat[i]),
+                "시설경도": float(lon[i]),
+                "실내여부": "실내" if indoor[i] < indoor_ratio else "실외",
+                "시설유형명": category,
+                "programs": programs or None,
+                "nearest_walk_time_sec": float(walk_sec[i]) if transit_known[i] else None,
+                "nearest_walk_distance_m": float(walk_m[i]) if transit_known[i] else None,
+                "has_subway_within_600m": bool(subway[i]) if transit_known[i] else None,
+                "num_transit_within_300m": int(transit_count[i]) if transit_known[i] else None,
+            })
+        remaining -= int(np.maximum(program_counts[:n], 1).sum())
+        next_id += n
+        yield records
+
+
+def _password_hash() -> str:
+    # 모든 합성 사용자가 같은 비밀번호 (bcrypt는 한 번만, 고정 salt로 계산해 seed마다 같은 결과)
+    import bcrypt
+
+    return bcrypt.hashpw(SYNTHETIC_PASSWORD.encode("utf-8"), SYNTHETIC_SALT).decode("utf-8")
+
+
+def _pick_subsets(rng: np.random.Generator, options, n: int) -> List[List[str]]:
+    picked = np.column_stack([rng.random(n) < p for _, p in options])
+    names = [name for name, _ in options]
+    return [[names[j] for j in np.flatnonzero(row)] for row in picked]
+
+
+def iter_user_frames(
+    users: int,
+    rng: np.random.Generator,
+    password_hash: str,
+    chunk_users: int = CHUNK_USERS,
+) -> Iterator[pd.DataFrame]:
+    """
+    users 테이블 형식(db.bulk_import.USER_COLUMNS + user_id, city) 사용자를 청크로 생성.
+    user_id는 1부터의 순번, 전화번호는 순번에서 만든 고유 값.
+    """
+    cities = _city_arrays()
+    for start in range(0, users, chunk_users):
+        n = min(chunk_users, users - start)
+        ids = np.arange(start + 1, start + n + 1)
+        city, lat, lon = _clustered_points(rng, cities, n, spread_scale=1.5)
+        birth = dt.date(1940, 1, 1).toordinal() + rng.integers(0, 365 * 20, size=n)
+        yield pd.DataFrame({
+            "user_id": ids,
+            "phone": [f"0109{i:07d}" for i in ids],
+            "password_hash": password_hash,
+            "name": [f"{SURNAMES[i % len(SURNAMES)]}시니어{i}" for i in ids],
+            "birth_date": [dt.date.fromordinal(int(d)).strftime("%Y%m%d") for d in birth],
+            "gender": np.where(rng.random(n) < 0.55, "female", "male"),
+            "health_conditions": _pick_subsets(rng, HEALTH_CONDITIONS, n),
+            "exercise_goals": _pick_subsets(rng, EXERCISE_GOALS, n),
+            "preferred_location": rng.choice(PREFERRED_LOCATIONS, size=n),
+            "guardian_phone": [f"0108{i:07d}" for i in ids],
+            "address_road": [
+                f"{cities['sido'][c]} {cities['sigungu'][c]} 행복로 {k}"
+                for c, k in zip(city, rng.integers(1, 500, size=n))
+            ],
+            "latitude": lat,
+            "longitude": lon,
+            "city": city,
+        })
+
+
+def history_frame(users: pd.DataFrame, rng: np.random.Generator, today: dt.date) -> pd.DataFrame:
+    """
+    사용자별 최근 오늘의 운동 이력 (history_store 압축 형식: last_day, last_body, exercise_index).
+    약 70%의 사용자가 지난 7일 안에 운동을 배정받은 것으로 만든다.
+    """
+    from recommender.exercise_catalog import get_exercise_catalog
+
+    catalog = get_exercise_catalog()
+    bodies = catalog.body_parts
+    has_history = rng.random(len(users)) < 0.7
+    picked = users[has_history]
+    body = rng.integers(0, len(bodies), size=len(picked))
+    pick = rng.integers(0, 1 << 30, size=len(picked))
+    exercise_index = [
+        catalog.index_of(catalog.by_body_part[bodies[b]][p % len(catalog.by_body_part[bodies[b]])])
+        for b, p in zip(body, pick)
+    ]
+    return pd.DataFrame({
+        "user_id": picked["user_id"].astype(str).to_numpy(),
+        "last_day": today.toordinal() - rng.integers(0, 7, size=len(picked)),
+        "last_body": [bodies[b] for b in body],
+        "exercise_index": exercise_index,
+    })
+
+
+class SessionSampler:
+    """
+    카탈로그 행 중 일부를 그룹 세션 후보로 뽑아 두고, 같은 도시 사용자로 참여자를 채운다.
+    세션 날짜/시간대는 프로그램 스케줄 비트마스크와 겹치는 (날짜, 오전/오후/저녁) 중에서 고른다.
+    """
+
+    def __init__(self, sessions: int, rows: int, rng: np.random.Generator):
+        self.rate = min(sessions / max(rows, 1), 1.0)
+        self.rng = rng
+        self.candidates: List[Dict[str, Any]] = []
+
+    def observe(self, records: List[Dict[str, Any]]) -> None:
+        cities = {(c[0], c[1]): idx for idx, c in enumerate(CITY_CENTERS)}
+        for record in records:
+            sido, sigungu = record["주소"].split()[:2]
+            for seq, program in enumerate(record["programs"] or []):
+                if self.rng.random() < self.rate:
+                    self.candidates.append({
+                        "fac_id": f"{record['fac_uid']}-{seq:02d}",
+                        "fac_name": record["시설명"],
+                        "program_name": program["program_name"],
+                        "city": cities[(sido, sigungu)],
+                        "schedule_mask": schedule_masks([program["schedules"]])[0],
+                    })
+
+    def build(self, user_city: np.ndarray, today: dt.date):
+        """(group_session 프레임, group_participant 프레임) - session_id는 1부터의 순번"""
+        rng = self.rng
+        sessions = pd.DataFrame(
+            self.candidates, columns=["fac_id", "fac_name", "program_name", "city", "schedule_mask"],
+        )
+        slots = [
+            (today + dt.timedelta(days=d), block)
+            for d in range(14) for block in TIME_BLOCKS
+        ]
+        slot_masks = np.array([time_block_mask(day, block) for day, block in slots], dtype=np.int64)
+        picked = []
+        for mask in sessions["schedule_mask"].to_numpy():
+            open_slots = np.flatnonzero(slot_masks & mask)
+            picked.append(slots[rng.choice(open_slots) if len(open_slots) else rng.integers(len(slots))])
+        sessions["session_date"] = [day for day, _ in picked]
+        sessions["time_block"] = [block for _, block in picked]
+        sessions = sessions.drop(columns="schedule_mask")
+        sessions = sessions.drop_duplicates(subset=["fac_id", "program_name", "session_date", "time_block"])
+        sessions.insert(0, "session_id", np.arange(1, len(sessions) + 1))
+        sessions["max_participants"] = 4
+        sessions["current_participants"] = rng.integers(0, 5, size=len(sessions))
 
+        pools = {city: np.flatnonzero(user_city == city) + 1 for city in np.unique(user_city)}
+        pool_sizes = sessions["city"].map(lambda city: len(pools.get(city, ()))).to_numpy()
+        sessions["current_participants"] = np.minimum(sessions["current_participants"].to_numpy(), pool_sizes)
+        session_ids, user_ids = [], []
+        for session_id, city, count in sessions[["session_id", "city", "current_participants"]].itertuples(index=False):
+            if count:
+                session_ids.extend([session_id] * int(count))
+                user_ids.extend(rng.choice(pools[city], size=int(count), replace=False).tolist())
+        sessions["status"] = np.where(sessions["current_participants"] >= sessions["max_participants"], "filled", "open")
+        participants = pd.DataFrame({"session_id": session_ids, "user_id": user_ids})
+        return sessions.drop(columns="city"), participants
+
+
+# ---------------------------------------------------------------------------
+# 출력 (JSON / Parquet / PostgreSQL / 운동 이력 SQLite)
+# ---------------------------------------------------------------------------
+
+class TableWriter:
+    """
+    한 테이블을 청크 단위로 이어 쓰는 writer.
+    - json: master는 build_master와 같은 JSON 배열(파이프라인이 스트리밍으로 읽음), 나머지는 JSON Lines
+    - parquet: 첫 청크의 스키마로 ParquetWriter를 열고 청크마다 row group 추가
+    """
+
+    def __init__(self, out_dir: Path, name: str, formats, json_array: bool = False):
+        self.json_path = out_dir / (f"{name}.json" if json_array else f"{name}.jsonl") if "json" in formats else None
+        self.parquet_path = out_dir / f"{name}.parquet" if "parquet" in formats else None
+        self.json_array = json_array
+        self.json_file = open(self.json_path, "w", encoding="utf-8") if self.json_path else None
+        self.parquet_writer = None
+        self.rows = 0
+        if self.json_file and json_array:
+            self.json_file.write("[")
+
+    def write_records(self, records: List[Dict[str, Any]]) -> None:
+        """dict 레코드를 JSON 배열에 추가 (master 전용)"""
+        for record in records:
+            self.json_file.write(",\n" if self.rows else "\n")
+            self.json_file.write(json.dumps(record, ensure_ascii=False))
+            self.rows += 1
+
+    def write_frame(self, frame: pd.DataFrame, parquet_frame: Optional[pd.DataFrame] = None) -> None:
+        """DataFrame 청크 기록 (parquet_frame을 주면 Parquet에는 그것을 씀)"""
+        if self.json_file and not self.json_array:
+            self.json_file.write(frame.to_json(orient="records", lines=True, force_ascii=False))
+            self.rows += len(frame)
+        if self.parquet_path:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame if parquet_frame is None else parquet_frame, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.parquet_path, table.schema)
+            else:
+                table = table.cast(self.parquet_writer.schema)
+            self.parquet_writer.write_table(table)
+
+    def close(self) -> List[Path]:
+        if self.json_file:
+            if self.json_array:
+                self.json_file.write("\n]\n")
+            self.json_file.close()
+        if self.parquet_writer:
+            self.parquet_writer.close()
+        return [path for path in (self.json_path, self.parquet_path) if path and path.exists()]
+
+
+def _copy_rows(table: str, columns: List[str], conflict: str, rows: List[List[Any]]) -> Dict[str, Any]:
+    from db.bulk_import import _load
+
+    return _load(table, columns, conflict, iter([rows]))
+
+
+def _load_users_postgres(users: pd.DataFrame) -> np.ndarray:
+    """사용자 청크를 users 테이블에 적재하고, 합성 user_id 순서대로 DB id를 돌려준다."""
+    from db.bulk_import import USER_COLUMNS, _user_rows
+    from db.database import get_db_connection
+
+    _copy_rows("users", USER_COLUMNS, "phone", _user_rows(users, None))
+    phones = users["phone"].tolist()
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT phone, id FROM users WHERE phone = ANY(%s)", (phones,))
+            ids = dict(cur.fetchall())
+    finally:
+        conn.close()
+    return np.array([ids[phone] for phone in phones], dtype=np.int64)
+
+
+def _load_sessions_postgres(sessions: pd.DataFrame, participants: pd.DataFrame, user_db_ids: np.ndarray) -> None:
+    """
+    group_session은 (fac_id, program_name, session_date, time_block) 기준 upsert 후 id를 받아
+    group_participant의 session_id / user_id를 DB id로 바꿔 적재한다.
+    """
+    from psycopg2.extras import execute_values
+    from db.database import get_db_connection
+
+    columns = ["fac_id", "fac_name", "program_name", "session_date", "time_block",
+               "max_participants", "current_participants", "status"]
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            returned = execute_values(
+                cur,
+                f"""
+                INSERT INTO group_session ({', '.join(columns)}) VALUES %s
+                ON CONFLICT (fac_id, program_name, session_date, time_block) DO UPDATE SET
+                    max_participants = EXCLUDED.max_participants,
+                    current_participants = EXCLUDED.current_participants,
+                    status = EXCLUDED.status
+                RETURNING id
+                """,
+                sessions[columns].astype(object).values.tolist(),
+                page_size=5000,
+                fetch=True,
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    session_db_ids = np.array([row[0] for row in returned], dtype=np.int64)
+    rows = np.column_stack([
+        session_db_ids[participants["session_id"].to_numpy() - 1],
+        user_db_ids[participants["user_id"].to_numpy() - 1],
+    ]).tolist()
+    _copy_rows("group_participant", ["session_id", "user_id"], "session_id, user_id", rows)
+
+
+def generate(
+    rows: int,
+    users: int,
+    sessions: Optional[int] = None,
+    seed: int = 42,
+    formats=FORMATS,
+    out_dir: Path = SYNTHETIC_DIR,
+    postgres: bool = False,
+    history_db: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """
+    합성 카탈로그(rows행) / 사용자(users명) / 운동 이력 / 그룹 세션(기본 users // 20개)을 생성해 기록.
+    같은 seed면 같은 데이터 (세션 날짜만 실행일 기준).
+    """
+    from recommender.catalog import compact_catalog
+    from recommender.pipeline import catalog_frame
+
+    sessions = users // 20 if sessions is None else sessions
+    rng = np.random.default_rng(seed)
+    today = dt.date.today()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    stats: Dict[str, Any] = {"files": []}
+
+    # 1) 시설-프로그램 카탈로그 (master JSON + 정규화된 카탈로그 Parquet)
+    sampler = SessionSampler(sessions, rows, rng)
+    master = TableWriter(out_dir, "facility_program_master", formats, json_array=True)
+    catalog_rows = facilities = 0
+    for records in iter_facility_records(rows, rng):
+        sampler.observe(records)
+        catalog = catalog_frame(records)
+        if master.json_file:
+            master.write_records(records)
+        master.write_frame(catalog, compact_catalog(catalog))
+        if postgres:
+            from db.bulk_import import import_facility_frames
+
+            import_facility_frames([catalog])
+        catalog_rows += len(catalog)
+        facilities += len(records)
+        print(f"  시설 {facilities}곳 / 카탈로그 {catalog_rows}행 ({time.perf_counter() - start:.1f}s)")
+    stats["files"] += master.close()
+    stats.update(facilities=facilities, catalog_rows=catalog_rows)
+
+    # 2) 사용자 + 운동 이력
+    user_writer = TableWriter(out_dir, "users", formats)
+    history_writer = TableWriter(out_dir, "exercise_history", formats)
+    history_store = None
+    if history_db:
+        from recommender.history_store import ExerciseHistoryStore
+
+        history_store = ExerciseHistoryStore(history_db, import_path=None)
+    user_city = np.empty(users, dtype=np.int16)
+    user_db_ids = np.arange(1, users + 1, dtype=np.int64)
+    history_rows = 0
+    for frame in iter_user_frames(users, rng, _password_hash()):
+        first = int(frame["user_id"].iloc[0]) - 1
+        user_city[first:first + len(frame)] = frame["city"].to_numpy()
+        frame = frame.drop(columns="city")
+        user_writer.write_frame(frame)
+        if postgres:
+            user_db_ids[first:first + len(frame)] = _load_users_postgres(frame)
+
+        history = history_frame(frame, rng, today)
+        if postgres:
+            # 서비스의 이력 키는 DB의 users.id
+            history["user_id"] = user_db_ids[history["user_id"].astype(int).to_numpy() - 1].astype(str)
+        history_writer.write_frame(history)
+        if history_store:
+            history_store.put_many({
+                user_id: {"last_day": int(day), "last_body": body, "exercise_index": int(index)}
+                for user_id, day, body, index in history.itertuples(index=False)
+            })
+        history_rows += len(history)
+        print(f"  사용자 {first + len(frame)}명 / 운동 이력 {history_rows}건 ({time.perf_counter() - start:.1f}s)")
+    stats["files"] += user_writer.close() + history_writer.close()
+    if history_store:
+        history_store.close()
+    stats.update(users=users, history=history_rows)
+
+    # 3) 그룹 세션 + 참여자
+    session_frame, participants = sampler.build(user_city, today)
+    session_writer = TableWriter(out_dir, "group_sessions", formats)
+    participant_writer = TableWriter(out_dir, "group_participants", formats)
+    session_writer.write_frame(session_frame.assign(session_date=session_frame["session_date"].astype(str)), session_frame)
+    participant_writer.write_frame(participants)
+    stats["files"] += session_writer.close() + participant_writer.close()
+    if postgres:
+        _load_sessions_postgres(session_frame, participants, user_db_ids)
+    stats.update(sessions=len(session_frame), participants=len(participants))
+
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 시설 카탈로그 / 사용자 / 운동 이력 / 그룹 세션 생성")
+    parser.add_argument("--sample", action="store_true", help="전국 합성 데이터 대신 기존 10행짜리 샘플 카탈로그만 생성")
+    parser.add_argument("--rows", type=parse_size, default=parse_size("10k"), help="카탈로그 행 수 (10k, 100k, 1M …, 기본 10k)")
+    parser.add_argument("--users", type=parse_size, default=None, help="사용자 수 (기본: --rows와 같음)")
+    parser.add_argument("--sessions", type=parse_size, default=None, help="그룹 세션 수 (기본: 사용자 수 // 20)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--formats", default=",".join(FORMATS), help="json,parquet 중 쉼표로 구분")
+    parser.add_argument("--out-dir", type=Path, default=SYNTHETIC_DIR)
+    parser.add_argument("--postgres", action="store_true", help="DATABASE_URL의 PostgreSQL에도 적재")
+    parser.add_argument("--history-db", type=Path, default=None, help="운동 이력 SQLite 저장소 경로")
+    args = parser.parse_args()
+
+    if args.sample:
+        path = build_fake_master()
+        print(f"✅ 샘플 카탈로그 저장: {path}")
+        return
+
+    formats = {name.strip() for name in args.formats.split(",") if name.strip()}
+    unknown = formats - set(FORMATS)
+    if unknown:
+        parser.error(f"지원하지 않는 형식: {', '.join(sorted(unknown))}")
+
+    stats = generate(
+        rows=args.rows,
+        users=args.rows if args.users is None else args.users,
+        sessions=args.sessions,
+        seed=args.seed,
+        formats=formats,
+        out_dir=args.out_dir,
+        postgres=args.postgres,
+        history_db=args.history_db,
+    )
+    print(
+        f"\n✅ 합성 데이터 생성 완료 ({stats['seconds']:.1f}s, seed {args.seed})\n"
+        f"   시설 {stats['facilities']}곳, 카탈로그 {stats['catalog_rows']}행, 사용자 {stats['users']}명, "
+        f"운동 이력 {stats['history']}건, 그룹 세션 {stats['sessions']}개, 참여 {stats['participants']}건"
+    )
+    for path in stats["files"]:
+        print(f"   {path} ({path.stat().st_size / (1024 * 1024):.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+join_session 동시성 스트레스 테스트
+
+같은 세션에 여러 사용자가 동시에 참여할 때
+- 정원(max_participants)을 넘지 않는지
+- current_participants 와 group_participant 행 수가 일치하는지
+확인한다. DATABASE_URL 이 가리키는 DB에 임시 사용자/세션을 만들고 끝나면 삭제한다.
+
+사용법:
+    python scripts/stress_join_session.py [동시 참여자 수] [정원]
+"""
+import sys
+import time
+import datetime as dt
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from db.database import get_db_connection, init_database
+from service.community_client import join_session
+
+FAC_ID = "STRESS_TEST"
+PROGRAM_NAME = "동시성 테스트"
+
+
+def _create_users(n: int) -> list[int]:
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            user_ids = []
+            for i in range(n):
+                cur.execute(
+                    """
+                    INSERT INTO users (phone, password_hash, name)
+                    VALUES (%s, 'x', %s)
+                    RETURNING id
+                    """,
+                    (f"stress-{i:05d}", f"테스터{i}"),
+                )
+                user_ids.append(cur.fetchone()[0])
+        conn.commit()
+        return user_ids
+    finally:
+        conn.close()
+
+
+def _cleanup() -> None:
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM group_session WHERE fac_id = %s", (FAC_ID,))
+            cur.execute("DELETE FROM users WHERE phone LIKE 'stress-%%'")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run(num_joiners: int = 50, max_participants: int = 4) -> bool:
+    init_database()
+    _cleanup()
+    user_ids = _create_users(num_joiners)
+    session_date = dt.date.today()
+    barrier = threading.Barrier(num_joiners)
+
+    def _join(user_id: int) -> dict:
+        barrier.wait()
+        return join_session(
+            user_id=user_id,
+            fac_id=FAC_ID,
+            program_name=PROGRAM_NAME,
+            session_date=session_date,
+            time_block="오전",
+            fac_name="스트레스 테스트 시설",
+            max_participants=max_participants,
+        )
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=num_joiners) as pool:
+        results = list(pool.map(_join, user_ids))
+    elapsed = time.perf_counter() - start
+
+    joined = sum(1 for r in results if r["status"] == "joined")
+    rejected = sum(1 for r in results if r["status"] == "error")
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT s.current_participants, s.status, COUNT(p.id)
+                FROM group_session s
+                LEFT JOIN group_participant p ON p.session_id = s.id
+                WHERE s.fac_id = %s
+                GROUP BY s.id
+                """,
+                (FAC_ID,),
+            )
+            sessions = cur.fetchall()
+    finally:
+        conn.close()
+
+    print(f"동시 참여 요청: {num_joiners}건, 정원: {max_participants}")
+    print(f"  참여 성공: {joined}, 정원 초과 거절: {rejected}")
+    print(f"  소요 시간: {elapsed:.3f}s ({num_joiners / elapsed:.1f} joins/s)")
+
+    ok = len(sessions) == 1
+    if ok:
+        current, status, participant_rows = sessions[0]
+        print(f"  세션 상태: {status}, current_participants={current}, 참여자 행={participant_rows}")
+        ok = (
+            joined == min(num_joiners, max_participants)
+            and current == joined
+            and participant_rows == joined
+            and (status == "filled") == (joined >= max_participants)
+        )
+    else:
+        print(f"  세션 행 수가 1이 아님: {len(sessions)}")
+
+    # 이미 참여한 사용자가 다시 요청하면 already_joined
+    joined_user = next(uid for uid, r in zip(user_ids, results) if r["status"] == "joined")
+    again = join_session(
+        user_id=joined_user,
+        fac_id=FAC_ID,
+        program_name=PROGRAM_NAME,
+        session_date=session_date,
+        time_block="오전",
+        fac_name="스트레스 테스트 시설",
+        max_participants=max_participants,
+    )
+    ok = ok and again["status"] == "already_joined"
+
+    _cleanup()
+    print("✅ 통과" if ok else "❌ 실패")
+    return ok
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    m = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    sys.exit(0 if run(n, m) else 1)
@@ -3,14 +3,17 @@
 FastAPI 기반 REST API 서버
 Flutter 앱에서 사용할 수 있는 API 엔드포인트 제공
 """
+import os
 import sys
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import date
 from typing import List, Optional
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 # 프로젝트 루트를 path에 추가
@@ -20,15 +23,36 @@ sys.path.insert(0, str(project_root))
 # .env 파일 로드
 load_dotenv(project_root / '.env')
 
-# 데이터베이스 초기화
-from db.database import init_database
-init_database()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    서버 시작/종료 처리.
+
+    스키마 생성은 import 시점이 아니라 여기서 한 번만 수행한다.
+    - 배포 시에는 `python -m db.database`로 마이그레이션을 한 번 실행하고
+      DB_INIT_ON_STARTUP=0 으로 워커의 초기화를 끈다.
+    - 로컬 개발에서는 기본값(1)으로 시작 시 초기화한다. 스키마가 준비된 뒤에 요청을 받도록
+      초기화가 끝날 때까지 기다리며, 실패하면 경고를 남기고 (DB를 쓰지 않는 API를 위해) 계속 시작한다.
+    """
+    if os.getenv("DB_INIT_ON_STARTUP", "1") != "0":
+        # psycopg2 등 DB 의존성도 여기서 지연 import
+        from db.database import init_database
+        # 블로킹 DB 호출은 스레드에서 실행하되 완료(와 실패)를 기다린다
+        if not await asyncio.get_running_loop().run_in_executor(None, init_database):
+            print("⚠️ 데이터베이스 초기화 실패: DB를 사용하는 API는 오류를 반환할 수 있습니다. (python -m db.database로 재시도)")
+    yield
+    # 종료 시 write-behind 버퍼에 남은 운동 이력 저장
+    from recommender.history_store import close_history_store
+    close_history_store()
+
 
 # FastAPI 앱 생성
 app = FastAPI(
     title="시니어 운동 추천 API",
     description="시니어를 위한 운동 추천 및 커뮤니티 서비스 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS 설정 (Flutter 앱에서 접근 가능하도록)
@@ -52,10 +76,16 @@ class LocationRequest(BaseModel):
     lat: float
     lon: float
 
+# open_within_hours 상한: 일주일 (스케줄 비트마스크가 주 단위라 그 이상은 의미 없음)
+MAX_OPEN_WITHIN_HOURS = 24 * 7
+
 class RecommendRequest(BaseModel):
     user_profile: UserProfileRequest
     location: LocationRequest
     top_k: Optional[int] = 5
+    device_id: Optional[str] = None  # 로그인하지 않은 사용자의 운동 이력 키 (없으면 위치 셀 기준)
+    # 지금부터 N시간 안에 운영하는 프로그램만 (0 < N <= 168, 범위를 벗어나면 422)
+    open_within_hours: Optional[float] = Field(None, gt=0, le=MAX_OPEN_WITHIN_HOURS)
 
 class RecommendationResponse(BaseModel):
     fac_id: str
@@ -141,6 +171,23 @@ class ParticipantResponse(BaseModel):
 class SessionParticipantsResponse(BaseModel):
     participants: List[ParticipantResponse]
 
+class OpenSessionResponse(BaseModel):
+    session_id: int
+    fac_id: str
+    fac_name: str
+    program_name: str
+    session_date: str  # YYYY-MM-DD
+    time_block: str
+    current_participants: int
+    max_participants: int
+    lat: float
+    lon: float
+    distance_km: float
+
+class OpenSessionsResponse(BaseModel):
+    sessions: List[OpenSessionResponse]
+    next_cursor: Optional[str] = None  # 다음 페이지 요청 시 cursor로 전달
+
 class GroupExerciseVideosRequest(BaseModel):
     user_profile: Optional[UserProfileRequest] = None
     program_name: Optional[str] = None
@@ -178,6 +225,36 @@ async def health_check():
     """헬스 체크"""
     return {"status": "healthy"}
 
+@app.get("/api/metrics")
+async def metrics():
+    """내부 측정값 (운동 이력 write-behind 버퍼, 날씨 위험 판정 캐시 등)"""
+    from recommender.history_store import history_store_stats
+    from service.weather_client import danger_cache_stats
+    from service.exercise_notification import message_cache_stats
+    return {
+        "history_store": history_store_stats(),
+        "weather_danger_cache": danger_cache_stats(),
+        "notification_message_cache": message_cache_stats(),
+    }
+
+@app.post("/api/catalog/apply-delta")
+async def apply_catalog_delta():
+    """
+    시설 카탈로그 증분 반영
+
+    scripts/build_master.py --incremental 이 만든 delta 파일을 현재 워커의 카탈로그에 반영합니다.
+    (바뀐 시설의 행만 교체하므로 master 전체를 다시 읽지 않음)
+    json/partitioned 백엔드는 요청을 처리한 워커 하나만 갱신되므로, 워커가 여럿이면
+    워커마다 호출하거나 순차 재시작해야 합니다. postgres 백엔드는 한 번 호출로 모든 워커에 반영됩니다.
+    """
+    try:
+        from recommender.catalog import apply_master_delta
+        return await asyncio.get_running_loop().run_in_executor(None, apply_master_delta)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="delta 파일이 없습니다. build_master.py --incremental 을 먼저 실행하세요.")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"카탈로그 반영 중 오류 발생: {str(e)}")
+
 @app.post("/api/recommend", response_model=RecommendResponse)
 async def get_recommendations(request: RecommendRequest):
     """
@@ -187,7 +264,7 @@ async def get_recommendations(request: RecommendRequest):
     운동/시설을 추천합니다.
     """
     try:
-        from recommender.types import UserProfile, Location, WeatherInfo
+        from recommender.types import UserProfile, Location
         from recommender.pipeline import recommend
         from service.weather_client import fetch_weather
         
@@ -213,6 +290,7 @@ async def get_recommendations(request: RecommendRequest):
             user_location=user_location,
             weather_info=weather_info,
             top_k=request.top_k,
+            open_within_hours=request.open_within_hours,
         )
         
         # 응답 변환
@@ -223,7 +301,8 @@ async def get_recommendations(request: RecommendRequest):
         # 날씨가 위험하면 실내 운동 영상 추천
         exercise_videos = None
         from service.weather_client import fetch_kma_ultra_nowcast, evaluate_weather_danger
-        from recommender.exercise_recommender import load_exercises, choose_exercise_for_today
+        from recommender.exercise_recommender import choose_exercise_for_today
+        from recommender.exercise_catalog import get_exercise_catalog
         
         try:
             weather_raw = fetch_kma_ultra_nowcast(user_location["lat"], user_location["lon"])
@@ -238,12 +317,15 @@ async def get_recommendations(request: RecommendRequest):
                 
                 if is_dangerous:
                     # 날씨가 위험하면 실내 운동 영상 추천
-                    exercises = load_exercises()
-                    if exercises:
-                        # 사용자 ID는 임시로 생성 (실제로는 요청에서 받아야 함)
-                        user_id = f"user_{user_location['lat']}_{user_location['lon']}"
+                    catalog = get_exercise_catalog()
+                    if catalog.exercises:
+                        # 익명 사용자 키: 기기 ID 또는 양자화한 위치 셀
+                        from recommender.utils import anonymous_user_key
+                        user_id = anonymous_user_key(
+                            user_location["lat"], user_location["lon"], device_id=request.device_id
+                        )
                         exercise = choose_exercise_for_today(
-                            exercises,
+                            catalog,
                             user_id=user_id,
                             today_date=None,
                         )
@@ -521,6 +603,52 @@ async def join_community_session(request: JoinSessionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"세션 참여 중 오류 발생: {str(e)}")
 
+@app.get("/api/community/sessions", response_model=OpenSessionsResponse)
+async def list_open_community_sessions(
+    lat: float,
+    lon: float,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    radius_km: float = 5.0,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+):
+    """
+    주변 모집 중인 세션 탐색
+    
+    위치 반경 내 시설에서 기간(기본: 오늘부터 7일) 안에 열리는
+    모집 중(open) 세션을 날짜순으로 반환합니다.
+    다음 페이지는 응답의 next_cursor를 cursor로 넘겨 요청합니다.
+    """
+    try:
+        from datetime import timedelta
+        from service.community_client import list_open_sessions
+        
+        start = date.fromisoformat(date_from) if date_from else date.today()
+        end = date.fromisoformat(date_to) if date_to else start + timedelta(days=7)
+        if not 1 <= limit <= 100:
+            raise ValueError("limit은 1~100 사이여야 합니다.")
+        
+        result = list_open_sessions(
+            lat=lat,
+            lon=lon,
+            date_from=start,
+            date_to=end,
+            radius_km=radius_km,
+            limit=limit,
+            cursor=cursor,
+        )
+        
+        return OpenSessionsResponse(
+            sessions=[OpenSessionResponse(**s) for s in result["sessions"]],
+            next_cursor=result["next_cursor"],
+        )
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 요청: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"세션 조회 중 오류 발생: {str(e)}")
+
 @app.get("/api/community/session/{session_id}/participants", response_model=SessionParticipantsResponse)
 async def get_session_participants(session_id: int):
     """세션 참여자 목록 조회"""
@@ -596,7 +724,8 @@ async def get_exercise_notification(request: NotificationRequest):
     - 날씨 조회 → 위험 평가 → 위험하면 운동 영상 추천 → 알림 메시지 생성
     """
     try:
-        from recommender.exercise_recommender import load_exercises, choose_exercise_for_today
+        from recommender.exercise_recommender import choose_exercise_for_today
+        from recommender.exercise_catalog import get_exercise_catalog
         
         # 날씨 조회 및 위험 평가
         try:
@@ -640,8 +769,8 @@ async def get_exercise_notification(request: NotificationRequest):
             )
         
         # 위험하면 운동 영상 추천
-        exercises = load_exercises()
-        if not exercises:
+        catalog = get_exercise_catalog()
+        if not catalog.exercises:
             return NotificationResponse(
                 has_notification=False,
                 message=None,
@@ -650,19 +779,14 @@ async def get_exercise_notification(request: NotificationRequest):
             )
         
         exercise = choose_exercise_for_today(
-            exercises,
+            catalog,
             user_id=request.user_id,
             today_date=None,  # 오늘 날짜 사용
         )
         
         # 알림 메시지 생성
-        url = exercise.get("url", "")
-        name = exercise.get("Name", "운동")
-        message = (
-            f"오늘은 {weather_text}입니다. "
-            f"밖에 나가지 말고 집 안에서 운동하는 것이 좋겠어요. "
-            f"{url} 이 운동({name})을 하는 것을 추천드릴게요."
-        )
+        from service.exercise_notification import compose_notification_message
+        message = compose_notification_message(weather_text, exercise)
         
         # 응답 변환
         exercise_response = ExerciseVideoResponse(
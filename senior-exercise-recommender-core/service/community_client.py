@@ -1,8 +1,62 @@
 # service/community_client.py
 from datetime import date
-from typing import Dict, Any, Optional
-import sqlite3
+from typing import Dict, Any, List, Optional, Tuple
+from psycopg2.extras import RealDictCursor
 from db.database import get_db_connection
+from recommender.utils import bounding_box
+
+
+# 세션 참여를 한 번의 왕복으로 처리하는 SQL
+# 1) group_session upsert: 세션이 없으면 만들고, 있으면 no-op UPDATE로 row lock 획득
+#    → 같은 세션에 동시에 참여하는 요청은 이 지점에서 직렬화된다.
+# 2) 정원 체크 + 참여자 추가 + 인원 증가 + filled 전환을 하나의 CTE로 수행
+#    (락을 잡은 뒤의 새 스냅샷에서 실행되므로 인원 수를 중복으로 읽지 않는다)
+_JOIN_SESSION_SQL = """
+INSERT INTO group_session
+    (fac_id, fac_name, program_name, session_date, time_block,
+     max_participants, current_participants, status)
+VALUES
+    (%(fac_id)s, %(fac_name)s, %(program_name)s, %(session_date)s, %(time_block)s,
+     %(max_participants)s, 0, 'open')
+ON CONFLICT (fac_id, program_name, session_date, time_block)
+DO UPDATE SET max_participants = group_session.max_participants;
+
+WITH session AS (
+    SELECT id, current_participants, max_participants
+    FROM group_session
+    WHERE fac_id = %(fac_id)s AND program_name = %(program_name)s
+      AND session_date = %(session_date)s AND time_block = %(time_block)s
+),
+joined AS (
+    INSERT INTO group_participant (session_id, user_id)
+    SELECT id, %(user_id)s FROM session
+    WHERE current_participants < max_participants
+    ON CONFLICT (session_id, user_id) DO NOTHING
+    RETURNING session_id
+),
+bumped AS (
+    UPDATE group_session g
+    SET current_participants = g.current_participants + 1,
+        status = CASE
+            WHEN g.current_participants + 1 >= g.max_participants THEN 'filled'
+            ELSE g.status
+        END
+    FROM joined
+    WHERE g.id = joined.session_id
+    RETURNING g.current_participants
+)
+SELECT
+    s.id AS session_id,
+    s.max_participants,
+    COALESCE(b.current_participants, s.current_participants) AS current_participants,
+    b.current_participants IS NOT NULL AS joined,
+    EXISTS (
+        SELECT 1 FROM group_participant p
+        WHERE p.session_id = s.id AND p.user_id = %(user_id)s
+    ) AS already_joined
+FROM session s
+LEFT JOIN bumped b ON TRUE;
+"""
 
 
 def join_session(
@@ -17,11 +71,12 @@ def join_session(
     """
     사용자가 그룹 세션에 참여.
     
-    (6-1) group_session 테이블 조회
-    (6-2) 없으면 새 row 생성
-    (6-3) group_participant에 user_id 추가
-    (6-4) group_session.current_participants += 1 업데이트
-    (6-5) current_participants == max_participants 면 status = "filled"
+    (6-1) group_session upsert (없으면 생성) + row lock
+    (6-2) 정원이 남아 있으면 group_participant에 user_id 추가
+    (6-3) group_session.current_participants += 1 업데이트
+    (6-4) current_participants == max_participants 면 status = "filled"
+
+    (6-2)~(6-4)는 SQL 안에서 한 번에 처리하므로 동시에 참여해도 정원을 넘지 않는다.
     
     Returns:
         {
@@ -34,101 +89,54 @@ def join_session(
     """
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        
-        # (6-1) 같은 세션 찾기
-        cursor.execute(
-            """
-            SELECT id, current_participants, max_participants, status
-            FROM group_session
-            WHERE fac_id = ? AND program_name = ? AND session_date = ? AND time_block = ?
-            """,
-            (fac_id, program_name, str(session_date), time_block),
-        )
-        session_row = cursor.fetchone()
-        
-        session_id: Optional[int] = None
-        current_participants: int = 0
-        session_status: str = "open"
-        
-        if session_row is None:
-            # (6-2) 새 세션 생성
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
             cursor.execute(
-                """
-                INSERT INTO group_session 
-                (fac_id, fac_name, program_name, session_date, time_block, max_participants, current_participants, status)
-                VALUES (?, ?, ?, ?, ?, ?, 0, 'open')
-                """,
-                (fac_id, fac_name, program_name, str(session_date), time_block, max_participants),
-            )
-            session_id = cursor.lastrowid
-            current_participants = 0
-        else:
-            session_id = session_row["id"]
-            current_participants = session_row["current_participants"]
-            session_status = session_row["status"]
-            
-            # 이미 가득 찬 경우
-            if session_status == "filled":
-                return {
-                    "status": "error",
-                    "message": "이 세션은 이미 정원이 찼습니다.",
-                    "current_participants": current_participants,
-                    "max_participants": session_row["max_participants"],
-                    "session_filled": True,
-                }
-            
-            # 이미 참여 중인 경우
-            cursor.execute(
-                "SELECT id FROM group_participant WHERE session_id = ? AND user_id = ?",
-                (session_id, user_id),
+                _JOIN_SESSION_SQL,
+                {
+                    "user_id": user_id,
+                    "fac_id": fac_id,
+                    "fac_name": fac_name,
+                    "program_name": program_name,
+                    "session_date": session_date,
+                    "time_block": time_block,
+                    "max_participants": max_participants,
+                },
             )
-            if cursor.fetchone() is not None:
-                return {
-                    "status": "already_joined",
-                    "message": "이미 이 세션에 참여 중입니다.",
-                    "current_participants": current_participants,
-                    "max_participants": session_row["max_participants"],
-                    "session_filled": current_participants >= session_row["max_participants"],
-                }
-        
-        # (6-3) group_participant에 추가
-        try:
-            cursor.execute(
-                "INSERT INTO group_participant (session_id, user_id) VALUES (?, ?)",
-                (session_id, user_id),
-            )
-        except sqlite3.IntegrityError:
-            # 이미 참여 중이면 위에서 체크했지만, 동시성 이슈 대비
-            conn.rollback()
+            row = cursor.fetchone()
+        conn.commit()
+
+        current_participants = row["current_participants"]
+        session_max = row["max_participants"]
+        session_filled = current_participants >= session_max
+
+        if row["joined"]:
             return {
-                "status": "error",
-                "message": "이미 참여 중인 세션입니다.",
+                "status": "joined",
+                "current_participants": current_participants,
+                "max_participants": session_max,
+                "session_filled": session_filled,
+                "session_id": row["session_id"],
             }
-        
-        # (6-4) current_participants 증가
-        current_participants += 1
-        cursor.execute(
-            "UPDATE group_session SET current_participants = ? WHERE id = ?",
-            (current_participants, session_id),
-        )
-        
-        # (6-5) 가득 찬지 확인
-        session_filled = current_participants >= max_participants
-        if session_filled:
-            cursor.execute(
-                "UPDATE group_session SET status = 'filled' WHERE id = ?",
-                (session_id,),
-            )
-        
-        conn.commit()
-        
+
+        # 이미 참여 중인 경우
+        if row["already_joined"]:
+            return {
+                "status": "already_joined",
+                "message": "이미 이 세션에 참여 중입니다.",
+                "current_participants": current_participants,
+                "max_participants": session_max,
+                "session_filled": session_filled,
+                "session_id": row["session_id"],
+            }
+
+        # 이미 가득 찬 경우
         return {
-            "status": "joined",
+            "status": "error",
+            "message": "이 세션은 이미 정원이 찼습니다.",
             "current_participants": current_participants,
-            "max_participants": max_participants,
-            "session_filled": session_filled,
-            "session_id": session_id,
+            "max_participants": session_max,
+            "session_filled": True,
+            "session_id": row["session_id"],
         }
         
     except Exception as e:
@@ -144,19 +152,130 @@ def get_session_participants(session_id: int) -> list[Dict[str, Any]]:
     """
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT u.id, u.nickname
-            FROM group_participant gp
-            JOIN user u ON gp.user_id = u.id
-            WHERE gp.session_id = ?
-            ORDER BY gp.joined_at
-            """,
-            (session_id,),
-        )
-        rows = cursor.fetchall()
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(
+                """
+                SELECT u.id, u.name AS nickname
+                FROM group_participant gp
+                JOIN users u ON gp.user_id = u.id
+                WHERE gp.session_id = %s
+                ORDER BY gp.joined_at
+                """,
+                (session_id,),
+            )
+            rows = cursor.fetchall()
         return [{"id": row["id"], "nickname": row["nickname"]} for row in rows]
     finally:
         conn.close()
 
+
+# 반경 내 모집 중인 세션 조회
+# - facilities(latitude, longitude) 인덱스로 bounding box 안의 시설만 조회
+# - group_session은 status = 'open' 부분 인덱스를 (session_date, id) 순으로 읽고
+#   키셋 커서 이후부터 LIMIT 개만 가져오므로 페이지가 깊어져도 전체를 스캔하지 않는다.
+_OPEN_SESSIONS_SQL = """
+SELECT
+    s.id AS session_id, s.fac_id, s.fac_name, s.program_name,
+    s.session_date, s.time_block,
+    s.current_participants, s.max_participants,
+    f.latitude AS lat, f.longitude AS lon, d.distance_km
+FROM group_session s
+JOIN facilities f ON f.fac_id = s.fac_id
+CROSS JOIN LATERAL (
+    SELECT 6371.0 * 2 * ASIN(SQRT(
+        POWER(SIN(RADIANS(f.latitude - %(lat)s) / 2), 2)
+        + COS(RADIANS(%(lat)s)) * COS(RADIANS(f.latitude))
+        * POWER(SIN(RADIANS(f.longitude - %(lon)s) / 2), 2)
+    )) AS distance_km
+) d
+WHERE s.status = 'open'
+  AND s.session_date BETWEEN %(date_from)s AND %(date_to)s
+  AND (s.session_date, s.id) > (%(after_date)s, %(after_id)s)
+  AND f.latitude BETWEEN %(min_lat)s AND %(max_lat)s
+  AND f.longitude BETWEEN %(min_lon)s AND %(max_lon)s
+  AND d.distance_km <= %(radius_km)s
+ORDER BY s.session_date, s.id
+LIMIT %(limit)s
+"""
+
+
+def encode_session_cursor(session_date: date, session_id: int) -> str:
+    """페이지네이션 커서 생성 ("YYYY-MM-DD:id")"""
+    return f"{session_date.isoformat()}:{session_id}"
+
+
+def decode_session_cursor(cursor: str) -> Tuple[date, int]:
+    """페이지네이션 커서 해석. 형식이 잘못되면 ValueError."""
+    date_str, _, id_str = cursor.partition(":")
+    return date.fromisoformat(date_str), int(id_str)
+
+
+def list_open_sessions(
+    lat: float,
+    lon: float,
+    date_from: date,
+    date_to: date,
+    radius_km: float = 5.0,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    위치 주변에서 기간 내 모집 중인 그룹 세션 목록 조회.
+
+    Args:
+        lat, lon: 사용자 위치
+        date_from, date_to: 세션 날짜 범위 (포함)
+        radius_km: 검색 반경
+        limit: 페이지 크기
+        cursor: 이전 페이지의 next_cursor (없으면 첫 페이지)
+
+    Returns:
+        {
+            "sessions": [...],  # 날짜, id 순
+            "next_cursor": str | None
+        }
+    """
+    if cursor:
+        after_date, after_id = decode_session_cursor(cursor)
+    else:
+        after_date, after_id = date.min, 0
+
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                _OPEN_SESSIONS_SQL,
+                {
+                    "lat": lat,
+                    "lon": lon,
+                    "date_from": date_from,
+                    "date_to": date_to,
+                    "after_date": after_date,
+                    "after_id": after_id,
+                    "min_lat": min_lat,
+                    "max_lat": max_lat,
+                    "min_lon": min_lon,
+                    "max_lon": max_lon,
+                    "radius_km": radius_km,
+                    "limit": limit,
+                },
+            )
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    sessions: List[Dict[str, Any]] = []
+    for row in rows:
+        session = dict(row)
+        session["session_date"] = session["session_date"].isoformat()
+        session["distance_km"] = round(float(session["distance_km"]), 3)
+        sessions.append(session)
+
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = encode_session_cursor(last["session_date"], last["session_id"])
+
+    return {"sessions": sessions, "next_cursor": next_cursor}
@@ -5,6 +5,8 @@
 import sys
 import datetime as dt
 from pathlib import Path
+from functools import lru_cache
+from typing import Dict
 
 # 직접 실행 시 프로젝트 루트를 경로에 추가 (import 전에 실행)
 _is_main = __name__ == "__main__"
@@ -15,29 +17,66 @@ if _is_main:
 
 # import 처리 (직접 실행 시와 모듈로 import 시 모두 지원)
 try:
-    from .weather_client import fetch_kma_ultra_nowcast, evaluate_weather_danger
-    from ..recommender.exercise_recommender import load_exercises, choose_exercise_for_today
+    from .weather_client import fetch_kma_ultra_nowcast, evaluate_weather_danger, cache_stats, DANGER_CACHE_SIZE
+    from ..recommender.exercise_recommender import choose_exercise_for_today
+    from ..recommender.exercise_catalog import get_exercise_catalog
 except ImportError:
     # 직접 실행 시 상대 import가 실패하면 절대 import 사용
-    from service.weather_client import fetch_kma_ultra_nowcast, evaluate_weather_danger
-    from recommender.exercise_recommender import load_exercises, choose_exercise_for_today
+    from service.weather_client import fetch_kma_ultra_nowcast, evaluate_weather_danger, cache_stats, DANGER_CACHE_SIZE
+    from recommender.exercise_recommender import choose_exercise_for_today
+    from recommender.exercise_catalog import get_exercise_catalog
+
+
+# 직접 실행 시 사용하는 기본 위치 (서울시청)
+DEFAULT_LAT, DEFAULT_LON = 37.5665, 126.9780
+
+
+@lru_cache(maxsize=DANGER_CACHE_SIZE)
+def _message_prefix(weather_text: str) -> str:
+    """위험 날씨 상태별 알림 앞부분 (위험 문구 종류만큼만 생성)"""
+    # weather_text 예: "비나 눈이 오는 / 강한 바람이 부는 날씨"
+    return (
+        f"오늘은 {weather_text}입니다. "
+        f"밖에 나가지 말고 집 안에서 운동하는 것이 좋겠어요. "
+    )
+
+
+def compose_notification_message(weather_text: str, exercise: Dict) -> str:
+    """위험 날씨 문구 + 추천 운동으로 알림 문장 생성"""
+    url = exercise.get("url", "")
+    name = exercise.get("Name", "운동")
+    return f"{_message_prefix(weather_text)}{url} 이 운동({name})을 하는 것을 추천드릴게요."
+
+
+def message_cache_stats() -> Dict:
+    """알림 앞부분 캐시 측정값"""
+    return cache_stats(_message_prefix)
 
 
 def build_notification_message(
-    user_id: str = "default_user",
+    user_id: str,
+    lat: float,
+    lon: float,
     today_date: dt.date | None = None,
+    has_chronic_disease: bool = False,
+    air_quality_risky: bool = False,
 ) -> str | None:
     """
-    1) 오늘 초단기실황 조회
+    한 사용자의 알림 문장 생성 (여러 사용자를 한 번에 처리할 때는 service.notification_batch 사용)
+
+    1) 사용자 위치의 초단기실황 조회
     2) 위험한 날씨이면 운동 영상 추천 + 알림 문장 생성
     3) 위험하지 않으면 None 반환 (또는 다른 문장으로 바꿔도 됨)
     """
-    # 1) 날씨 조회 (서울 기본값, 실제로는 위치 정보 필요)
-    lat, lon = 37.5665, 126.9780  # 서울 기본값
+    # 1) 날씨 조회
     weather = fetch_kma_ultra_nowcast(lat, lon)
     if not weather:
         return None
-    is_dangerous, weather_text = evaluate_weather_danger(weather)
+    is_dangerous, weather_text = evaluate_weather_danger(
+        weather,
+        has_chronic_disease=has_chronic_disease,
+        air_quality_risky=air_quality_risky,
+    )
 
     if not is_dangerous:
         # 위험하지 않은 날이면 알림 안 보내거나, 다른 문구를 써도 됨.
@@ -45,25 +84,16 @@ def build_notification_message(
         return None
 
     # 2) 운동 영상 추천
-    exercises = load_exercises()
-    if not exercises:
+    catalog = get_exercise_catalog()
+    if not catalog.exercises:
         return None
 
     exercise = choose_exercise_for_today(
-        exercises, user_id=user_id, today_date=today_date
+        catalog, user_id=user_id, today_date=today_date
     )
-    url = exercise.get("url")
-    name = exercise.get("Name", "운동")
 
     # 3) 알림 문장 생성
-    # weather_text 예: "비나 눈이 오는 / 강한 바람이 부는 날씨"
-    message = (
-        f"오늘은 {weather_text}입니다. "
-        f"밖에 나가지 말고 집 안에서 운동하는 것이 좋겠어요. "
-        f"{url} 이 운동({name})을 하는 것을 추천드릴게요."
-    )
-
-    return message
+    return compose_notification_message(weather_text, exercise)
 
 
 # ==========================
@@ -96,7 +126,8 @@ if __name__ == "__main__":
     try:
         # 날씨 정보 조회 및 출력
         from service.weather_client import fetch_kma_ultra_nowcast
-        lat, lon = 37.5665, 126.9780  # 서울 기본값
+        lat = float(os.getenv("NOTIFICATION_LAT", DEFAULT_LAT))
+        lon = float(os.getenv("NOTIFICATION_LON", DEFAULT_LON))
         weather = fetch_kma_ultra_nowcast(lat, lon)
         if not weather:
             print("날씨 정보 조회 실패")
@@ -140,7 +171,7 @@ if __name__ == "__main__":
             print(f"  강수량: {rn1} mm")
         print("-" * 50)
         
-        msg = build_notification_message(user_id=user_id, today_date=test_date)
+        msg = build_notification_message(user_id=user_id, lat=lat, lon=lon, today_date=test_date)
         if msg:
             print(msg)
         else:
@@ -3,9 +3,17 @@
 함께하는 운동을 위한 그룹 운동 영상 추천 클라이언트
 커뮤니티 운동이 성사되었을 때 함께 할 수 있는 운동 영상을 추천합니다.
 """
-from typing import List, Dict, Any, Optional
+import re
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Optional, Set, Tuple
 from recommender.types import UserProfile
-from recommender.exercise_recommender import load_exercises  # 재사용
+from recommender.exercise_catalog import ExerciseCatalog, get_exercise_catalog  # 개인 운동 추천과 공유
+# 기존 import 경로 호환 (recommender.utils로 이동)
+from recommender.utils import extract_youtube_video_id, get_youtube_embed_url  # noqa: F401
 
 
 def filter_group_exercises(videos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -15,6 +23,107 @@ def filter_group_exercises(videos: List[Dict[str, Any]]) -> List[Dict[str, Any]]
     return [v for v in videos if v.get("혼자여부", "y").lower() == "n"]
 
 
+# 프로그램 이름 ↔ 영상 이름 매칭 키워드 (부분 문자열로 포함되면 토큰으로 취급)
+MATCH_KEYWORDS = ("줄", "협응", "스카프", "저글링", "함께", "동호회", "그룹")
+
+# 목표와 체력항목 매핑
+GOAL_TO_FITNESS = {
+    "flexibility": "유연성",
+    "strength": "근력/근지구력",
+    "blood_pressure": "심폐지구력",
+    "social": "협응력",
+}
+
+NAME_MATCH_SCORE = 1.0
+GOAL_MATCH_SCORE = 1.5
+
+_TOKEN_PATTERN = re.compile(r"[0-9a-z가-힣]+")
+
+
+def tokenize(text: str) -> Set[str]:
+    """
+    이름을 매칭용 토큰으로 분리.
+    - 한글/영문/숫자 단어 (소문자)
+    - MATCH_KEYWORDS 중 부분 문자열로 포함된 키워드 ("줄넘기" → "줄")
+    """
+    text = (text or "").lower()
+    tokens = set(_TOKEN_PATTERN.findall(text))
+    tokens.update(k for k in MATCH_KEYWORDS if k in text)
+    return tokens
+
+
+@dataclass(frozen=True)
+class GroupVideoIndex:
+    """그룹 운동 영상의 토큰 단위 역색인 (영상 이름 토큰 / 체력항목 → 영상 위치)"""
+    videos: Tuple[Dict[str, Any], ...]
+    name_postings: Mapping[str, Tuple[int, ...]]
+    fitness_postings: Mapping[str, Tuple[int, ...]]
+
+    @classmethod
+    def build(cls, videos: Tuple[Dict[str, Any], ...]) -> "GroupVideoIndex":
+        name_postings: Dict[str, List[int]] = {}
+        fitness_postings: Dict[str, List[int]] = {}
+        for idx, video in enumerate(videos):
+            for token in tokenize(video.get("Name", "")):
+                name_postings.setdefault(token, []).append(idx)
+            fitness = video.get("체력항목", "")
+            if fitness:
+                fitness_postings.setdefault(fitness, []).append(idx)
+        return cls(
+            videos=videos,
+            name_postings=MappingProxyType({k: tuple(v) for k, v in name_postings.items()}),
+            fitness_postings=MappingProxyType({k: tuple(v) for k, v in fitness_postings.items()}),
+        )
+
+
+@lru_cache(maxsize=1)
+def _index_for(catalog: ExerciseCatalog) -> GroupVideoIndex:
+    return GroupVideoIndex.build(catalog.group_exercises)
+
+
+def get_group_video_index() -> GroupVideoIndex:
+    """공용 운동 카탈로그의 그룹 운동 영상 역색인 (카탈로그당 한 번 생성)"""
+    return _index_for(get_exercise_catalog())
+
+
+def rank_group_videos(
+    index: GroupVideoIndex,
+    program_name: Optional[str],
+    goals: List[str],
+    max_results: int,
+) -> List[Dict[str, Any]]:
+    """
+    프로그램 이름 토큰 / 목표에 해당하는 posting에 포함된 영상만 점수를 매기고
+    heap으로 상위 max_results개를 고른다. 점수가 같으면 카탈로그 순서 유지.
+    점수를 받은 영상이 모자라면 나머지는 카탈로그 순서대로 채운다.
+    """
+    if max_results <= 0:
+        return []
+
+    scores: Dict[int, float] = defaultdict(float)
+    if program_name:
+        for token in tokenize(program_name):
+            for idx in index.name_postings.get(token, ()):
+                scores[idx] += NAME_MATCH_SCORE
+    for goal in goals:
+        fitness = GOAL_TO_FITNESS.get(goal)
+        for idx in index.fitness_postings.get(fitness, ()):
+            scores[idx] += GOAL_MATCH_SCORE
+
+    top = heapq.nsmallest(max_results, scores.items(), key=lambda item: (-item[1], item[0]))
+    ranked = [idx for idx, _ in top]
+
+    if len(ranked) < max_results:
+        picked = set(ranked)
+        for idx in range(len(index.videos)):
+            if len(ranked) >= max_results:
+                break
+            if idx not in picked:
+                ranked.append(idx)
+
+    return [index.videos[idx] for idx in ranked]
+
+
 def recommend_group_exercise_videos(
     user_profile: Optional[UserProfile] = None,
     program_name: Optional[str] = None,
@@ -24,72 +133,20 @@ def recommend_group_exercise_videos(
     함께 운동이 성사되었을 때 추천할 운동 영상 리스트를 반환.
     
     Args:
-        user_profile: 사용자 프로필 (선택사항, 추후 필터링에 활용)
-        program_name: 추천된 프로그램 이름 (선택사항, 매칭에 활용)
+        user_profile: 사용자 프로필 (선택사항, 목표 ↔ 체력항목 매칭에 활용)
+        program_name: 추천된 프로그램 이름 (선택사항, 영상 이름 매칭에 활용)
         max_results: 최대 추천 개수
     
     Returns:
         함께 할 수 있는 운동 영상 리스트
+        (매칭되는 영상이 없으면 그룹 운동 영상을 카탈로그 순서대로 반환)
     """
-    # exercise_recommender의 load_exercises 함수 재사용
-    all_videos = load_exercises()
-    if not all_videos:
-        return []
-    
-    # 혼자서 하는 운동이 아닌 것만 필터링
-    group_videos = filter_group_exercises(all_videos)
-    
-    if not group_videos:
+    index = get_group_video_index()
+    if not index.videos:
         return []
-    
-    # 사용자 프로필이나 프로그램 이름과 매칭되는 영상 우선 추천
-    scored_videos = []
-    
-    for video in group_videos:
-        score = 0.0
-        
-        # 프로그램 이름과 유사한 영상 이름 매칭 (간단한 키워드 매칭)
-        if program_name:
-            video_name = video.get("Name", "").lower()
-            program_lower = program_name.lower()
-            
-            # 공통 키워드 체크
-            common_keywords = ["줄", "협응", "스카프", "저글링", "함께", "동호회", "그룹"]
-            for keyword in common_keywords:
-                if keyword in video_name or keyword in program_lower:
-                    score += 1.0
-        
-        # 사용자 목표와 체력항목 매칭
-        if user_profile:
-            goals = user_profile.get("goals", [])
-            체력항목 = video.get("체력항목", "")
-            
-            # 목표와 체력항목 매핑
-            goal_to_체력 = {
-                "flexibility": "유연성",
-                "strength": "근력/근지구력",
-                "blood_pressure": "심폐지구력",
-                "social": "협응력",
-            }
-            
-            for goal in goals:
-                if goal_to_체력.get(goal) == 체력항목:
-                    score += 1.5
-        
-        scored_videos.append((score, video))
-    
-    # 점수 순으로 정렬 (점수가 높은 것 우선)
-    scored_videos.sort(key=lambda x: x[0], reverse=True)
-    
-    # 상위 N개 반환
-    recommended = [video for _, video in scored_videos[:max_results]]
-    
-    # 점수가 모두 0이거나 적은 경우, 랜덤하게 선택하기보다는 전체 반환 (최대 max_results)
-    if not recommended or all(score == 0.0 for score, _ in scored_videos[:max_results]):
-        # 점수 기반 추천이 안되면 전체 그룹 운동 중에서 반환
-        return group_videos[:max_results]
-    
-    return recommended
+
+    goals = user_profile.get("goals", []) if user_profile else []
+    return rank_group_videos(index, program_name, goals, max_results)
 
 
 def format_video_info(video: Dict[str, Any]) -> str:
@@ -111,39 +168,3 @@ def format_video_info(video: Dict[str, Any]) -> str:
     
     info_str = " | ".join(info_parts) if info_parts else ""
     return info_str
-
-
-def extract_youtube_video_id(url: str) -> Optional[str]:
-    """
-    YouTube URL에서 비디오 ID를 추출.
-    https://www.youtube.com/watch?v=VIDEO_ID 형태 또는
-    https://youtu.be/VIDEO_ID 형태를 지원.
-    """
-    if not url:
-        return None
-    
-    # 오타 수정 (hhttps -> https)
-    url = url.replace("hhttps://", "https://")
-    
-    # youtu.be 형식
-    if "youtu.be/" in url:
-        video_id = url.split("youtu.be/")[1].split("&")[0].split("?")[0]
-        return video_id
-    
-    # youtube.com/watch?v= 형식
-    if "youtube.com/watch" in url and "v=" in url:
-        video_id = url.split("v=")[1].split("&")[0].split("#")[0]
-        return video_id
-    
-    return None
-
-
-def get_youtube_embed_url(url: str) -> Optional[str]:
-    """
-    YouTube URL을 embed URL로 변환.
-    """
-    video_id = extract_youtube_video_id(url)
-    if video_id:
-        return f"https://www.youtube.com/embed/{video_id}"
-    return None
-
@@ -0,0 +1,242 @@
+# service/notification_batch.py
+"""
+격자 단위 일괄 운동 알림 생성
+
+전체 사용자를 기상청 격자(nx, ny) 순으로 정렬해 읽으면서 격자별로 묶어
+- 격자마다 초단기실황 / 대기질은 한 번만 조회
+- 위험 평가는 (격자, 기저질환 여부, 대기질 위험 여부) 조합마다 한 번만 수행
+- 위험한 격자의 사용자만 오늘의 운동을 키 조회 (일일 배정 배치가 미리 채워 둔 이력)
+하고, 격자 단위 작업을 워커 풀에서 돌려 사용자별 알림을 스트림으로 내보낸다.
+DB 커서 → 격자 묶음 → 워커 풀까지 모두 스트리밍이라 메모리는 처리 중인 격자 몇 개 분량이다.
+
+사용법:
+    python -m service.notification_batch [--date YYYY-MM-DD] [--workers 16] [--output notifications.jsonl]
+"""
+import json
+import time
+import argparse
+import datetime as dt
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from recommender.exercise_catalog import ExerciseCatalog, get_exercise_catalog
+from recommender.exercise_recommender import assign_exercises_for_day, todays_exercise
+from recommender.history_store import get_history_store
+from service.exercise_notification import compose_notification_message
+from service.weather_client import (
+    evaluate_weather_danger,
+    fetch_air_quality,
+    fetch_kma_ultra_nowcast_grid,
+    kma_grid_sql,
+    lat_lon_to_grid,
+)
+
+# /api/recommend와 같은 미세먼지 위험 기준 (PM10 > 80)
+AIR_QUALITY_PM10_THRESHOLD = 80.0
+
+Grid = Tuple[int, int]
+
+
+def fetch_notification_targets(fetch_size: int = 10000) -> Iterator[Dict[str, Any]]:
+    """
+    위치 정보가 있는 사용자를 기상청 격자(nx, ny) 순으로 서버 측 커서로 나눠 읽는다.
+    격자는 DB에서 lat_lon_to_grid와 같은 공식으로 계산한다 (group_by_grid가 스트리밍으로 묶을 수 있도록).
+    건강 상태가 하나라도 있으면 기저질환 보유로 본다 (/api/recommend와 동일).
+    """
+    from db.database import get_db_connection
+
+    nx, ny = kma_grid_sql("latitude", "longitude")
+    conn = get_db_connection()
+    try:
+        with conn.cursor(name="notification_targets") as cur:
+            cur.itersize = fetch_size
+            cur.execute(
+                f"""
+                SELECT id, latitude, longitude,
+                       COALESCE(cardinality(health_conditions), 0) > 0 AS has_chronic_disease,
+                       {nx} AS nx, {ny} AS ny
+                FROM users
+                WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+                ORDER BY nx, ny
+                """
+            )
+            for user_id, lat, lon, has_chronic_disease, grid_nx, grid_ny in cur:
+                yield {
+                    "user_id": str(user_id),
+                    "lat": float(lat),
+                    "lon": float(lon),
+                    "has_chronic_disease": bool(has_chronic_disease),
+                    "grid": (grid_nx, grid_ny),
+                }
+    finally:
+        conn.close()
+
+
+def _grid_of(target: Dict[str, Any]) -> Grid:
+    grid = target.get("grid")
+    return tuple(grid) if grid is not None else lat_lon_to_grid(target["lat"], target["lon"])
+
+
+def group_by_grid(targets: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Grid, List[Dict[str, Any]]]]:
+    """
+    격자 순으로 정렬된 사용자 스트림을 기상청 격자(nx, ny)별 묶음으로 (한 번에 격자 하나만 메모리에).
+    정렬되지 않은 입력도 결과는 같지만 같은 격자가 여러 묶음으로 나뉘어 날씨를 여러 번 조회한다.
+    """
+    for cell, cell_targets in groupby(targets, key=_grid_of):
+        yield cell, list(cell_targets)
+
+
+def _empty_result(target: Dict[str, Any], weather_text: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "user_id": target["user_id"],
+        "has_notification": False,
+        "message": None,
+        "exercise": None,
+        "weather_text": weather_text,
+    }
+
+
+def build_cell_notifications(
+    cell: Grid,
+    targets: List[Dict[str, Any]],
+    catalog: ExerciseCatalog,
+    today: dt.date,
+    store=None,
+) -> List[Dict[str, Any]]:
+    """한 격자에 속한 사용자들의 알림 생성 (날씨·대기질 조회는 격자당 1회)"""
+    weather = fetch_kma_ultra_nowcast_grid(*cell)
+    if not weather:
+        return [_empty_result(t) for t in targets]
+
+    # 격자 안의 위치 차이는 5km 이내이므로 첫 사용자 좌표로 대기질 조회
+    air_quality = fetch_air_quality(targets[0]["lat"], targets[0]["lon"])
+    air_quality_risky = bool(air_quality) and air_quality.get("pm10", 0.0) > AIR_QUALITY_PM10_THRESHOLD
+
+    verdicts = {
+        has_chronic_disease: evaluate_weather_danger(
+            weather,
+            has_chronic_disease=has_chronic_disease,
+            air_quality_risky=air_quality_risky,
+        )
+        for has_chronic_disease in {t["has_chronic_disease"] for t in targets}
+    }
+
+    dangerous_ids = [t["user_id"] for t in targets if verdicts[t["has_chronic_disease"]][0]]
+    exercises: Dict[str, Dict] = {}
+    if dangerous_ids and catalog.exercises:
+        if store is None:
+            store = get_history_store()
+        history = store.get_many(dangerous_ids)
+        missing = [
+            user_id for user_id in dangerous_ids
+            if todays_exercise(catalog, history.get(user_id), today) is None
+        ]
+        if missing:
+            # 일일 배정 이후 가입한 사용자 등은 여기서 한꺼번에 배정
+            assign_exercises_for_day(catalog, missing, today, store)
+            history.update(store.get_many(missing))
+        for user_id in dangerous_ids:
+            exercise = todays_exercise(catalog, history.get(user_id), today)
+            if exercise:
+                exercises[user_id] = exercise
+
+    results = []
+    for target in targets:
+        is_dangerous, weather_text = verdicts[target["has_chronic_disease"]]
+        exercise = exercises.get(target["user_id"])
+        if not is_dangerous or exercise is None:
+            results.append(_empty_result(target, weather_text))
+            continue
+        results.append({
+            "user_id": target["user_id"],
+            "has_notification": True,
+            "message": compose_notification_message(weather_text, exercise),
+            "exercise": exercise,
+            "weather_text": weather_text,
+        })
+    return results
+
+
+def iter_notifications(
+    targets: Iterable[Dict[str, Any]],
+    today: Optional[dt.date] = None,
+    workers: int = 16,
+    store=None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    사용자별 알림을 격자 처리가 끝나는 순서대로 내보낸다.
+    날씨 API 호출이 대부분이라 스레드 풀을 사용하고,
+    처리 중인 격자는 워커 수의 2배까지만 두어 입력 스트림을 앞질러 읽지 않는다.
+    """
+    today = today or dt.date.today()
+    catalog = get_exercise_catalog()
+    if store is None:
+        store = get_history_store()
+    max_pending = max(1, workers) * 2
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for cell, cell_targets in group_by_grid(targets):
+            pending.add(executor.submit(build_cell_notifications, cell, cell_targets, catalog, today, store))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def run_notification_batch(
+    targets: Iterable[Dict[str, Any]],
+    today: Optional[dt.date] = None,
+    workers: int = 16,
+    output: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """
+    일괄 알림 생성 후 처리량 통계 반환.
+    output을 지정하면 알림 대상 사용자의 결과를 JSON Lines로 기록한다.
+    """
+    stats = {"users": 0, "notified": 0, "seconds": 0.0}
+    start = time.perf_counter()
+    out = output.open("w", encoding="utf-8") if output else None
+    try:
+        for result in iter_notifications(targets, today=today, workers=workers):
+            stats["users"] += 1
+            if result["has_notification"]:
+                stats["notified"] += 1
+                if out:
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            if stats["users"] % 10000 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"  {stats['users']}명 처리 - {stats['users'] / elapsed:.0f} users/s")
+    finally:
+        if out:
+            out.close()
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["users_per_sec"] = stats["users"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="격자 단위 일괄 운동 알림 생성")
+    parser.add_argument("--date", type=dt.date.fromisoformat, default=None, help="기준 날짜 (기본: 오늘)")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--output", type=Path, default=None, help="알림 결과 JSON Lines 파일")
+    args = parser.parse_args(argv)
+
+    stats = run_notification_batch(
+        fetch_notification_targets(), today=args.date, workers=args.workers, output=args.output
+    )
+    print(
+        f"✅ 알림 생성 완료: 사용자 {stats['users']}명 중 {stats['notified']}명 알림 "
+        f"({stats['seconds']:.1f}s, {stats['users_per_sec']:.0f} users/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
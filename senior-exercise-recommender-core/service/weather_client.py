@@ -4,7 +4,10 @@
 기상청 API를 사용하여 WeatherInfo 타입에 맞는 날씨 정보를 반환
 """
 import os
+import threading
 import datetime as dt
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, Any, Tuple, Optional
 from pathlib import Path
 import requests
@@ -23,41 +26,53 @@ OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
 VILAGE_BASE_HOURS: list[int] = [2, 5, 8, 11, 14, 17, 20, 23]
 
 
-def lat_lon_to_grid(lat: float, lon: float) -> Tuple[int, int]:
-    """
-    위도/경도를 기상청 격자 좌표(nx, ny)로 변환
-    
-    기상청 격자 좌표 변환 공식 사용
-    """
+# 기상청 격자 좌표 변환 (Lambert 정각원추도법) 상수
+KMA_GRID_XO = 43  # 기준점 X좌표(GRID)
+KMA_GRID_YO = 136  # 기준점 Y좌표(GRID)
+
+
+@lru_cache(maxsize=1)
+def _kma_grid_projection() -> Tuple[float, float, float, float]:
+    """격자 변환 공식의 위치와 무관한 값 (re * sf, sn, ro, 기준 경도 라디안)"""
     RE = 6371.00877  # 지구 반경(km)
     GRID = 5.0  # 격자 간격(km)
     SLAT1 = 30.0  # 투영 위도1(degree)
     SLAT2 = 60.0  # 투영 위도2(degree)
     OLON = 126.0  # 기준점 경도(degree)
     OLAT = 38.0  # 기준점 위도(degree)
-    XO = 43  # 기준점 X좌표(GRID)
-    YO = 136  # 기준점 Y좌표(GRID)
-    
+
     import math
-    
+
     DEGRAD = math.pi / 180.0
-    RADDEG = 180.0 / math.pi
-    
+
     re = RE / GRID
     slat1 = SLAT1 * DEGRAD
     slat2 = SLAT2 * DEGRAD
     olon = OLON * DEGRAD
     olat = OLAT * DEGRAD
-    
+
     sn = math.tan(math.pi * 0.25 + slat2 * 0.5) / math.tan(math.pi * 0.25 + slat1 * 0.5)
     sn = math.log(math.cos(slat1) / math.cos(slat2)) / math.log(sn)
     sf = math.tan(math.pi * 0.25 + slat1 * 0.5)
     sf = math.pow(sf, sn) * math.cos(slat1) / sn
     ro = math.tan(math.pi * 0.25 + olat * 0.5)
     ro = re * sf / math.pow(ro, sn)
+    return re * sf, sn, ro, olon
+
+
+def lat_lon_to_grid(lat: float, lon: float) -> Tuple[int, int]:
+    """
+    위도/경도를 기상청 격자 좌표(nx, ny)로 변환
     
+    기상청 격자 좌표 변환 공식 사용
+    """
+    import math
+
+    DEGRAD = math.pi / 180.0
+    re_sf, sn, ro, olon = _kma_grid_projection()
+
     ra = math.tan(math.pi * 0.25 + (lat) * DEGRAD * 0.5)
-    ra = re * sf / math.pow(ra, sn)
+    ra = re_sf / math.pow(ra, sn)
     theta = lon * DEGRAD - olon
     if theta > math.pi:
         theta -= 2.0 * math.pi
@@ -65,12 +80,26 @@ def lat_lon_to_grid(lat: float, lon: float) -> Tuple[int, int]:
         theta += 2.0 * math.pi
     theta *= sn
     
-    nx = int(ra * math.sin(theta) + XO + 0.5)
-    ny = int(ro - ra * math.cos(theta) + YO + 0.5)
+    nx = int(ra * math.sin(theta) + KMA_GRID_XO + 0.5)
+    ny = int(ro - ra * math.cos(theta) + KMA_GRID_YO + 0.5)
     
     return nx, ny
 
 
+def kma_grid_sql(lat_column: str = "latitude", lon_column: str = "longitude") -> Tuple[str, str]:
+    """
+    lat_lon_to_grid와 같은 공식의 PostgreSQL 식 (nx, ny).
+    DB에서 격자 순으로 정렬해 사용자를 격자별로 스트리밍할 때 사용한다.
+    """
+    re_sf, sn, ro, olon = _kma_grid_projection()
+    ra = f"({re_sf!r} / power(tan(pi() * 0.25 + radians({lat_column}) * 0.5), {sn!r}))"
+    # 한반도 경도에서는 theta가 ±pi를 넘지 않으므로 범위 보정은 생략
+    theta = f"((radians({lon_column}) - {olon!r}) * {sn!r})"
+    nx = f"trunc({ra} * sin({theta}) + {KMA_GRID_XO} + 0.5)::int"
+    ny = f"trunc({ro!r} - {ra} * cos({theta}) + {KMA_GRID_YO} + 0.5)::int"
+    return nx, ny
+
+
 def _get_ultra_nowcast_base_datetime(now: Optional[dt.datetime] = None) -> Tuple[str, str]:
     """초단기실황 base_date, base_time 계산"""
     if now is None:
@@ -83,13 +112,42 @@ def _get_ultra_nowcast_base_datetime(now: Optional[dt.datetime] = None) -> Tuple
 
 def fetch_kma_ultra_nowcast(lat: float, lon: float) -> Optional[Dict[str, Any]]:
     """기상청 초단기실황 조회 (공개 함수)"""
+    nx, ny = lat_lon_to_grid(lat, lon)
+    return fetch_kma_ultra_nowcast_grid(nx, ny)
+
+
+# (nx, ny, base_date, base_time) → 초단기실황. 발표 시각이 바뀌면 키가 달라지므로 자연히 갱신된다.
+_NOWCAST_CACHE: "OrderedDict[Tuple[int, int, str, str], Dict[str, Any]]" = OrderedDict()
+_NOWCAST_CACHE_MAX = 4096
+_nowcast_lock = threading.Lock()
+
+
+def fetch_kma_ultra_nowcast_grid(nx: int, ny: int) -> Optional[Dict[str, Any]]:
+    """
+    기상청 격자(nx, ny) 단위 초단기실황 조회.
+    같은 격자·같은 발표 시각은 한 번만 호출하고 결과를 재사용한다 (실패는 캐시하지 않음).
+    """
     if not KMA_SERVICE_KEY:
         return None
-    
+
+    base_date, base_time = _get_ultra_nowcast_base_datetime()
+    key = (nx, ny, base_date, base_time)
+    with _nowcast_lock:
+        cached = _NOWCAST_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    weather = _request_ultra_nowcast(nx, ny, base_date, base_time)
+    if weather is not None:
+        with _nowcast_lock:
+            _NOWCAST_CACHE[key] = weather
+            while len(_NOWCAST_CACHE) > _NOWCAST_CACHE_MAX:
+                _NOWCAST_CACHE.popitem(last=False)
+    return weather
+
+
+def _request_ultra_nowcast(nx: int, ny: int, base_date: str, base_time: str) -> Optional[Dict[str, Any]]:
     try:
-        nx, ny = lat_lon_to_grid(lat, lon)
-        base_date, base_time = _get_ultra_nowcast_base_datetime()
-        
         params = {
             "serviceKey": KMA_SERVICE_KEY,
             "numOfRows": 100,
@@ -192,8 +250,8 @@ def _fetch_kma_forecast(lat: float, lon: float) -> Optional[Dict[str, Any]]:
         return None
 
 
-def _fetch_openweather_air_quality(lat: float, lon: float) -> Optional[Dict[str, Any]]:
-    """OpenWeatherMap 대기질 API 호출"""
+def fetch_air_quality(lat: float, lon: float) -> Optional[Dict[str, Any]]:
+    """OpenWeatherMap 대기질 API 호출 ({"pm10": ...}, 키가 없거나 실패하면 None)"""
     if not OPENWEATHER_API_KEY:
         return None
     
@@ -254,7 +312,7 @@ def fetch_weather(lat: float, lon: float) -> WeatherInfo:
         rain_prob = max(rain_prob, kma_forecast["POP"])
     
     # 3. OpenWeather 대기질 API 조회
-    air_quality = _fetch_openweather_air_quality(lat, lon)
+    air_quality = fetch_air_quality(lat, lon)
     if air_quality:
         pm10 = air_quality.get("pm10", pm10)
     
@@ -266,65 +324,127 @@ def fetch_weather(lat: float, lon: float) -> WeatherInfo:
     }
 
 
-def evaluate_weather_danger(
+# evaluate_weather_danger 결과 캐시 크기 (서로 다른 판정 상태 수는 수백 개 이하)
+DANGER_CACHE_SIZE = 1024
+
+
+def _danger_state(
     weather: Dict[str, Any],
-    has_chronic_disease: bool = False,
-    air_quality_risky: bool = False,
-) -> Tuple[bool, str]:
+    has_chronic_disease: bool,
+    air_quality_risky: bool,
+) -> Tuple[bool, ...]:
     """
-    노인(65세 이상) 기준 '밖에 나가기 위험한지' 여부와 문구 리턴.
-    기상청 날씨 데이터를 기반으로 평가.
+    위험 판정에 쓰이는 기준값 비교 결과만 모은 키.
+    판정 기준(풍속 5/9/14, 기온 -12/-5/0/2/3/28/30/33)의 같은 구간에 있는 날씨는 같은 키가 된다.
     """
+    pty = int(weather.get("PTY", 0))
+    wsd = float(weather.get("WSD", 0.0))
+    temp = float(weather.get("T1H", 20.0))
+    return (
+        pty != 0,
+        wsd >= 14.0,
+        wsd >= 9.0,
+        wsd >= 5.0,
+        temp >= 33.0,
+        temp >= 30.0,
+        temp >= 28.0,
+        temp <= -12.0,
+        temp <= -5.0,
+        temp <= 0.0,
+        temp <= 2.0,
+        temp <= 3.0,
+        bool(has_chronic_disease),
+        bool(air_quality_risky),
+    )
+
+
+@lru_cache(maxsize=DANGER_CACHE_SIZE)
+def _evaluate_danger_state(state: Tuple[bool, ...]) -> Tuple[bool, str]:
+    (
+        raining,
+        wind_14, wind_9, wind_5,
+        temp_ge_33, temp_ge_30, temp_ge_28,
+        temp_le_m12, temp_le_m5, temp_le_0, temp_le_2, temp_le_3,
+        has_chronic_disease,
+        air_quality_risky,
+    ) = state
     reasons: list[str] = []
-    
+
     # 0) 강수형태: 비/눈이면 기본적으로 위험
-    pty = int(weather.get("PTY", 0))
-    if pty != 0:
+    if raining:
         reasons.append("비나 눈이 오는")
-    
+
     # 1) 바람
-    wsd = float(weather.get("WSD", 0.0))
-    if wsd >= 14.0:
+    if wind_14:
         reasons.append("강풍 주의보 수준의 매우 강한 바람이 부는")
-    elif wsd >= 9.0:
+    elif wind_9:
         reasons.append("노인에게 낙상 위험이 큰 강한 바람이 부는")
-    
+
     # 2) 기온
-    temp = float(weather.get("T1H", 20.0))
-    
-    if temp >= 33.0:
+    if temp_ge_33:
         reasons.append("폭염주의보 수준의 매우 더운")
-    elif temp >= 30.0:
+    elif temp_ge_30:
         reasons.append("노인에게 열사병 위험이 커지는 더운")
-    
-    if temp <= -12.0:
+
+    if temp_le_m12:
         reasons.append("한파주의보 수준의 매우 추운")
-    elif temp <= -5.0:
+    elif temp_le_m5:
         reasons.append("노인에게 저체온·결빙 위험이 커지는 추운")
-    
+
     # 3) 바람 + 저온
-    if temp <= 0 and wsd >= 5.0:
+    if temp_le_0 and wind_5:
         reasons.append("바람과 추위가 함께해 체감온도가 크게 낮은")
-    
+
     # 4) 낙상 위험
-    if pty != 0 and (temp <= 2.0 or wsd >= 5.0):
+    if raining and (temp_le_2 or wind_5):
         reasons.append("노인에게 미끄럼·낙상 위험이 큰")
-    
+
     # 5) 대기오염
     if air_quality_risky:
         reasons.append("대기오염으로 실외 활동이 부담스러운")
-    
+
     # 6) 기저질환
     if has_chronic_disease:
-        if 28.0 <= temp < 30.0:
+        if temp_ge_28 and not temp_ge_30:
             reasons.append("기저질환이 있는 노인에게는 더위가 부담되는")
-        if 0.0 < temp <= 3.0:
+        if temp_le_3 and not temp_le_0:
             reasons.append("기저질환이 있는 노인에게는 추위가 부담되는")
-    
+
     # 최종 판단
     if not reasons:
         return False, "노인이 나들이하기에 비교적 안전한 날씨"
-    
+
     reasons = list(dict.fromkeys(reasons))
     reason_text = " / ".join(reasons) + " 날씨"
     return True, reason_text
+
+
+def evaluate_weather_danger(
+    weather: Dict[str, Any],
+    has_chronic_disease: bool = False,
+    air_quality_risky: bool = False,
+) -> Tuple[bool, str]:
+    """
+    노인(65세 이상) 기준 '밖에 나가기 위험한지' 여부와 문구 리턴.
+    기상청 날씨 데이터를 기반으로 평가.
+    판정 기준 구간이 같은 날씨는 캐시된 결과를 재사용한다 (danger_cache_stats로 적중률 확인).
+    """
+    return _evaluate_danger_state(_danger_state(weather, has_chronic_disease, air_quality_risky))
+
+
+def cache_stats(cached_fn) -> Dict[str, Any]:
+    """lru_cache 함수의 적중/미스/크기/적중률"""
+    info = cached_fn.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+    }
+
+
+def danger_cache_stats() -> Dict[str, Any]:
+    """위험 판정 캐시 측정값"""
+    return cache_stats(_evaluate_danger_state)
@@ -0,0 +1,45 @@
+# tests/test_api.py
+import time
+import asyncio
+import threading
+
+import pytest
+from pydantic import ValidationError
+
+import db.database
+from service.api import MAX_OPEN_WITHIN_HOURS, RecommendRequest, app, lifespan
+
+BASE = {
+    "user_profile": {"age_group": "70-74", "health_issues": [], "goals": ["walking"], "preference_env": "any"},
+    "location": {"lat": 37.5665, "lon": 126.978},
+}
+
+
+@pytest.mark.parametrize("hours", [0.5, 3, MAX_OPEN_WITHIN_HOURS, None])
+def test_open_within_hours_accepts_valid_range(hours):
+    assert RecommendRequest(**BASE, open_within_hours=hours).open_within_hours == hours
+
+
+@pytest.mark.parametrize("hours", [0, -1, MAX_OPEN_WITHIN_HOURS + 1, float("nan"), float("inf")])
+def test_open_within_hours_rejects_out_of_range(hours):
+    with pytest.raises(ValidationError):
+        RecommendRequest(**BASE, open_within_hours=hours)
+
+
+def test_lifespan_waits_for_schema_init(monkeypatch):
+    finished = threading.Event()
+
+    def slow_init():
+        time.sleep(0.2)
+        finished.set()
+        return True
+
+    monkeypatch.setenv("DB_INIT_ON_STARTUP", "1")
+    monkeypatch.setattr(db.database, "init_database", slow_init)
+
+    async def start():
+        async with lifespan(app):
+            # yield 이후(요청 처리 시작)에는 초기화가 끝나 있어야 한다
+            return finished.is_set()
+
+    assert asyncio.run(start()) is True
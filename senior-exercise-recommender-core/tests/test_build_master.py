@@ -0,0 +1,31 @@
+# tests/test_build_master.py
+from scripts.build_master import deduplicate_records, iter_deduplicated
+
+
+RECORDS = [
+    {"facility_name": "A", "x": 1},
+    {"facility_name": "A", "x": 1},
+    {"facility_name": "A", "x": 2},
+    {"facility_name": "A", "x": 1},
+    {"programs": ["걷기", "요가"]},
+    {"programs": ["걷기", "요가"]},
+    {"facility_id": 5, "x": 1},
+]
+
+
+def test_deduplicate_records_drops_repeats_of_previous_row_per_facility():
+    assert deduplicate_records(RECORDS) == [
+        {"facility_name": "A", "x": 1},
+        {"facility_name": "A", "x": 2},
+        {"facility_name": "A", "x": 1},
+        {"programs": ["걷기", "요가"]},
+        {"facility_id": 5, "x": 1},
+    ]
+
+
+def test_iter_deduplicated_is_consistent_across_chunks_with_different_columns():
+    # 청크마다 컬럼 구성이 달라도 같은 레코드는 같은 해시
+    assert list(iter_deduplicated(RECORDS + RECORDS, chunk_size=3)) == deduplicate_records(RECORDS) + [
+        {"facility_name": "A", "x": 2},
+        {"facility_name": "A", "x": 1},
+    ]
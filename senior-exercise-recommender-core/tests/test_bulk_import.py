@@ -0,0 +1,102 @@
+# tests/test_bulk_import.py
+import numpy as np
+import pandas as pd
+
+from db.bulk_import import USER_COLUMNS, _load, _prepare_users
+
+
+class RecordingCursor:
+    def __init__(self, existing_phones=()):
+        self.existing_phones = list(existing_phones)
+        self.executed = []
+        self.copied = 0
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.executed.append((" ".join(sql.split()), params))
+        # INSERT ... ON CONFLICT 는 복사한 행이 모두 적재된 것으로 본다
+        self.rowcount = self.copied
+
+    def fetchall(self):
+        return [(phone,) for phone in self.existing_phones]
+
+    def copy_expert(self, sql, buf):
+        self.copied = len(buf.getvalue().splitlines())
+
+
+class RecordingConnection:
+    def __init__(self, cur):
+        self.cur = cur
+        self.commits = 0
+
+    def cursor(self):
+        return self.cur
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        pass
+
+
+class RecordingExecutor:
+    """해시 대상 비밀번호를 기록하는 Executor 대역 (bcrypt는 실행하지 않음)"""
+
+    def __init__(self):
+        self.hashed = []
+
+    def map(self, fn, values, chunksize=1):
+        self.hashed.extend(values)
+        return [f"hash:{value}" for value in values]
+
+
+def _users(rows):
+    return pd.DataFrame(rows, columns=["phone", "password", "name"])
+
+
+def test_prepare_users_skips_missing_passwords_and_existing_phones_before_hashing():
+    df = _users([
+        ["010-0000-0001", "pw1", "가"],
+        ["010-0000-0002", np.nan, "나"],
+        ["010-0000-0003", "  ", "다"],
+        ["010-0000-0004", "pw4", "라"],
+        ["010-0000-0005", "pw5", "마"],
+        ["010-0000-0005", "pw5-again", "마"],
+    ])
+    cur = RecordingCursor(existing_phones=["010-0000-0004"])
+    executor = RecordingExecutor()
+
+    rows, invalid = _prepare_users(cur, df, executor)
+
+    assert invalid == 2
+    assert executor.hashed == ["pw1", "pw5"]
+    assert [row[USER_COLUMNS.index("phone")] for row in rows] == ["010-0000-0001", "010-0000-0005"]
+    sql, params = cur.executed[0]
+    assert sql == "SELECT phone FROM users WHERE phone = ANY(%s)"
+    assert params == (["010-0000-0001", "010-0000-0004", "010-0000-0005"],)
+
+
+def test_load_counts_prefiltered_and_invalid_rows():
+    df = _users([
+        ["010-0000-0001", "pw1", "가"],
+        ["010-0000-0002", None, "나"],
+        ["010-0000-0003", "pw3", "다"],
+    ])
+    cur = RecordingCursor(existing_phones=["010-0000-0003"])
+    executor = RecordingExecutor()
+
+    stats = _load(
+        "users", USER_COLUMNS, "phone", iter([df]), conn=RecordingConnection(cur),
+        to_rows=lambda c, batch: _prepare_users(c, batch, executor),
+    )
+
+    assert stats["read"] == 3
+    assert stats["inserted"] == 1
+    assert stats["skipped"] == 1
+    assert stats["invalid"] == 1
@@ -0,0 +1,119 @@
+# tests/test_catalog_delta.py
+import pytest
+
+import db.database
+import recommender.pipeline
+from recommender.catalog import PostgresFacilityCatalog, _delta_frame, load_catalog_into_postgres
+
+DELTA = {
+    "added": [],
+    "changed": ["FAC1"],
+    "removed": ["FAC2"],
+    "records": [{
+        "fac_uid": "FAC1", "시설명": "새 체육관", "주소": "서울특별시 마포구 1", "시설위도": 37.55, "시설경도": 126.9,
+        "실내여부": "실내", "시설유형명": "walking", "programs": [{"program_name": "걷기", "schedules": ["월수금 10:00"]}],
+    }],
+    "full_rebuild": False,
+}
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append(" ".join(sql.split()))
+        self.rowcount = 3
+
+    def copy_expert(self, sql, buf):
+        if self.conn.fail_copy:
+            raise RuntimeError("COPY 실패")
+        self.conn.executed.append("COPY")
+
+
+class FakeConnection:
+    def __init__(self, fail_copy=False):
+        self.fail_copy = fail_copy
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_connection(monkeypatch):
+    def install(**kwargs):
+        conn = FakeConnection(**kwargs)
+        monkeypatch.setattr(db.database, "get_db_connection", lambda: conn)
+        return conn
+    return install
+
+
+def test_apply_delta_deletes_and_inserts_in_one_transaction(fake_connection):
+    conn = fake_connection()
+    stats = PostgresFacilityCatalog().apply_delta(DELTA)
+
+    assert conn.executed[0] == "DELETE FROM facilities WHERE fac_uid = ANY(%s)"
+    assert "COPY" in conn.executed
+    assert conn.commits == 1 and conn.rollbacks == 0 and conn.closed
+    assert stats == {"removed_rows": 3, "added_rows": 3, "full_reload": False}
+
+
+def test_apply_delta_rolls_back_delete_when_import_fails(fake_connection):
+    conn = fake_connection(fail_copy=True)
+    with pytest.raises(RuntimeError):
+        PostgresFacilityCatalog().apply_delta(DELTA)
+
+    assert conn.executed[0].startswith("DELETE FROM facilities")
+    assert conn.commits == 0
+    assert conn.rollbacks == 1 and conn.closed
+
+
+def test_load_catalog_replaces_facilities_in_one_transaction(fake_connection, monkeypatch):
+    conn = fake_connection()
+    monkeypatch.setattr(recommender.pipeline, "load_facility_master", lambda: _delta_frame(DELTA))
+    stats = load_catalog_into_postgres()
+
+    assert conn.executed[0] == "DELETE FROM facilities"
+    assert "COPY" in conn.executed
+    assert conn.commits == 1 and conn.rollbacks == 0 and conn.closed
+    assert stats["removed"] == 3 and stats["inserted"] == 3
+
+
+def test_load_catalog_keeps_previous_rows_when_import_fails(fake_connection, monkeypatch):
+    conn = fake_connection(fail_copy=True)
+    monkeypatch.setattr(recommender.pipeline, "load_facility_master", lambda: _delta_frame(DELTA))
+    with pytest.raises(RuntimeError):
+        load_catalog_into_postgres()
+
+    assert conn.commits == 0
+    assert conn.rollbacks == 1 and conn.closed
+
+
+def test_full_rebuild_delta_reloads_facilities_from_master(fake_connection, monkeypatch):
+    conn = fake_connection()
+    monkeypatch.setattr(recommender.pipeline, "load_facility_master", lambda: _delta_frame(DELTA))
+    stats = PostgresFacilityCatalog().apply_delta({**DELTA, "full_rebuild": True})
+
+    assert conn.executed[0] == "DELETE FROM facilities"
+    assert conn.commits == 1 and conn.closed
+    assert stats == {"removed_rows": 3, "added_rows": 3, "full_reload": True}
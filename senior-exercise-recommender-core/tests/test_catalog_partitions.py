@@ -0,0 +1,62 @@
+# tests/test_catalog_partitions.py
+import json
+
+import pandas as pd
+
+from recommender.catalog import (
+    CATEGORICAL_COLUMNS,
+    PARTITION_MANIFEST,
+    PartitionedFacilityCatalog,
+    compact_catalog,
+)
+
+
+def _rows(region: str, lat: float, names: list) -> pd.DataFrame:
+    n = len(names)
+    return pd.DataFrame({
+        "fac_id": [f"{region}{i}-00" for i in range(n)],
+        "fac_name": names,
+        "address": [f"{region} {i}" for i in range(n)],
+        "lat": [lat + 0.001 * i for i in range(n)],
+        "lon": [127.0] * n,
+        "is_indoor": [True] * n,
+        "sport_category": ["walking"] * n,
+        "program_name": ["걷기"] * n,
+        "intensity_level": ["low"] * n,
+        "senior_friendly": [True] * n,
+        "operating_hours": ["평일 오전"] * n,
+        "schedule_mask": [0] * n,
+    })
+
+
+def _write_partitions(directory, parts):
+    directory.mkdir()
+    manifest = []
+    for i, (region, df) in enumerate(parts.items()):
+        file = f"part-{i:04d}.parquet"
+        compact_catalog(df).to_parquet(directory / file, index=False)
+        manifest.append({
+            "region": region, "file": file, "rows": len(df),
+            "min_lat": df["lat"].min(), "max_lat": df["lat"].max(),
+            "min_lon": df["lon"].min(), "max_lon": df["lon"].max(),
+        })
+    (directory / PARTITION_MANIFEST).write_text(json.dumps({"partitions": manifest}), encoding="utf-8")
+
+
+def test_candidates_across_partitions_stay_categorical(tmp_path):
+    # 두 파티션이 경계(위도 37.50) 근처에서 만나고, 시설명 사전이 서로 다르다
+    directory = tmp_path / "partitions"
+    _write_partitions(directory, {
+        "서울특별시": _rows("서울특별시", 37.500, ["가", "나"]),
+        "경기도": _rows("경기도", 37.495, ["다", "라"]),
+    })
+    catalog = PartitionedFacilityCatalog(directory)
+
+    candidates = catalog.candidates({"lat": 37.5, "lon": 127.0}, 5.0)
+    assert sorted(candidates["fac_name"].astype(str)) == ["가", "나", "다", "라"]
+    for column in CATEGORICAL_COLUMNS:
+        assert isinstance(candidates[column].dtype, pd.CategoricalDtype), column
+
+    nearest = catalog.nearest({"lat": 37.5, "lon": 127.0}, 3)
+    assert len(nearest) == 3
+    assert isinstance(nearest["fac_name"].dtype, pd.CategoricalDtype)
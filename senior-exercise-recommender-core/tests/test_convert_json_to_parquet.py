@@ -0,0 +1,34 @@
+# tests/test_convert_json_to_parquet.py
+import json
+
+import numpy as np
+import pandas as pd
+
+from scripts.convert_json_to_parquet import HashSet, convert_json_to_parquet
+
+
+def test_hash_set_marks_first_occurrences():
+    seen = HashSet()
+    assert seen.add(np.array([5, 3, 5, 9], dtype=np.uint64)).tolist() == [True, True, False, True]
+    assert seen.add(np.array([9, 1, 1, 7], dtype=np.uint64)).tolist() == [False, True, False, True]
+    assert seen.values.tolist() == [1, 3, 5, 7, 9]
+    assert len(seen) == 5
+
+
+def _record(uid: str, name: str, program: str) -> dict:
+    return {
+        "fac_uid": uid, "시설명": name, "주소": "서울특별시 마포구 1", "시설위도": 37.55, "시설경도": 126.9,
+        "실내여부": "실내", "시설유형명": "walking", "programs": [{"program_name": program, "schedules": ["월 10:00"]}],
+    }
+
+
+def test_duplicates_across_chunks_are_dropped(tmp_path):
+    master = tmp_path / "master.json"
+    records = [_record("A", "가", "걷기"), _record("B", "나", "요가"), _record("A", "가", "걷기"), _record("C", "가", "체조")]
+    master.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+    output = tmp_path / "master.parquet"
+
+    stats = convert_json_to_parquet(master, output, chunk_rows=1)
+
+    assert stats["rows"] == 4 and stats["written"] == 3
+    assert sorted(pd.read_parquet(output)["program_name"].astype(str)) == ["걷기", "요가", "체조"]
@@ -0,0 +1,162 @@
+# tests/test_history_store.py
+import json
+import sqlite3
+import threading
+import datetime as dt
+
+import pytest
+
+import recommender.history_store as history_store
+from recommender.history_store import ExerciseHistoryStore, WriteBehindHistoryStore, expire_anonymous_history
+
+RECORD = {"last_day": 739543, "last_body": "어깨", "exercise_index": 12}
+
+
+@pytest.fixture
+def backing(tmp_path):
+    return ExerciseHistoryStore(tmp_path / "history.sqlite3", import_path=None)
+
+
+@pytest.fixture
+def store(backing):
+    # 백그라운드 flush가 테스트 중에 끼어들지 않도록 주기를 길게
+    store = WriteBehindHistoryStore(backing, flush_interval=60, flush_batch_size=1000, cache_size=2)
+    yield store
+    store.close()
+
+
+def _count_backing_reads(monkeypatch, backing):
+    reads = []
+    original = backing.get
+    monkeypatch.setattr(backing, "get", lambda user_id: reads.append(user_id) or original(user_id))
+    return reads
+
+
+def test_read_your_writes_before_flush(store, backing):
+    store.put("u1", RECORD)
+    assert store.get("u1") == RECORD
+    assert backing.get("u1") is None
+
+
+def test_flushed_records_are_served_from_memory(store, backing, monkeypatch):
+    store.put("u1", RECORD)
+    assert store.flush() == 1
+    reads = _count_backing_reads(monkeypatch, backing)
+
+    assert store.get("u1") == RECORD
+    assert reads == []
+    assert store.stats()["cache_hits"] == 1
+
+
+def test_read_cache_is_bounded(store, backing, monkeypatch):
+    store.put_many({f"u{i}": dict(RECORD, exercise_index=i) for i in range(3)})
+    store.flush()
+    assert store.stats()["cache_size"] == 2
+    reads = _count_backing_reads(monkeypatch, backing)
+
+    # 가장 오래된 u0은 캐시에서 밀려나 저장소에서 다시 읽는다
+    assert store.get("u0")["exercise_index"] == 0
+    assert reads == ["u0"]
+    assert store.get("u0")["exercise_index"] == 0
+    assert reads == ["u0"]
+
+
+def test_close_flushes_and_rejects_later_writes(tmp_path):
+    path = tmp_path / "history.sqlite3"
+    store = WriteBehindHistoryStore(ExerciseHistoryStore(path, import_path=None), flush_interval=60)
+    store.put("u1", RECORD)
+    store.close()
+
+    with pytest.raises(RuntimeError):
+        store.put("u2", RECORD)
+    reopened = ExerciseHistoryStore(path, import_path=None)
+    assert reopened.get("u1") == RECORD
+    assert reopened.get("u2") is None
+    reopened.close()
+
+
+
+def test_expire_anonymous_history_keeps_client_ids_starting_with_user(backing):
+    today = dt.date(2026, 10, 19)
+    old = dict(RECORD, last_day=today.toordinal() - 40)
+    backing.put_many({
+        "anon:c:7513:25395": old,
+        "user_37.566535_126.977969": old,
+        "user_-33.8_151.2": old,
+        "user_kim": old,
+        "user_37_127": old,
+        "42": old,
+        "anon:d:recent": dict(RECORD, last_day=today.toordinal()),
+    })
+
+    assert expire_anonymous_history(backing, ttl_days=30, today=today) == 3
+    assert set(backing.get_many(["user_kim", "user_37_127", "42", "anon:d:recent"])) == {
+        "user_kim", "user_37_127", "42", "anon:d:recent",
+    }
+    assert backing.get("user_37.566535_126.977969") is None
+
+
+def _write_legacy_json(path, users):
+    history = {
+        user_id: {"last_date": "2026-10-01", "last_body": "어깨", "today_exercise": {"title": "어깨 돌리기"}}
+        for user_id in users
+    }
+    path.write_text(json.dumps(history, ensure_ascii=False), encoding="utf-8")
+
+
+@pytest.fixture
+def fixed_index(monkeypatch):
+    monkeypatch.setattr(history_store, "_default_index_of", lambda: (lambda exercise: 7))
+
+
+def test_json_import_runs_once(tmp_path, fixed_index):
+    path, legacy = tmp_path / "history.sqlite3", tmp_path / "exercise_history.json"
+    _write_legacy_json(legacy, ["anon:c:1:1", "anon:c:2:2"])
+
+    store = ExerciseHistoryStore(path, import_path=legacy)
+    assert store.get("anon:c:1:1")["exercise_index"] == 7
+    # 가져온 이력이 모두 만료돼 비어도 다시 열 때 JSON을 다시 가져오지 않는다
+    assert store.expire(("anon:",), dt.date(2027, 1, 1).toordinal()) == 2
+    store.close()
+
+    reopened = ExerciseHistoryStore(path, import_path=legacy)
+    assert reopened.count() == 0
+    reopened.close()
+
+
+def test_legacy_table_is_converted(tmp_path, fixed_index):
+    path = tmp_path / "history.sqlite3"
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        "CREATE TABLE exercise_history (user_id TEXT PRIMARY KEY, last_date TEXT, last_body TEXT, today_exercise TEXT)"
+    )
+    conn.execute("INSERT INTO exercise_history VALUES ('1', '2026-10-01', '허리', '{\"title\": \"허리 펴기\"}')")
+    conn.commit()
+    conn.close()
+
+    store = ExerciseHistoryStore(path, import_path=None)
+    assert store.get("1") == {"last_day": dt.date(2026, 10, 1).toordinal(), "last_body": "허리", "exercise_index": 7}
+    store.close()
+
+
+def test_concurrent_open_imports_once(tmp_path, fixed_index):
+    path, legacy = tmp_path / "history.sqlite3", tmp_path / "exercise_history.json"
+    _write_legacy_json(legacy, [f"anon:c:{i}:{i}" for i in range(200)])
+    stores, errors = [], []
+
+    def open_store():
+        try:
+            stores.append(ExerciseHistoryStore(path, import_path=legacy))
+        except Exception as e:  # pragma: no cover - 실패 시 메시지 확인용
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_store) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert stores[0].count() == 200
+    for store in stores:
+        store.close()
@@ -0,0 +1,54 @@
+# tests/test_notification_batch.py
+import itertools
+
+import service.notification_batch as notification_batch
+from service.notification_batch import group_by_grid, iter_notifications
+from service.weather_client import lat_lon_to_grid
+
+
+def _targets(cells):
+    for i, (grid, count) in enumerate(cells):
+        for j in range(count):
+            yield {"user_id": f"{i}-{j}", "lat": 37.5, "lon": 127.0, "has_chronic_disease": False, "grid": grid}
+
+
+def test_group_by_grid_streams_sorted_targets():
+    consumed = []
+
+    def tracked():
+        for target in _targets([((60, 127), 2), ((60, 128), 1), ((61, 120), 3)]):
+            consumed.append(target["user_id"])
+            yield target
+
+    groups = group_by_grid(tracked())
+    cell, members = next(groups)
+    assert cell == (60, 127) and [t["user_id"] for t in members] == ["0-0", "0-1"]
+    # 다음 격자의 첫 사용자까지만 읽었다 (나머지는 아직 커서에 남아 있음)
+    assert consumed == ["0-0", "0-1", "1-0"]
+    assert [(cell, len(members)) for cell, members in groups] == [((60, 128), 1), ((61, 120), 3)]
+
+
+def test_group_by_grid_without_grid_uses_coordinates():
+    target = {"user_id": "1", "lat": 37.5665, "lon": 126.978, "has_chronic_disease": False}
+    assert list(group_by_grid([target])) == [(lat_lon_to_grid(37.5665, 126.978), [target])]
+
+
+def test_iter_notifications_covers_every_target(monkeypatch):
+    fetched = []
+    monkeypatch.setattr(notification_batch, "fetch_kma_ultra_nowcast_grid", lambda nx, ny: fetched.append((nx, ny)))
+    cells = [((60, 100 + i), 3) for i in range(10)]
+
+    results = list(iter_notifications(_targets(cells), workers=2, store=object()))
+
+    assert len(results) == 30
+    assert not any(result["has_notification"] for result in results)
+    # 격자마다 날씨는 한 번만 조회
+    assert sorted(fetched) == [grid for grid, _ in cells]
+
+
+def test_iter_notifications_reads_input_lazily(monkeypatch):
+    monkeypatch.setattr(notification_batch, "fetch_kma_ultra_nowcast_grid", lambda nx, ny: None)
+    infinite = _targets((((60, i), 1) for i in itertools.count()))
+
+    first = next(iter_notifications(infinite, workers=1, store=object()))
+    assert first["has_notification"] is False
@@ -0,0 +1,53 @@
+# tests/test_schedule.py
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+from recommender.schedule import SLOTS_PER_DAY, open_in, parse_schedule, window_mask
+
+
+def _days(mask: int) -> str:
+    """마스크가 걸친 요일 글자 (검증용)"""
+    return "".join(
+        name for day, name in enumerate("월화수목금토일")
+        if (mask >> (day * SLOTS_PER_DAY)) & ((1 << SLOTS_PER_DAY) - 1)
+    )
+
+
+@pytest.mark.parametrize("text, days", [
+    ("월수금 / 14:00~14:50", "월수금"),
+    ("화요일 10시", "화"),
+    ("매주 화, 목 09:00", "화목"),
+    ("월·수·금 10:00", "월수금"),
+    ("월~금 09:00", "월화수목금"),
+    ("월요일~금요일 오전", "월화수목금"),
+    ("주말 오후", "토일"),
+    ("매일 오전", "월화수목금토일"),
+    # 요일 목록 토큰이 아닌 글자는 요일로 보지 않음
+    ("수영 일일체험 10:00", "월화수목금"),
+    ("월 1회 토요일", "토"),
+    ("월 2회 수요일 10:00", "수"),
+])
+def test_parse_schedule_days(text, days):
+    assert _days(parse_schedule(text)) == days
+
+
+def test_parse_schedule_slots():
+    # 14:00~14:50은 14~16시 슬롯 하나, 시각이 없으면 하루 전체
+    assert parse_schedule("월 14:00~14:50") == 1 << 4
+    assert parse_schedule("월") == (1 << SLOTS_PER_DAY) - 1
+    assert parse_schedule("") == 0
+    assert parse_schedule(None) == 0
+
+
+def test_open_in_window():
+    monday_9am = dt.datetime(2026, 10, 19, 9, 0)
+    masks = pd.Series([
+        parse_schedule("월 10:00~11:00"),
+        parse_schedule("화 10:00~11:00"),
+        0,
+    ])
+    hit = open_in(masks, window_mask(monday_9am, 3))
+    assert hit.tolist() == [True, False, True]
+    assert open_in(masks, window_mask(monday_9am, 3), keep_unknown=False).tolist() == [True, False, False]
@@ -0,0 +1,54 @@
+# tests/test_scoring.py
+import math
+
+import pandas as pd
+import pytest
+
+from recommender.scoring import SCORE_WEIGHTS, final_score, score_frame
+
+PROFILE = {"age_group": "75+", "health_issues": ["hypertension"], "goals": ["blood_pressure"], "preference_env": "any"}
+RAINY = {"temp": 12.0, "rain_prob": 0.8, "pm10": 40.0, "is_daytime": True}
+
+
+def _candidates() -> pd.DataFrame:
+    return pd.DataFrame({
+        "fac_id": ["near_walk", "far_walk", "near_high", "outdoor"],
+        "dist_km": [0.3, 2.7, 0.3, 0.3],
+        "sport_category": ["walking", "walking", "strength", "walking"],
+        "is_indoor": [True, True, True, False],
+        "intensity_level": ["low", "low", "high", "low"],
+        "senior_friendly": [True, True, True, True],
+        "accessibility_score": [0.9, 0.9, 0.9, float("nan")],
+    })
+
+
+def test_weights_keep_baseline_ratios():
+    assert math.isclose(sum(SCORE_WEIGHTS.values()), 1.0)
+    baseline = {"distance": 0.35, "goal": 0.25, "weather": 0.20, "senior": 0.10, "intensity": 0.10}
+    for name, weight in baseline.items():
+        assert SCORE_WEIGHTS[name] / SCORE_WEIGHTS["distance"] == pytest.approx(weight / baseline["distance"])
+
+
+def test_score_frame_ranking():
+    df = _candidates()
+    df["score"] = score_frame(df, PROFILE, RAINY)
+    ranked = df.sort_values("score", ascending=False)["fac_id"].tolist()
+    # 가깝고, 목표에 맞고, 비 오는 날 실내인 저강도 시설이 1위 / 고혈압 75세 이상에게 고강도는 불리
+    assert ranked[0] == "near_walk"
+    assert ranked.index("near_high") > ranked.index("near_walk")
+    assert ranked.index("outdoor") > ranked.index("near_walk")
+    assert ranked.index("far_walk") > ranked.index("near_walk")
+
+
+def test_final_score_matches_score_frame():
+    df = _candidates()
+    scores = score_frame(df, PROFILE, RAINY)
+    for i, row in df.iterrows():
+        assert final_score(row, PROFILE, RAINY) == pytest.approx(scores[i])
+
+
+def test_missing_accessibility_is_neutral():
+    df = _candidates().iloc[[0]].copy()
+    known = score_frame(df.assign(accessibility_score=0.5), PROFILE, RAINY).iloc[0]
+    missing = score_frame(df.assign(accessibility_score=float("nan")), PROFILE, RAINY).iloc[0]
+    assert missing == pytest.approx(known)